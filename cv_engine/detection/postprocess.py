@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+from cv_engine.tracking.base import BBox, Detection
+
+
+@dataclass(frozen=True)
+class PostprocessConfig:
+    score_threshold: float = 0.25
+    iou_threshold: float = 0.5
+    top_k: int = 20
+    class_aware: bool = True
+
+
+def _as_candidates(value: object) -> List[Sequence[float]]:
+    """Normalise one batch item to a list of candidates.
+
+    ``DetectorModel`` emits a single box (and score) per image while multi-anchor
+    heads emit a list per image; both shapes are accepted.
+    """
+
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], (list, tuple)):
+        return list(value)  # type: ignore[return-value]
+    return [value] if isinstance(value, (list, tuple)) else []  # type: ignore[list-item]
+
+
+def _as_values(value: object) -> List[float]:
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value]
+    return [float(value)]  # type: ignore[arg-type]
+
+
+def non_max_suppression(
+    boxes: Sequence[BBox],
+    scores: Sequence[float],
+    classes: Optional[Sequence[int]] = None,
+    *,
+    iou_threshold: float = 0.5,
+    top_k: int = 20,
+) -> List[int]:
+    """Return indices of kept boxes, highest score first.
+
+    Boxes are ``(x, y, w, h)``. Class-aware suppression uses the batched-NMS trick of
+    offsetting every class into its own disjoint coordinate range, so a single pass
+    never suppresses across classes. Corner coordinates and areas are computed once
+    up front and each kept box is compared against the surviving candidates in one
+    sweep.
+    """
+
+    count = len(boxes)
+    if count == 0 or top_k <= 0:
+        return []
+    x1 = [float(box[0]) for box in boxes]
+    y1 = [float(box[1]) for box in boxes]
+    x2 = [x + float(box[2]) for x, box in zip(x1, boxes)]
+    y2 = [y + float(box[3]) for y, box in zip(y1, boxes)]
+    if classes is not None:
+        span = max(max(x2), max(y2)) - min(min(x1), min(y1)) + 1.0
+        offsets = [float(cls) * span for cls in classes]
+        x1 = [value + offset for value, offset in zip(x1, offsets)]
+        x2 = [value + offset for value, offset in zip(x2, offsets)]
+    areas = [max(r - l, 0.0) * max(b - t, 0.0) for l, t, r, b in zip(x1, y1, x2, y2)]
+
+    order = sorted(range(count), key=lambda idx: scores[idx], reverse=True)
+    keep: List[int] = []
+    while order and len(keep) < top_k:
+        current = order[0]
+        keep.append(current)
+        cx1, cy1, cx2, cy2, carea = x1[current], y1[current], x2[current], y2[current], areas[current]
+        survivors: List[int] = []
+        for idx in order[1:]:
+            inter_w = min(cx2, x2[idx]) - max(cx1, x1[idx])
+            inter_h = min(cy2, y2[idx]) - max(cy1, y1[idx])
+            if inter_w <= 0.0 or inter_h <= 0.0:
+                survivors.append(idx)
+                continue
+            intersection = inter_w * inter_h
+            union = carea + areas[idx] - intersection
+            if union <= 0.0 or intersection / union <= iou_threshold:
+                survivors.append(idx)
+        order = survivors
+    return keep
+
+
+def filter_candidates(
+    boxes: Sequence[BBox],
+    scores: Sequence[float],
+    classes: Optional[Sequence[int]],
+    config: PostprocessConfig,
+) -> List[int]:
+    """Apply the score threshold, NMS and top-k cap; returns indices into ``boxes``."""
+
+    candidates = [idx for idx, score in enumerate(scores) if score >= config.score_threshold]
+    if not candidates:
+        return []
+    kept = non_max_suppression(
+        [boxes[idx] for idx in candidates],
+        [scores[idx] for idx in candidates],
+        [classes[idx] for idx in candidates] if classes is not None and config.class_aware else None,
+        iou_threshold=config.iou_threshold,
+        top_k=config.top_k,
+    )
+    return [candidates[idx] for idx in kept]
+
+
+def postprocess_outputs(
+    outputs: Mapping[str, object],
+    frame_indices: Sequence[int],
+    *,
+    frame_size: Tuple[float, float] = (1.0, 1.0),
+    config: PostprocessConfig | None = None,
+) -> List[List[Detection]]:
+    """Turn raw detector outputs into one ``Detection`` batch per input frame.
+
+    ``frame_size`` scales the model's normalised boxes into pixel coordinates.
+    An optional ``classes`` output enables class-aware suppression.
+    """
+
+    settings = config or PostprocessConfig()
+    width, height = frame_size
+    raw_boxes = outputs["boxes"]
+    raw_scores = outputs["scores"]
+    raw_classes = outputs.get("classes")
+    batches: List[List[Detection]] = []
+    for item, frame in enumerate(frame_indices):
+        boxes: List[BBox] = [
+            (float(b[0]) * width, float(b[1]) * height, float(b[2]) * width, float(b[3]) * height)
+            for b in _as_candidates(raw_boxes[item])  # type: ignore[index]
+        ]
+        scores = _as_values(raw_scores[item])  # type: ignore[index]
+        classes = [int(c) for c in _as_values(raw_classes[item])] if raw_classes is not None else None  # type: ignore[index]
+        kept = filter_candidates(boxes, scores, classes, settings)
+        batches.append([Detection(frame=frame, bbox=boxes[idx]) for idx in kept])
+    return batches
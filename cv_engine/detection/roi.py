@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from cv_engine.tracking.base import BBox, Detection, TrackedDetection
+
+from .postprocess import PostprocessConfig, filter_candidates
+
+Frame = List[List[List[float]]]
+
+
+class FrameDetector(Protocol):
+    def forward(self, tensor: List[Frame]) -> Dict[str, object]:
+        ...
+
+
+@dataclass(frozen=True)
+class RegionOfInterest:
+    """Pixel-aligned crop of a frame; ``track_id`` is ``None`` for fallback tiles."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    track_id: Optional[int] = None
+
+
+def _center(bbox: BBox) -> Tuple[float, float]:
+    x, y, w, h = bbox
+    return x + w / 2.0, y + h / 2.0
+
+
+def _frame_size(frame: Frame) -> Tuple[int, int]:
+    height = len(frame)
+    width = len(frame[0]) if height > 0 else 0
+    return width, height
+
+
+def _clamp_region(cx: float, cy: float, size_w: float, size_h: float, width: int, height: int) -> Tuple[int, int, int, int]:
+    region_w = int(min(max(round(size_w), 1), width))
+    region_h = int(min(max(round(size_h), 1), height))
+    x0 = int(round(cx - region_w / 2.0))
+    y0 = int(round(cy - region_h / 2.0))
+    x0 = min(max(x0, 0), width - region_w)
+    y0 = min(max(y0, 0), height - region_h)
+    return x0, y0, region_w, region_h
+
+
+def predict_regions(
+    tracks: Sequence[TrackedDetection],
+    frame_index: int,
+    frame_size: Tuple[int, int],
+    *,
+    min_tile: int = 64,
+    context_scale: float = 2.0,
+    max_track_age: int = 5,
+) -> List[RegionOfInterest]:
+    """Predict one region per live track from its last two observations.
+
+    Each track's center is extrapolated with a constant-velocity model to
+    ``frame_index``. The crop covers the box scaled by ``context_scale`` plus the
+    distance travelled since the last observation, so fast objects stay inside it.
+    """
+
+    width, height = frame_size
+    history: Dict[int, List[TrackedDetection]] = {}
+    for det in sorted(tracks, key=lambda d: (d.track_id, d.frame)):
+        history.setdefault(det.track_id, []).append(det)
+
+    regions: List[RegionOfInterest] = []
+    for track_id, observations in sorted(history.items()):
+        last = observations[-1]
+        gap = frame_index - last.frame
+        if gap < 0 or gap > max_track_age:
+            continue
+        cx, cy = _center(last.bbox)
+        vx = vy = 0.0
+        if len(observations) > 1:
+            prev = observations[-2]
+            dt = last.frame - prev.frame
+            if dt > 0:
+                px, py = _center(prev.bbox)
+                vx = (cx - px) / dt
+                vy = (cy - py) / dt
+        pred_x = cx + vx * gap
+        pred_y = cy + vy * gap
+        size_w = max(min_tile, last.bbox[2] * context_scale + abs(vx) * max(gap, 1) * 2.0)
+        size_h = max(min_tile, last.bbox[3] * context_scale + abs(vy) * max(gap, 1) * 2.0)
+        x0, y0, region_w, region_h = _clamp_region(pred_x, pred_y, size_w, size_h, width, height)
+        regions.append(RegionOfInterest(x=x0, y=y0, width=region_w, height=region_h, track_id=track_id))
+    return regions
+
+
+def full_frame_tiles(frame_size: Tuple[int, int], tile_size: int, overlap: float = 0.25) -> List[RegionOfInterest]:
+    """Cover the whole frame with overlapping square tiles of at most ``tile_size`` pixels."""
+
+    width, height = frame_size
+    if width <= 0 or height <= 0:
+        return []
+    stride = max(int(tile_size * (1.0 - overlap)), 1)
+
+    def _starts(extent: int) -> List[int]:
+        size = min(tile_size, extent)
+        starts = list(range(0, max(extent - size, 0) + 1, stride))
+        if starts[-1] + size < extent:
+            starts.append(extent - size)
+        return starts
+
+    tile_w = min(tile_size, width)
+    tile_h = min(tile_size, height)
+    return [
+        RegionOfInterest(x=x0, y=y0, width=tile_w, height=tile_h)
+        for y0 in _starts(height)
+        for x0 in _starts(width)
+    ]
+
+
+def crop(frame: Frame, region: RegionOfInterest) -> Frame:
+    return [row[region.x : region.x + region.width] for row in frame[region.y : region.y + region.height]]
+
+
+def to_global_bbox(box: Sequence[float], region: RegionOfInterest) -> BBox:
+    """Map a detector box normalised to the crop back into frame pixel coordinates."""
+
+    bx, by, bw, bh = (float(value) for value in box[:4])
+    return (
+        region.x + bx * region.width,
+        region.y + by * region.height,
+        bw * region.width,
+        bh * region.height,
+    )
+
+
+class RoiDetectionStage:
+    """Runs a detector on tracker-predicted crops, tiling the full frame on track loss."""
+
+    def __init__(
+        self,
+        detector: FrameDetector,
+        *,
+        tile_size: int = 256,
+        min_tile: int = 64,
+        context_scale: float = 2.0,
+        max_track_age: int = 5,
+        overlap: float = 0.25,
+        min_score: float = 0.0,
+        postprocess: PostprocessConfig | None = None,
+    ) -> None:
+        self._detector = detector
+        self._tile_size = tile_size
+        self._min_tile = min_tile
+        self._context_scale = context_scale
+        self._max_track_age = max_track_age
+        self._overlap = overlap
+        self._min_score = min_score
+        self._postprocess = postprocess
+        self.last_regions: List[RegionOfInterest] = []
+        self.last_used_fallback = False
+
+    def regions_for(self, frame_index: int, frame_size: Tuple[int, int], tracks: Sequence[TrackedDetection]) -> List[RegionOfInterest]:
+        regions = predict_regions(
+            tracks,
+            frame_index,
+            frame_size,
+            min_tile=self._min_tile,
+            context_scale=self._context_scale,
+            max_track_age=self._max_track_age,
+        )
+        self.last_used_fallback = not regions
+        if not regions:
+            regions = full_frame_tiles(frame_size, self._tile_size, self._overlap)
+        return regions
+
+    def detect(self, frame_index: int, frame: Frame, tracks: Sequence[TrackedDetection] = ()) -> List[Detection]:
+        """Return detections for ``frame`` in global pixel coordinates."""
+
+        regions = self.regions_for(frame_index, _frame_size(frame), tracks)
+        self.last_regions = regions
+        if not regions:
+            return []
+        outputs = self._detector.forward([crop(frame, region) for region in regions])
+        boxes = outputs["boxes"]
+        scores = outputs["scores"]
+        global_boxes: List[BBox] = []
+        kept_scores: List[float] = []
+        for region, box, score in zip(regions, boxes, scores):  # type: ignore[arg-type]
+            if float(score) < self._min_score:
+                continue
+            global_boxes.append(to_global_bbox(box, region))
+            kept_scores.append(float(score))
+        if self._postprocess is not None:
+            # Overlapping tiles can see the same object twice; suppress in frame space.
+            kept = filter_candidates(global_boxes, kept_scores, None, self._postprocess)
+            global_boxes = [global_boxes[idx] for idx in kept]
+        return [Detection(frame=frame_index, bbox=bbox) for bbox in global_boxes]
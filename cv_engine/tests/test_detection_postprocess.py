@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from cv_engine.detection.postprocess import PostprocessConfig, non_max_suppression, postprocess_outputs
+from scripts import bench_detector_postprocess
+from siq.models.detector import DetectorModel
+
+
+def test_nms_suppresses_overlaps_and_keeps_highest_score():
+    boxes = [(0.0, 0.0, 10.0, 10.0), (1.0, 1.0, 10.0, 10.0), (50.0, 50.0, 10.0, 10.0)]
+    scores = [0.6, 0.9, 0.7]
+    assert non_max_suppression(boxes, scores, iou_threshold=0.5) == [1, 2]
+
+
+def test_nms_is_class_aware():
+    boxes = [(0.0, 0.0, 10.0, 10.0), (1.0, 1.0, 10.0, 10.0)]
+    scores = [0.6, 0.9]
+    assert non_max_suppression(boxes, scores, [0, 1], iou_threshold=0.5) == [1, 0]
+    assert non_max_suppression(boxes, scores, [1, 1], iou_threshold=0.5) == [1]
+
+
+def test_postprocess_thresholds_caps_and_scales():
+    outputs = {
+        "boxes": [[[0.1, 0.1, 0.1, 0.1], [0.5, 0.5, 0.1, 0.1], [0.8, 0.8, 0.1, 0.1], [0.3, 0.3, 0.1, 0.1]]],
+        "scores": [[0.9, 0.8, 0.7, 0.1]],
+    }
+    config = PostprocessConfig(score_threshold=0.5, top_k=2)
+    (detections,) = postprocess_outputs(outputs, [7], frame_size=(100.0, 200.0), config=config)
+    assert [det.frame for det in detections] == [7, 7]
+    assert [det.bbox for det in detections] == [(10.0, 20.0, 10.0, 20.0), (50.0, 100.0, 10.0, 20.0)]
+
+
+def test_postprocess_accepts_detector_model_outputs():
+    model = DetectorModel()
+    batch = [[[[0.2, 0.4, 0.6] for _ in range(4)] for _ in range(4)] for _ in range(3)]
+    outputs = model.forward(batch)
+    batches = postprocess_outputs(outputs, [0, 1, 2], config=PostprocessConfig(score_threshold=0.0))
+    assert [len(batch) for batch in batches] == [1, 1, 1]
+
+
+def test_postprocess_benchmark_reports_latency():
+    result = bench_detector_postprocess.run_benchmark(frames=5, candidates=40)
+    assert result.frames == 5
+    assert 0.0 < result.mean_kept <= 20
+    assert result.p99_ms >= result.p50_ms >= 0.0
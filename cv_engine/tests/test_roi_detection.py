@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from cv_engine.detection.roi import RoiDetectionStage, full_frame_tiles, predict_regions
+from cv_engine.tracking.base import TrackedDetection
+from siq.models.detector import DetectorModel
+
+
+class _RecordingDetector:
+    def __init__(self) -> None:
+        self.batches: list[list[tuple[int, int]]] = []
+
+    def forward(self, tensor):
+        self.batches.append([(len(tile[0]), len(tile)) for tile in tensor])
+        return {
+            "boxes": [[0.25, 0.25, 0.5, 0.5] for _ in tensor],
+            "scores": [0.9 for _ in tensor],
+        }
+
+
+def _frame(width: int, height: int):
+    return [[[0.1, 0.2, 0.3] for _ in range(width)] for _ in range(height)]
+
+
+def test_predict_regions_extrapolates_velocity():
+    tracks = [
+        TrackedDetection(frame=0, bbox=(100.0, 100.0, 10.0, 10.0), track_id=1),
+        TrackedDetection(frame=1, bbox=(110.0, 100.0, 10.0, 10.0), track_id=1),
+    ]
+    (region,) = predict_regions(tracks, 2, (640, 480), min_tile=32)
+    center_x = region.x + region.width / 2.0
+    assert abs(center_x - 125.0) <= 1.0
+    assert region.track_id == 1
+
+
+def test_stage_runs_one_tile_per_track_and_returns_global_boxes():
+    detector = _RecordingDetector()
+    stage = RoiDetectionStage(detector, min_tile=40)
+    tracks = [
+        TrackedDetection(frame=4, bbox=(20.0, 20.0, 8.0, 8.0), track_id=1),
+        TrackedDetection(frame=4, bbox=(200.0, 120.0, 8.0, 8.0), track_id=2),
+    ]
+    detections = stage.detect(5, _frame(320, 240), tracks)
+
+    assert detector.batches == [[(40, 40), (40, 40)]]
+    assert not stage.last_used_fallback
+    for det, region in zip(detections, stage.last_regions):
+        assert det.frame == 5
+        assert det.bbox == (region.x + 10.0, region.y + 10.0, 20.0, 20.0)
+
+
+def test_stage_falls_back_to_full_frame_tiles_on_track_loss():
+    detector = _RecordingDetector()
+    stage = RoiDetectionStage(detector, tile_size=128, max_track_age=2)
+    stale = [TrackedDetection(frame=0, bbox=(20.0, 20.0, 8.0, 8.0), track_id=1)]
+    detections = stage.detect(10, _frame(300, 200), stale)
+
+    assert stage.last_used_fallback
+    assert len(detections) == len(full_frame_tiles((300, 200), 128))
+    covered_x = max(region.x + region.width for region in stage.last_regions)
+    covered_y = max(region.y + region.height for region in stage.last_regions)
+    assert (covered_x, covered_y) == (300, 200)
+
+
+def test_stage_accepts_detector_model():
+    stage = RoiDetectionStage(DetectorModel(), tile_size=16)
+    detections = stage.detect(0, _frame(32, 32))
+    assert detections and all(det.frame == 0 for det in detections)
@@ -29,6 +29,23 @@ class Query:
     default: Any
     enum: Optional[Tuple[str, ...]] = None
 
+
+class Response:
+    """Explicit response; handlers may also declare a ``response`` parameter to set headers."""
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Dict[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> None:
+        self.body = content
+        self.status_code = status_code
+        self.headers: Dict[str, str] = dict(headers or {})
+        self.media_type = media_type
+
+
 class Request:
     def __init__(self, *, body: bytes, headers: Dict[str, Any] | None = None) -> None:
         self._body = body
@@ -88,6 +105,7 @@ class FastAPI:
 
         signature = inspect.signature(handler)
         bound_args: Dict[str, Any] = {}
+        response: Response | None = None
 
         for name, param in signature.parameters.items():
             if isinstance(param.default, _Dependency):
@@ -99,6 +117,10 @@ class FastAPI:
             if name == "headers":
                 bound_args[name] = headers or {}
                 continue
+            if name == "response":
+                response = Response()
+                bound_args[name] = response
+                continue
             if method.upper() == "GET":
                 value = None
                 if query and name in query:
@@ -116,5 +138,7 @@ class FastAPI:
 
         result = handler(**bound_args)
         if inspect.iscoroutine(result):  # pragma: no cover - async compatibility
-            return asyncio.run(result)
+            result = asyncio.run(result)
+        if response is not None and not isinstance(result, Response):
+            return Response(content=result, status_code=response.status_code, headers=response.headers)
         return result
@@ -1,6 +1,8 @@
 """Subset of FastAPI status codes for testing."""
 HTTP_200_OK = 200
+HTTP_304_NOT_MODIFIED = 304
 HTTP_400_BAD_REQUEST = 400
 HTTP_403_FORBIDDEN = 403
 HTTP_404_NOT_FOUND = 404
 HTTP_422_UNPROCESSABLE_ENTITY = 422
+HTTP_503_SERVICE_UNAVAILABLE = 503
@@ -1,7 +1,7 @@
 """Test client compatible with the simplified FastAPI implementation."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json as json_module
 from typing import Any, Dict, Optional
 
@@ -10,18 +10,25 @@ try:  # pragma: no cover - fallback when server.testing exists
 except ModuleNotFoundError:  # pragma: no cover
     MiniTestClient = None  # type: ignore
 
-from . import FastAPI, HTTPException
+from . import FastAPI, HTTPException, Response as HandlerResponse
 
 
 @dataclass
 class Response:
     status_code: int
     body: Any
+    headers: Dict[str, str] = field(default_factory=dict)
 
     def json(self) -> Any:
         return self.body
 
 
+def _to_response(result: Any) -> Response:
+    if isinstance(result, HandlerResponse):
+        return Response(status_code=result.status_code, body=result.body, headers=dict(result.headers))
+    return Response(status_code=200, body=result)
+
+
 class TestClient:
     __test__ = False
 
@@ -32,6 +39,10 @@ class TestClient:
             self._delegate = MiniTestClient(app)
 
     def __enter__(self) -> "TestClient":
+        # Like Starlette's client, startup handlers run when the client is entered.
+        startup = getattr(self._app, "startup", None)
+        if callable(startup):
+            startup()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:  # pragma: no cover - trivial
@@ -48,7 +59,7 @@ class TestClient:
             return Response(status_code=exc.status_code, body={"detail": exc.detail})
         except KeyError:
             return Response(status_code=404, body={"detail": "Not found"})
-        return Response(status_code=200, body=body)
+        return _to_response(body)
 
     def post(
         self,
@@ -91,4 +102,4 @@ class TestClient:
             return Response(status_code=exc.status_code, body={"detail": exc.detail})
         except KeyError:
             return Response(status_code=404, body={"detail": "Not found"})
-        return Response(status_code=200, body=body)
+        return _to_response(body)
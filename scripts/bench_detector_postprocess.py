@@ -0,0 +1,107 @@
+"""Benchmark detector post-processing (score threshold, NMS, top-k) per frame.
+
+Synthetic frames contain clusters of overlapping candidates around a handful of
+objects, which is the shape raw detector heads produce. The report lists the
+per-frame latency distribution and how many candidates survive.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, List, Sequence
+
+from cv_engine.detection.postprocess import PostprocessConfig, postprocess_outputs
+
+
+@dataclass
+class PostprocessBenchmark:
+    frames: int
+    candidates_per_frame: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    mean_kept: float
+
+
+def synthetic_outputs(frames: int, candidates: int, objects: int = 4, classes: int = 2, seed: int = 7) -> Dict[str, List]:
+    rng = random.Random(seed)
+    boxes: List[List[List[float]]] = []
+    scores: List[List[float]] = []
+    labels: List[List[int]] = []
+    for _ in range(frames):
+        centers = [(rng.uniform(0.1, 0.9), rng.uniform(0.1, 0.9), rng.randrange(classes)) for _ in range(objects)]
+        frame_boxes: List[List[float]] = []
+        frame_scores: List[float] = []
+        frame_labels: List[int] = []
+        for idx in range(candidates):
+            cx, cy, label = centers[idx % objects]
+            size = rng.uniform(0.03, 0.06)
+            frame_boxes.append(
+                [cx + rng.gauss(0.0, 0.005) - size / 2, cy + rng.gauss(0.0, 0.005) - size / 2, size, size]
+            )
+            frame_scores.append(rng.random())
+            frame_labels.append(label)
+        boxes.append(frame_boxes)
+        scores.append(frame_scores)
+        labels.append(frame_labels)
+    return {"boxes": boxes, "scores": scores, "classes": labels}
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_benchmark(
+    frames: int = 200,
+    candidates: int = 300,
+    *,
+    frame_size: tuple[float, float] = (1920.0, 1080.0),
+    config: PostprocessConfig | None = None,
+) -> PostprocessBenchmark:
+    outputs = synthetic_outputs(frames, candidates)
+    timings: List[float] = []
+    kept_counts: List[int] = []
+    for index in range(frames):
+        single = {key: [value[index]] for key, value in outputs.items()}
+        start = perf_counter()
+        (detections,) = postprocess_outputs(single, [index], frame_size=frame_size, config=config)
+        timings.append((perf_counter() - start) * 1000.0)
+        kept_counts.append(len(detections))
+    return PostprocessBenchmark(
+        frames=frames,
+        candidates_per_frame=candidates,
+        p50_ms=_percentile(timings, 0.5),
+        p99_ms=_percentile(timings, 0.99),
+        mean_ms=sum(timings) / len(timings),
+        mean_kept=sum(kept_counts) / len(kept_counts),
+    )
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 300, 1000])
+    parser.add_argument("--top-k", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    config = PostprocessConfig(top_k=args.top_k)
+    print("candidates  p50_ms  p99_ms  mean_ms  kept")
+    for candidates in args.candidates:
+        result = run_benchmark(args.frames, candidates, config=config)
+        print(
+            f"{result.candidates_per_frame:>10}  {result.p50_ms:6.3f}  {result.p99_ms:6.3f}  "
+            f"{result.mean_ms:7.3f}  {result.mean_kept:4.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""Benchmark leaderboard persistence: write cost, write amplification and recovery time.
+
+Events are submitted in batches to a ``LeaderboardService`` backed by
+``DurableRedis``. The report compares restarting from the log alone with
+restarting from a snapshot plus a short log tail. The tail is written while the
+snapshot runs, and the report includes the longest time snapshot work held the
+store lock, which is how long a writer can stall behind it. Write amplification
+is bytes written to disk (log plus snapshots) divided by the packed event
+payload bytes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Sequence
+
+from server.leaderboard import METRIC_HARDEST_SHOT, LeaderboardService
+from server.persistence import DurableRedis
+
+COUNTRIES = ("US", "GB", "DE", "BR", "IN", "JP")
+
+
+@dataclass
+class PersistenceBenchmark:
+    events: int
+    events_per_sec: float
+    payload_bytes: int
+    log_bytes: int
+    snapshot_bytes: int
+    write_amplification: float
+    fsyncs: int
+    log_recovery_s: float
+    snapshot_recovery_s: float
+    replayed_after_snapshot: int
+    snapshot_pause_ms: float
+
+
+def _submit(service: LeaderboardService, count: int, players: int, rng: random.Random, batch: int) -> int:
+    now = time.time()
+    payload = 0
+    for offset in range(0, count, batch):
+        submissions = []
+        for _ in range(min(batch, count - offset)):
+            event = service.new_event(
+                f"player-{rng.randrange(players)}",
+                round(rng.uniform(40.0, 160.0), 1),
+                now - rng.uniform(0.0, 3600.0),
+                rng.choice(COUNTRIES),
+                None,
+            )
+            payload += len(event.encode())
+            submissions.append((METRIC_HARDEST_SHOT, event))
+        service.submit_batch(submissions)
+    return payload
+
+
+def run_benchmark(
+    events: int = 1_000_000,
+    *,
+    players: int = 50_000,
+    batch: int = 1000,
+    tail_fraction: float = 0.05,
+    fsync_every_ops: int = 1000,
+    fsync_interval: float = 0.05,
+    seed: int = 7,
+) -> PersistenceBenchmark:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="siq-aof-") as directory:
+
+        def open_store() -> DurableRedis:
+            return DurableRedis(
+                directory,
+                fsync_every_ops=fsync_every_ops,
+                fsync_interval=fsync_interval,
+                snapshot_every_ops=None,
+            )
+
+        store = open_store()
+        start = perf_counter()
+        payload = _submit(LeaderboardService(store), events, players, rng, batch)
+        elapsed = perf_counter() - start
+        store.close()
+        base = store.stats
+
+        # Restart with only the log to replay.
+        store = open_store()
+        log_recovery = store.stats.recovery_seconds
+        snapshot = store.snapshot()
+        tail = max(int(events * tail_fraction), 1)
+        payload += _submit(LeaderboardService(store), tail, players, rng, batch)
+        if snapshot is not None:
+            snapshot.join()
+        store.close()
+        written = store.stats
+
+        # Restart from the snapshot plus the tail written after it.
+        store = open_store()
+        recovered = store.stats
+        store.close()
+
+    disk_bytes = base.log_bytes + written.log_bytes + written.snapshot_bytes
+    return PersistenceBenchmark(
+        events=events + tail,
+        events_per_sec=events / elapsed if elapsed else 0.0,
+        payload_bytes=payload,
+        log_bytes=base.log_bytes + written.log_bytes,
+        snapshot_bytes=written.snapshot_bytes,
+        write_amplification=disk_bytes / payload if payload else 0.0,
+        fsyncs=base.fsyncs + written.fsyncs,
+        log_recovery_s=log_recovery,
+        snapshot_recovery_s=recovered.recovery_seconds,
+        replayed_after_snapshot=recovered.recovered_records,
+        snapshot_pause_ms=written.snapshot_pause_seconds * 1000.0,
+    )
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, nargs="+", default=[1_000_000, 2_000_000])
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--fsync-every-ops", type=int, default=1000)
+    parser.add_argument("--fsync-interval-ms", type=float, default=50.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    print("events     ev/s     log_MB  snap_MB  amplif  fsyncs  log_recover_s  snap_recover_s  snap_pause_ms")
+    for events in args.events:
+        result = run_benchmark(
+            events,
+            players=args.players,
+            fsync_every_ops=args.fsync_every_ops,
+            fsync_interval=args.fsync_interval_ms / 1000.0,
+        )
+        print(
+            f"{result.events:>9}  {result.events_per_sec:7.0f}  {result.log_bytes / 1e6:7.1f}  "
+            f"{result.snapshot_bytes / 1e6:7.1f}  {result.write_amplification:6.2f}  {result.fsyncs:6d}  "
+            f"{result.log_recovery_s:13.2f}  {result.snapshot_recovery_s:14.2f}  {result.snapshot_pause_ms:13.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
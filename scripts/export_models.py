@@ -15,7 +15,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Mapping, MutableMapping, Sequence
 
-from siq.models import create_default_models, load_model_from_payload
+from siq.models import create_default_models
+from siq.models.registry import load_model_from_artifact
 
 EXPORT_FORMATS: Sequence[str] = ("onnx", "tflite", "coreml", "ncnn")
 DEFAULT_OUTPUT_DIR = Path("build/edge_exports")
@@ -89,13 +90,10 @@ def export_model(model_name: str, model: object, output_dir: Path, formats: Iter
 
 def load_exported_model(model_name: str, format_name: str, paths: Sequence[Path]):
     if format_name == "ncnn":
-        bin_path = next(path for path in paths if path.suffix == ".bin")
-        data = json.loads(bin_path.read_text())
+        export_path = next(path for path in paths if path.suffix == ".bin")
     else:
         export_path = paths[0]
-        data = json.loads(export_path.read_text())
-    payload = data["payload"]
-    return load_model_from_payload(model_name, payload)
+    return load_model_from_artifact(model_name, export_path)
 
 
 def compare_model_outputs(model_name: str, format_name: str, original: Mapping[str, object], exported: Mapping[str, object]) -> None:
@@ -0,0 +1,389 @@
+"""Load-test the leaderboard service with a realistic write/read mix.
+
+Players are drawn from a Zipf distribution, so a few heavy players produce most
+of the events. Locations come from a skewed set of countries, each with its own
+skewed set of cities. Every operation is a hardest-shot write, a most-hits write
+or a scoped board read, in the configured proportions. Operations are driven
+either straight into ``LeaderboardService`` ("service") or through
+``leaderboard_app.call_handler`` ("app"), which adds request parsing, the
+response cache and rendering.
+
+The "resp" backend talks RESP to a real Redis given by ``--redis-url``; the
+database is flushed before each run. Without a URL it falls back to the Python
+stand-in from the test tree, which is only there in a source checkout.
+
+The report lists ops/sec and p50/p99 write and read latency for each backend and
+mode, plus store memory per million events. Memory comes from a separate
+write-only pass under ``tracemalloc`` so tracing does not skew the latencies;
+tracing is slow, so that pass only replays the first ``--memory-operations``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import random
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from server import leaderboard
+from server.leaderboard import (
+    METRIC_HARDEST_SHOT,
+    METRIC_MOST_HITS,
+    SCOPE_CITY,
+    SCOPE_COUNTRY,
+    SCOPE_GLOBAL,
+    InMemoryRedis,
+    LeaderboardClient,
+    LeaderboardResponseCache,
+    LeaderboardService,
+    PlayerBestView,
+    PlayerTotalsView,
+)
+from server.persistence import DurableRedis
+from server.resp import RespClient
+from server.sharding import ShardedClient
+
+BACKENDS = ("memory", "sharded", "durable", "resp")
+MODES = ("service", "app")
+# Ordered roughly by traffic share; country weights follow a Zipf curve over this order.
+COUNTRY_CODES = (
+    "US", "GB", "DE", "JP", "CA", "AU", "FR", "KR", "BR", "IN",
+    "ES", "IT", "NL", "SE", "MX", "ZA", "IE", "NZ", "CH", "AT",
+    "DK", "NO", "FI", "BE", "PL", "PT", "SG", "AR", "CL", "CN",
+    "TH", "MY", "PH", "AE", "SA", "TR", "CZ", "HU", "CO", "IL",
+)  # fmt: skip
+READ = "read"
+_READ_PATHS = {METRIC_HARDEST_SHOT: "/leaderboard/hardest-shot", METRIC_MOST_HITS: "/leaderboard/most-hits"}
+_WRITE_FIELDS = {METRIC_HARDEST_SHOT: "ball_speed_kph", METRIC_MOST_HITS: "hits"}
+_WINDOWS = {METRIC_HARDEST_SHOT: "24h", METRIC_MOST_HITS: "7d"}
+
+
+@dataclass
+class TrafficMix:
+    hardest_shot_writes: float = 0.45
+    most_hits_writes: float = 0.35
+    reads: float = 0.20
+    players: int = 100_000
+    zipf_exponent: float = 1.1
+    countries: int = 20
+    cities_per_country: int = 30
+    # Share of reads for the global, country and city boards.
+    read_scopes: Tuple[float, float, float] = (0.5, 0.3, 0.2)
+
+
+@dataclass(frozen=True)
+class Operation:
+    kind: str  # a metric for writes, ``READ`` for board reads
+    metric: str
+    player_id: str
+    value: float
+    occurred_at: float
+    country: str
+    city: str
+    scope: str = SCOPE_GLOBAL
+
+
+@dataclass
+class LoadTestResult:
+    backend: str
+    mode: str
+    operations: int
+    writes: int
+    reads: int
+    ops_per_sec: float
+    write_p50_ms: float
+    write_p99_ms: float
+    read_p50_ms: float
+    read_p99_ms: float
+    memory_mb_per_million_events: float
+
+
+def _zipf_cum_weights(count: int, exponent: float) -> List[float]:
+    return list(itertools.accumulate(1.0 / rank**exponent for rank in range(1, count + 1)))
+
+
+def _locations(mix: TrafficMix) -> Tuple[List[Tuple[str, str]], List[float]]:
+    countries = COUNTRY_CODES[: max(1, min(mix.countries, len(COUNTRY_CODES)))]
+    country_weights = _zipf_cum_weights(len(countries), mix.zipf_exponent)
+    city_weights = _zipf_cum_weights(mix.cities_per_country, mix.zipf_exponent)
+    locations: List[Tuple[str, str]] = []
+    weights: List[float] = []
+    previous_country = 0.0
+    for country, country_cum in zip(countries, country_weights):
+        country_share = country_cum - previous_country
+        previous_country = country_cum
+        previous_city = 0.0
+        for idx, city_cum in enumerate(city_weights):
+            locations.append((country, f"City {idx + 1}"))
+            weights.append(country_share * (city_cum - previous_city) / city_weights[-1])
+            previous_city = city_cum
+    return locations, list(itertools.accumulate(weights))
+
+
+def generate_operations(count: int, mix: TrafficMix | None = None, *, seed: int = 7) -> List[Operation]:
+    """Pre-generate ``count`` operations so sampling stays out of the timings."""
+
+    mix = mix or TrafficMix()
+    rng = random.Random(seed)
+    now = time.time()
+    kinds = rng.choices(
+        (METRIC_HARDEST_SHOT, METRIC_MOST_HITS, READ),
+        weights=(mix.hardest_shot_writes, mix.most_hits_writes, mix.reads),
+        k=count,
+    )
+    players = rng.choices(range(mix.players), cum_weights=_zipf_cum_weights(mix.players, mix.zipf_exponent), k=count)
+    locations, location_weights = _locations(mix)
+    places = rng.choices(locations, cum_weights=location_weights, k=count)
+    scopes = rng.choices((SCOPE_GLOBAL, SCOPE_COUNTRY, SCOPE_CITY), weights=mix.read_scopes, k=count)
+
+    operations: List[Operation] = []
+    for kind, player, (country, city), scope in zip(kinds, players, places, scopes):
+        if kind == READ:
+            metric = METRIC_HARDEST_SHOT if rng.random() < 0.5 else METRIC_MOST_HITS
+            value = 0.0
+        else:
+            metric = kind
+            value = round(rng.uniform(40.0, 170.0), 1) if kind == METRIC_HARDEST_SHOT else float(rng.randint(1, 40))
+        operations.append(
+            Operation(kind, metric, f"player-{player}", value, now - rng.uniform(0.0, 3600.0), country, city, scope)
+        )
+    return operations
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+@contextlib.contextmanager
+def open_backend(name: str, *, redis_url: Optional[str] = None) -> Iterator[LeaderboardClient]:
+    """Yield a fresh store for ``name``; it is closed and discarded on exit."""
+
+    if name == "memory":
+        yield InMemoryRedis()
+    elif name == "sharded":
+        yield ShardedClient({f"shard-{idx}": InMemoryRedis() for idx in range(3)}, key_tag=leaderboard.score_key_tag)
+    elif name == "durable":
+        with tempfile.TemporaryDirectory(prefix="siq-loadtest-") as directory:
+            client = DurableRedis(directory)
+            try:
+                yield client
+            finally:
+                client.close()
+    elif name == "resp" and redis_url:
+        client = RespClient.from_url(redis_url)
+        try:
+            client.flushall()
+            yield client
+        finally:
+            client.close()
+    elif name == "resp":
+        try:
+            from tests.support import LocalRedisServer
+        except ImportError:
+            raise ValueError("the resp backend needs --redis-url outside a source checkout") from None
+        with LocalRedisServer() as server:
+            client = RespClient.from_url(server.url)
+            try:
+                yield client
+            finally:
+                client.close()
+    else:
+        raise ValueError(f"unknown backend: {name}")
+
+
+def _service(client: LeaderboardClient) -> LeaderboardService:
+    # Mirrors the production wiring in ``leaderboard._service_factory``.
+    return LeaderboardService(
+        client,
+        player_view=PlayerBestView(),
+        response_cache=LeaderboardResponseCache(),
+        player_totals=PlayerTotalsView(),
+    )
+
+
+def _run_service(service: LeaderboardService, operation: Operation) -> None:
+    if operation.kind == METRIC_HARDEST_SHOT:
+        service.submit_hardest_shot(
+            player_id=operation.player_id,
+            ball_speed_kph=operation.value,
+            occurred_at=operation.occurred_at,
+            country=operation.country,
+            city=operation.city,
+        )
+    elif operation.kind == METRIC_MOST_HITS:
+        service.submit_most_hits(
+            player_id=operation.player_id,
+            hits=int(operation.value),
+            occurred_at=operation.occurred_at,
+            country=operation.country,
+            city=operation.city,
+        )
+    else:
+        service.read_player_leaderboard(
+            metric=operation.metric,
+            window=_WINDOWS[operation.metric],
+            scope=operation.scope,
+            country=operation.country,
+            city=operation.city,
+        )
+
+
+def _run_app(operation: Operation) -> None:
+    if operation.kind == READ:
+        query = {"scope": operation.scope, "country": operation.country, "city": operation.city}
+        leaderboard.leaderboard_app.call_handler("GET", _READ_PATHS[operation.metric], json=None, query=query)
+        return
+    payload = {
+        "player_id": operation.player_id,
+        _WRITE_FIELDS[operation.metric]: operation.value,
+        "occurred_at": operation.occurred_at,
+        "location": {"country": operation.country, "city": operation.city},
+    }
+    leaderboard.leaderboard_app.call_handler("POST", _READ_PATHS[operation.metric], json=payload, query=None)
+
+
+def run_load(
+    service: LeaderboardService, operations: Sequence[Operation], mode: str = "service"
+) -> Tuple[float, List[float], List[float]]:
+    """Run ``operations`` in order; returns elapsed seconds and write/read latencies in ms."""
+
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode}")
+    writes: List[float] = []
+    reads: List[float] = []
+    overrides = leaderboard.leaderboard_app.dependency_overrides
+    overrides[leaderboard.get_service] = lambda: service
+    try:
+        started = perf_counter()
+        for operation in operations:
+            start = perf_counter()
+            if mode == "service":
+                _run_service(service, operation)
+            else:
+                _run_app(operation)
+            (reads if operation.kind == READ else writes).append((perf_counter() - start) * 1000.0)
+        elapsed = perf_counter() - started
+    finally:
+        overrides.pop(leaderboard.get_service, None)
+    return elapsed, writes, reads
+
+
+def measure_memory(backend: str, operations: Sequence[Operation], *, redis_url: Optional[str] = None) -> float:
+    """Traced bytes held after replaying the writes in ``operations``, in MB per million events."""
+
+    writes = [operation for operation in operations if operation.kind != READ]
+    if not writes:
+        return 0.0
+    tracemalloc.start()
+    try:
+        with open_backend(backend, redis_url=redis_url) as client:
+            baseline = tracemalloc.get_traced_memory()[0]
+            service = _service(client)
+            for operation in writes:
+                _run_service(service, operation)
+            used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return used / len(writes) * 1_000_000 / 1e6
+
+
+def run_loadtest(
+    operations: int = 200_000,
+    *,
+    backends: Sequence[str] = BACKENDS,
+    modes: Sequence[str] = MODES,
+    mix: Optional[TrafficMix] = None,
+    memory_operations: int = 20_000,
+    seed: int = 7,
+    redis_url: Optional[str] = None,
+) -> List[LoadTestResult]:
+    workload = generate_operations(operations, mix, seed=seed)
+    write_count = sum(1 for operation in workload if operation.kind != READ)
+    results: List[LoadTestResult] = []
+    for backend in backends:
+        memory = measure_memory(backend, workload[:memory_operations], redis_url=redis_url)
+        for mode in modes:
+            with open_backend(backend, redis_url=redis_url) as client:
+                elapsed, writes, reads = run_load(_service(client), workload, mode)
+            results.append(
+                LoadTestResult(
+                    backend=backend,
+                    mode=mode,
+                    operations=len(workload),
+                    writes=write_count,
+                    reads=len(workload) - write_count,
+                    ops_per_sec=len(workload) / elapsed if elapsed else 0.0,
+                    write_p50_ms=_percentile(writes, 0.5),
+                    write_p99_ms=_percentile(writes, 0.99),
+                    read_p50_ms=_percentile(reads, 0.5),
+                    read_p99_ms=_percentile(reads, 0.99),
+                    memory_mb_per_million_events=memory,
+                )
+            )
+    return results
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    defaults = TrafficMix()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--hardest-shot-writes", type=float, default=defaults.hardest_shot_writes)
+    parser.add_argument("--most-hits-writes", type=float, default=defaults.most_hits_writes)
+    parser.add_argument("--reads", type=float, default=defaults.reads)
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--zipf-exponent", type=float, default=defaults.zipf_exponent)
+    parser.add_argument("--countries", type=int, default=defaults.countries)
+    parser.add_argument("--cities-per-country", type=int, default=defaults.cities_per_country)
+    parser.add_argument("--memory-operations", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--redis-url",
+        help="Redis for the resp backend, e.g. redis://127.0.0.1:6379/15; the database is flushed",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    mix = TrafficMix(
+        hardest_shot_writes=args.hardest_shot_writes,
+        most_hits_writes=args.most_hits_writes,
+        reads=args.reads,
+        players=args.players,
+        zipf_exponent=args.zipf_exponent,
+        countries=args.countries,
+        cities_per_country=args.cities_per_country,
+    )
+    results = run_loadtest(
+        args.operations,
+        backends=args.backends,
+        modes=args.modes,
+        mix=mix,
+        memory_operations=args.memory_operations,
+        seed=args.seed,
+        redis_url=args.redis_url,
+    )
+    print("backend  mode       ops/s  w_p50_ms  w_p99_ms  r_p50_ms  r_p99_ms  MB/1M_events")
+    for result in results:
+        print(
+            f"{result.backend:<8} {result.mode:<7} {result.ops_per_sec:8.0f}  {result.write_p50_ms:8.3f}  "
+            f"{result.write_p99_ms:8.3f}  {result.read_p50_ms:8.3f}  {result.read_p99_ms:8.3f}  "
+            f"{result.memory_mb_per_million_events:12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,36 @@
+"""Copy entitlements from the JSON store into the SQLite store.
+
+Run once before switching ``ENTITLEMENTS_STORE_BACKEND`` to ``sqlite``. The copy
+is a single upserting transaction, so re-running it is safe.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Sequence
+
+from server.services.entitlements.sqlite_store import DEFAULT_DB_PATH, SqliteEntitlementStore, migrate_json_store
+from server.services.entitlements.store import DEFAULT_PATH
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", type=Path, default=DEFAULT_PATH, help="entitlements JSON file")
+    parser.add_argument("--target", type=Path, default=DEFAULT_DB_PATH, help="SQLite database to create or update")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    store = SqliteEntitlementStore(args.target)
+    try:
+        copied = migrate_json_store(args.source, store)
+    finally:
+        store.close()
+    print(f"copied {copied} entitlements from {args.source} to {args.target}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
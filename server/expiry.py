@@ -0,0 +1,159 @@
+"""Background expiry for time-windowed stores.
+
+Keys are tracked in a min-heap ordered by their next expiry time. A worker pops
+due keys and hands each to an ``expire`` callback that performs a small, bounded
+amount of work and reports when the key next needs attention, so an idle period
+followed by a burst is drained over several short slices instead of on the first
+request. A key whose callback raises is logged and retried after a backoff.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+ExpireCallback = Callable[[Hashable, float], Optional[float]]
+
+_logger = logging.getLogger("siq.expiry")
+
+
+class ExpiryScheduler:
+    """Min-heap of per-key next-expiry times drained in time-bounded slices.
+
+    ``expire(key, now)`` returns the key's next due time, or ``None`` when nothing
+    is left to expire. Returning ``now`` (or earlier) means the slice stopped with
+    work outstanding; the key is revisited on the next pass. If ``expire``
+    raises, the key is rescheduled ``retry_seconds`` later, doubling on each
+    consecutive failure up to ``max_retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        expire: ExpireCallback,
+        *,
+        slice_seconds: float = 0.005,
+        clock: Callable[[], float] = time.time,
+        retry_seconds: float = 1.0,
+        max_retry_seconds: float = 60.0,
+    ) -> None:
+        self._expire = expire
+        self._slice_seconds = slice_seconds
+        self._clock = clock
+        self._retry_seconds = retry_seconds
+        self._max_retry_seconds = max_retry_seconds
+        self._failures: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._due: Dict[Hashable, float] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._due)
+
+    def schedule(self, key: Hashable, due_at: float) -> None:
+        """Record that ``key`` needs expiring at ``due_at``; the earliest time wins."""
+
+        with self._lock:
+            current = self._due.get(key)
+            if current is not None and current <= due_at:
+                return
+            self._due[key] = due_at
+            # Superseded heap entries are skipped lazily when popped.
+            heapq.heappush(self._heap, (due_at, self._counter, key))
+            self._counter += 1
+            earliest = self._heap[0][0] == due_at
+        if earliest:
+            self._wakeup.set()
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            due_at, _, key = self._heap[0]
+            if self._due.get(key) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: float) -> Optional[Hashable]:
+        with self._lock:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            _, _, key = heapq.heappop(self._heap)
+            del self._due[key]
+            return key
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Expire due keys until none are due or the slice budget is spent.
+
+        Returns the number of ``expire`` calls made.
+        """
+
+        now = self._clock() if now is None else now
+        deadline = time.perf_counter() + self._slice_seconds
+        calls = 0
+        deferred: List[Tuple[Hashable, float]] = []
+        while time.perf_counter() < deadline:
+            key = self._pop_due(now)
+            if key is None:
+                break
+            calls += 1
+            try:
+                next_due = self._expire(key, now)
+            except Exception:
+                failures = self._failures[key] = self._failures.get(key, 0) + 1
+                delay = min(self._retry_seconds * 2 ** (failures - 1), self._max_retry_seconds)
+                _logger.exception("expiring %r failed; retrying in %.1fs", key, delay)
+                self.schedule(key, now + delay)
+                continue
+            self._failures.pop(key, None)
+            if next_due is None:
+                continue
+            if next_due <= now:
+                # More work for this key; let other due keys have this slice first.
+                deferred.append((key, next_due))
+            else:
+                self.schedule(key, next_due)
+        for key, due_at in deferred:
+            self.schedule(key, due_at)
+        return calls
+
+    def _run(self, interval: float) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.run_pending()
+            except Exception:  # pragma: no cover - keep the worker alive
+                _logger.exception("expiry pass failed")
+            next_due = self.next_due()
+            wait = interval if next_due is None else max(min(next_due - self._clock(), interval), 0.0)
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def start(self, interval: float = 1.0) -> threading.Thread:
+        """Run expiry on a daemon thread, waking at least every ``interval`` seconds."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="siq-expiry", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+__all__ = ["ExpiryScheduler"]
@@ -1,14 +1,26 @@
 """Leaderboard service exposing FastAPI-style endpoints backed by sorted sets."""
 from __future__ import annotations
 
+import functools
+import hashlib
+import heapq
 import json
+import math
+import os
+import struct
+import threading
 import time
-import uuid
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
+
+from server.expiry import ExpiryScheduler
+from server.resp import Pipeline, RespClient
+from server.sharding import ShardedClient
 
 WINDOWS = {
     "24h": 60 * 60 * 24,
@@ -18,55 +30,361 @@ WINDOWS = {
 METRIC_HARDEST_SHOT = "hardest_shot"
 METRIC_MOST_HITS = "most_hits"
 
+METRIC_WINDOWS: Dict[str, Tuple[str, ...]] = {
+    METRIC_HARDEST_SHOT: ("24h", "7d"),
+    METRIC_MOST_HITS: ("7d",),
+}
+# Metrics whose player boards rank summed scores rather than best single events.
+COUNTER_METRICS = frozenset({METRIC_MOST_HITS})
+MAX_BATCH_SUBMISSIONS = 1000
+
 SCOPE_GLOBAL = "global"
 SCOPE_COUNTRY = "country"
 SCOPE_CITY = "city"
 
+# Number of ``:``-separated parts in a score key for each scope, e.g.
+# ``leaderboard:hardest_shot:24h:city:US:austin`` has six.
+_SCORE_KEY_PARTS = {SCOPE_GLOBAL: 4, SCOPE_COUNTRY: 5, SCOPE_CITY: 6}
+
+T = TypeVar("T")
+
+# Batches of new sorted-set members at least this large are merged with one sort.
+_BULK_SORT_THRESHOLD = 256
+
+
+class _SortedSet:
+    """Sorted set backed by a member dict plus a bisect-maintained score index.
+
+    Index entries are ``(-score, seq, member)`` so the list is ordered by score
+    descending, with ties kept in first-insertion order (matching the previous
+    dict-and-sort implementation). Rank and score-range lookups are O(log n + k).
+
+    Large batches of new members are appended unsorted and the index is sorted
+    once on its next use, so bulk loads such as log replay cost one sort per key.
+    """
+
+    __slots__ = ("_scores", "_seqs", "_index", "_next_seq", "_unsorted")
+
+    def __init__(self) -> None:
+        self._scores: Dict[str, float] = {}
+        self._seqs: Dict[str, int] = {}
+        self._index: List[Tuple[float, int, str]] = []
+        self._next_seq = 0
+        self._unsorted = False
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _entry(self, member: str) -> Tuple[float, int, str]:
+        return (-self._scores[member], self._seqs[member], member)
+
+    def _settle(self) -> None:
+        if self._unsorted:
+            self._index.sort()
+            self._unsorted = False
+
+    def _score_bounds(self, min_score: float, max_score: float) -> Tuple[int, int]:
+        self._settle()
+        lo = bisect_left(self._index, (-max_score, -1))
+        hi = bisect_right(self._index, (-min_score, math.inf))
+        return lo, max(lo, hi)
+
+    def add(self, member: str, score: float, gt: bool = False) -> bool:
+        """Insert or rescore ``member``; returns True when it was newly added.
+
+        With ``gt`` an existing member is only rescored when ``score`` is higher.
+        """
+        self._settle()
+        if member in self._scores:
+            current = self._scores[member]
+            if current == score or (gt and score < current):
+                return False
+            entry = self._entry(member)
+            del self._index[bisect_left(self._index, entry)]
+            added = False
+        else:
+            self._seqs[member] = self._next_seq
+            self._next_seq += 1
+            added = True
+        self._scores[member] = score
+        insort(self._index, self._entry(member))
+        return added
+
+    def add_many(self, mapping: Dict[str, float], gt: bool = False) -> int:
+        """Bulk ``add``; large batches of new members defer to one sort of the index.
+
+        Each ``insort`` moves the tail of the index, so past a few hundred new
+        members (or when the set is small) sorting the combined list is cheaper.
+        """
+        fresh: List[Tuple[float, int, str]] = []
+        for member, score in mapping.items():
+            if member in self._scores:
+                self.add(member, score, gt)
+                continue
+            self._scores[member] = score
+            self._seqs[member] = self._next_seq
+            fresh.append((-score, self._next_seq, member))
+            self._next_seq += 1
+        if len(fresh) >= _BULK_SORT_THRESHOLD or len(fresh) > len(self._index):
+            self._index.extend(fresh)
+            self._unsorted = True
+        else:
+            self._settle()
+            for entry in fresh:
+                insort(self._index, entry)
+        return len(fresh)
+
+    def remove(self, member: str) -> bool:
+        if member not in self._scores:
+            return False
+        self._settle()
+        del self._index[bisect_left(self._index, self._entry(member))]
+        del self._scores[member]
+        del self._seqs[member]
+        return True
+
+    def score(self, member: str) -> Optional[float]:
+        return self._scores.get(member)
+
+    def rank_desc(self, member: str) -> Optional[int]:
+        """0-based position from the top, found by bisecting the index."""
+        if member not in self._scores:
+            return None
+        self._settle()
+        return bisect_left(self._index, self._entry(member))
+
+    def count(self, min_score: float, max_score: float) -> int:
+        lo, hi = self._score_bounds(min_score, max_score)
+        return hi - lo
+
+    def _rank_slice(self, start: int, stop: int) -> List[Tuple[float, int, str]]:
+        self._settle()
+        return self._index[start : stop + 1] if stop >= 0 else self._index[start:]
+
+    def range_by_rank_desc(self, start: int, stop: int) -> List[str]:
+        return [member for _, _, member in self._rank_slice(start, stop)]
+
+    def range_by_rank_desc_with_scores(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        return [(member, -negated) for negated, _, member in self._rank_slice(start, stop)]
+
+    def range_by_rank_asc_with_scores(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        self._settle()
+        count = len(self._index)
+        start = max(count + start, 0) if start < 0 else start
+        stop = count + stop if stop < 0 else min(stop, count - 1)
+        if start > stop:
+            return []
+        entries = self._index[count - 1 - stop : count - start]
+        return [(member, -negated) for negated, _, member in reversed(entries)]
+
+    def range_by_score(self, min_score: float, max_score: float, start: int = 0, num: Optional[int] = None) -> List[str]:
+        lo, hi = self._score_bounds(min_score, max_score)
+        # Ascending order walks the descending index backwards from ``hi``.
+        first = hi - max(start, 0)
+        last = lo if num is None or num < 0 else max(lo, first - num)
+        if first <= last:
+            return []
+        return [member for _, _, member in reversed(self._index[last:first])]
+
+    def copy_scores(self) -> Dict[str, float]:
+        """Members with scores in insertion order, so re-adding them keeps tie order.
+
+        ``_scores`` gains a member exactly when it is given its seq and a rescore
+        keeps its slot, so the dict is already in seq order and a copy needs no sort.
+        """
+        return dict(self._scores)
+
+    def remove_range_by_score(self, min_score: float, max_score: float) -> int:
+        lo, hi = self._score_bounds(min_score, max_score)
+        for _, _, member in self._index[lo:hi]:
+            del self._scores[member]
+            del self._seqs[member]
+        del self._index[lo:hi]
+        return hi - lo
+
+
+def _locked(method: Callable[..., T]) -> Callable[..., T]:
+    @functools.wraps(method)
+    def wrapper(self: "InMemoryRedis", *args: object, **kwargs: object) -> T:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _encode_value(value: object) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return str(value).encode()
+
+
+def _decode_member(member: object) -> str:
+    return member.decode() if isinstance(member, (bytes, bytearray)) else str(member)
+
+
+class InMemoryPipeline(Pipeline):
+    """Pipeline with the ``RespPipeline`` API that applies commands in-process."""
+
+    def __init__(self, client: "InMemoryRedis") -> None:
+        super().__init__()
+        self._client = client
+
+    def execute(self) -> List[object]:
+        queued, self._queued = self._queued, []
+        with self._client._lock:
+            return [getattr(self._client, name)(*args) for name, args in queued]
+
 
 class InMemoryRedis:
     """Tiny Redis-like store supporting the sorted-set ops we rely on."""
 
     def __init__(self) -> None:
-        self._sorted_sets: Dict[str, Dict[str, float]] = {}
-        self._strings: Dict[str, str] = {}
+        self._sorted_sets: Dict[str, _SortedSet] = {}
+        self._strings: Dict[str, bytes] = {}
+        # Re-entrant so a pipeline can hold it across its commands, which also
+        # gives it MULTI-style isolation from background expiry threads.
+        self._lock = threading.RLock()
 
-    def zadd(self, key: str, mapping: Dict[str, float]) -> None:
-        store = self._sorted_sets.setdefault(key, {})
-        for member, score in mapping.items():
-            store[str(member)] = float(score)
+    def pipeline(self, transaction: bool = False) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    @_locked
+    def zadd(self, key: str, mapping: Dict[str, float], gt: bool = False) -> int:
+        store = self._sorted_sets.setdefault(key, _SortedSet())
+        return store.add_many({str(member): float(score) for member, score in mapping.items()}, gt)
+
+    @_locked
+    def zincrby(self, key: str, amount: float, member: bytes | str) -> float:
+        store = self._sorted_sets.setdefault(key, _SortedSet())
+        name = _decode_member(member)
+        score = (store.score(name) or 0.0) + float(amount)
+        store.add(name, score)
+        return score
 
-    def zrangebyscore(self, key: str, min_score: float, max_score: float) -> List[bytes]:
-        store = self._sorted_sets.get(key, {})
-        return [member.encode() for member, score in store.items() if min_score <= score <= max_score]
+    @_locked
+    def zscore(self, key: str, member: bytes | str) -> Optional[float]:
+        store = self._sorted_sets.get(key)
+        return store.score(_decode_member(member)) if store is not None else None
 
+    @_locked
+    def zrevrank(self, key: str, member: bytes | str) -> Optional[int]:
+        store = self._sorted_sets.get(key)
+        return store.rank_desc(_decode_member(member)) if store is not None else None
+
+    @_locked
+    def zcount(self, key: str, min_score: float, max_score: float) -> int:
+        store = self._sorted_sets.get(key)
+        return store.count(min_score, max_score) if store is not None else 0
+
+    @_locked
+    def zrangebyscore(
+        self,
+        key: str,
+        min_score: float,
+        max_score: float,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+    ) -> List[bytes]:
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return []
+        return [member.encode() for member in store.range_by_score(min_score, max_score, start or 0, num)]
+
+    @_locked
+    def zrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return []
+        return [(member.encode(), score) for member, score in store.range_by_rank_asc_with_scores(start, stop)]
+
+    @_locked
     def zrevrange(self, key: str, start: int, stop: int) -> List[bytes]:
-        items = sorted(self._sorted_sets.get(key, {}).items(), key=lambda item: item[1], reverse=True)
-        if stop >= 0:
-            slice_items = items[start : stop + 1]
-        else:
-            slice_items = items[start:]
-        return [member.encode() for member, _ in slice_items]
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return []
+        return [member.encode() for member in store.range_by_rank_desc(start, stop)]
+
+    @_locked
+    def zrevrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return []
+        return [(member.encode(), score) for member, score in store.range_by_rank_desc_with_scores(start, stop)]
 
-    def zrem(self, key: str, member: bytes) -> None:
-        member_str = member.decode() if isinstance(member, (bytes, bytearray)) else str(member)
-        self._sorted_sets.get(key, {}).pop(member_str, None)
+    @_locked
+    def zrem(self, key: str, *members: bytes | str) -> int:
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return 0
+        return sum(store.remove(_decode_member(member)) for member in members)
 
-    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> None:
-        store = self._sorted_sets.get(key, {})
-        for member, score in list(store.items()):
-            if min_score <= score <= max_score:
-                del store[member]
+    @_locked
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        store = self._sorted_sets.get(key)
+        if store is None:
+            return 0
+        return store.remove_range_by_score(min_score, max_score)
 
-    def set(self, key: str, value: str) -> None:
-        self._strings[key] = value
+    @_locked
+    def zcard(self, key: str) -> int:
+        store = self._sorted_sets.get(key)
+        return len(store) if store is not None else 0
 
+    @_locked
+    def set(self, key: str, value: str | bytes) -> bool:
+        self._strings[key] = _encode_value(value)
+        return True
+
+    @_locked
+    def mset(self, mapping: Dict[str, str | bytes]) -> bool:
+        for key, value in mapping.items():
+            self._strings[key] = _encode_value(value)
+        return True
+
+    @_locked
     def get(self, key: str) -> Optional[bytes]:
-        value = self._strings.get(key)
-        return value.encode() if value is not None else None
+        return self._strings.get(key)
+
+    @_locked
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        return [self._strings.get(key) for key in keys]
+
+    @_locked
+    def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._strings.get(key, b"0")) + amount
+        self._strings[key] = str(value).encode()
+        return value
 
-    def flushall(self) -> None:
+    @_locked
+    def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            removed += int(self._sorted_sets.pop(key, None) is not None)
+            removed += int(self._strings.pop(key, None) is not None)
+        return removed
+
+    @_locked
+    def flushall(self) -> bool:
         self._sorted_sets.clear()
         self._strings.clear()
+        return True
+
+
+LeaderboardClient = Union[InMemoryRedis, RespClient, ShardedClient]
+
+EVENT_FORMAT_VERSION = 1
+# version, score, occurred_at; then player_id, country and city length-prefixed.
+_EVENT_HEADER = struct.Struct("<Bdd")
+_FIELD_LENGTH = struct.Struct("<H")
+_NULL_FIELD = 0xFFFF
+# Longest UTF-8 player_id, country or city an event may carry; 0xFFFF marks null.
+MAX_EVENT_FIELD_BYTES = _NULL_FIELD - 1
+
+
+def _check_event_fields(player_id: str, country: Optional[str], city: Optional[str]) -> None:
+    for name, value in (("player_id", player_id), ("country", country), ("city", city)):
+        if value is not None and len(value.encode()) > MAX_EVENT_FIELD_BYTES:
+            raise ValueError(f"{name} must be at most {MAX_EVENT_FIELD_BYTES} bytes")
 
 
 @dataclass
@@ -101,10 +419,908 @@ class LeaderboardEvent:
             city=data.get("city"),
         )
 
+    def encode(self) -> bytes:
+        """Pack the event for storage; the id lives in the key and is not repeated."""
+
+        _check_event_fields(self.player_id, self.country, self.city)
+        parts = [_EVENT_HEADER.pack(EVENT_FORMAT_VERSION, self.score, self.occurred_at)]
+        for value in (self.player_id, self.country, self.city):
+            if value is None:
+                parts.append(_FIELD_LENGTH.pack(_NULL_FIELD))
+                continue
+            data = value.encode()
+            parts.append(_FIELD_LENGTH.pack(len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, event_id: str, payload: bytes) -> "LeaderboardEvent":
+        """Decode a stored payload, accepting both packed and legacy JSON encodings."""
+
+        if payload[:1] == b"{":
+            return cls.deserialize(payload.decode())
+        version, score, occurred_at = _EVENT_HEADER.unpack_from(payload, 0)
+        if version != EVENT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported event encoding version {version}")
+        offset = _EVENT_HEADER.size
+        fields: List[Optional[str]] = []
+        for _ in range(3):
+            (length,) = _FIELD_LENGTH.unpack_from(payload, offset)
+            offset += _FIELD_LENGTH.size
+            if length == _NULL_FIELD:
+                fields.append(None)
+                continue
+            fields.append(payload[offset : offset + length].decode())
+            offset += length
+        player_id, country, city = fields
+        return cls(
+            event_id=event_id,
+            player_id=player_id or "",
+            score=score,
+            occurred_at=occurred_at,
+            country=country,
+            city=city,
+        )
+
+    @classmethod
+    def decode_many(
+        cls,
+        event_ids: Sequence[object],
+        payloads: Sequence[Optional[bytes]],
+    ) -> List["LeaderboardEvent"]:
+        """Decode one page of ``MGET`` results, skipping ids whose payload is gone."""
+
+        return [
+            cls.decode(_decode_member(event_id), payload)
+            for event_id, payload in zip(event_ids, payloads)
+            if payload
+        ]
+
+
+class EventIdAllocator:
+    """Hands out short, increasing event ids from blocks reserved with ``INCRBY``.
+
+    Ids are base-36 counters, so they stay a few characters long for the life of
+    the deployment. Each process reserves ``block_size`` ids per round trip; ids
+    are monotonic within a process and unique across processes.
+    """
+
+    def __init__(self, client: "LeaderboardClient", *, key: str = "leaderboard:event_seq", block_size: int = 1000) -> None:
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self._client = client
+        self._key = key
+        self._block_size = block_size
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+        with self._lock:
+            if self._next >= self._limit:
+                self._limit = int(self._client.incrby(self._key, self._block_size)) + 1
+                self._next = self._limit - self._block_size
+            value = self._next
+            self._next += 1
+        return _base36(value)
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    encoded = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        encoded = digits[remainder] + encoded
+        if value == 0:
+            return encoded
+
+
+class WindowEngine:
+    """Keeps the members of a score key limited to a trailing time window.
+
+    Writes and expiry lookups are queued on the caller's pipeline so a submission
+    stays a single round trip; ``queue_expiry_lookup`` must queue exactly one
+    command whose reply is later handed to ``queue_drop_expired``.
+
+    Engines can also expire incrementally: ``expiry_due`` tells a scheduler when
+    an event's entry ages out and ``prune_slice`` removes a bounded batch.
+    """
+
+    def queue_expiry_lookup(self, pipe: Pipeline, score_key: str, window_seconds: int, now: float) -> None:
+        raise NotImplementedError
+
+    def queue_drop_expired(self, pipe: Pipeline, score_key: str, expired: Sequence[bytes]) -> None:
+        raise NotImplementedError
+
+    def queue_record(self, pipe: Pipeline, score_key: str, event: LeaderboardEvent) -> None:
+        self.queue_record_many(pipe, score_key, [event])
+
+    def queue_record_many(self, pipe: Pipeline, score_key: str, events: Sequence[LeaderboardEvent]) -> None:
+        raise NotImplementedError
+
+    def top_event_ids(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> List[bytes]:
+        """Prune everything that expired, then return the top ``limit`` ids."""
+        raise NotImplementedError
+
+    def read_clean(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> Optional[List[bytes]]:
+        """Return the top ids without pruning, or ``None`` if expired entries are still present."""
+        raise NotImplementedError
+
+    def expiry_due(self, event: LeaderboardEvent, window_seconds: int) -> float:
+        raise NotImplementedError
+
+    def prune_slice(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        now: float,
+        max_entries: int,
+    ) -> Optional[float]:
+        """Remove at most ``max_entries`` expired entries; returns when the key is next due."""
+        raise NotImplementedError
+
+
+class PruningWindowEngine(WindowEngine):
+    """Exact windows: a timestamp sorted set per score key, pruned per event."""
+
+    def _timestamp_key(self, score_key: str) -> str:
+        return f"{score_key}:timestamps"
+
+    def queue_expiry_lookup(self, pipe: Pipeline, score_key: str, window_seconds: int, now: float) -> None:
+        pipe.zrangebyscore(self._timestamp_key(score_key), 0, now - window_seconds)
+
+    def queue_drop_expired(self, pipe: Pipeline, score_key: str, expired: Sequence[bytes]) -> None:
+        if expired:
+            pipe.zrem(score_key, *expired)
+            pipe.zrem(self._timestamp_key(score_key), *expired)
+
+    def queue_record_many(self, pipe: Pipeline, score_key: str, events: Sequence[LeaderboardEvent]) -> None:
+        pipe.zadd(score_key, {event.event_id: event.score for event in events})
+        pipe.zadd(self._timestamp_key(score_key), {event.event_id: event.occurred_at for event in events})
+
+    def top_event_ids(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> List[bytes]:
+        expired = client.zrangebyscore(self._timestamp_key(score_key), 0, now - window_seconds)
+        pipe = client.pipeline()
+        self.queue_drop_expired(pipe, score_key, expired)
+        pipe.zrevrange(score_key, 0, limit - 1)
+        return pipe.execute()[-1]
+
+    def read_clean(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> Optional[List[bytes]]:
+        pipe = client.pipeline()
+        pipe.zrangebyscore(self._timestamp_key(score_key), 0, now - window_seconds, 0, 1)
+        pipe.zrevrange(score_key, 0, limit - 1)
+        expired, event_ids = pipe.execute()
+        return None if expired else event_ids
+
+    def expiry_due(self, event: LeaderboardEvent, window_seconds: int) -> float:
+        return event.occurred_at + window_seconds
+
+    def prune_slice(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        now: float,
+        max_entries: int,
+    ) -> Optional[float]:
+        timestamp_key = self._timestamp_key(score_key)
+        expired = client.zrangebyscore(timestamp_key, 0, now - window_seconds, 0, max_entries)
+        pipe = client.pipeline()
+        self.queue_drop_expired(pipe, score_key, expired)
+        pipe.zrange_withscores(timestamp_key, 0, 0)
+        oldest = pipe.execute()[-1]
+        if not oldest:
+            return None
+        return oldest[0][1] + window_seconds
+
+
+class BucketedWindowEngine(WindowEngine):
+    """Windows assembled from fixed-width time buckets, one sorted set each.
+
+    A bucket index (``{score_key}:buckets``, scored by bucket number) lists the
+    buckets that hold data. Expiry deletes whole buckets and reads merge the top
+    ``limit`` of every live bucket, so neither depends on how many events aged out
+    since the last call. Windows are accurate to one bucket: the oldest live bucket
+    may hold events up to ``bucket_seconds`` older than the window start.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600) -> None:
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+
+    def _index_key(self, score_key: str) -> str:
+        return f"{score_key}:buckets"
+
+    def _bucket_key(self, score_key: str, bucket: object) -> str:
+        return f"{score_key}:bucket:{_decode_member(bucket)}"
+
+    def _first_live_bucket(self, window_seconds: int, now: float) -> int:
+        return int((now - window_seconds) // self.bucket_seconds)
+
+    def _bucket_expiry(self, bucket: float, window_seconds: int) -> float:
+        return (bucket + 1) * self.bucket_seconds + window_seconds
+
+    def queue_expiry_lookup(self, pipe: Pipeline, score_key: str, window_seconds: int, now: float) -> None:
+        pipe.zrangebyscore(self._index_key(score_key), -math.inf, self._first_live_bucket(window_seconds, now) - 1)
+
+    def queue_drop_expired(self, pipe: Pipeline, score_key: str, expired: Sequence[bytes]) -> None:
+        if expired:
+            pipe.delete(*[self._bucket_key(score_key, bucket) for bucket in expired])
+            pipe.zrem(self._index_key(score_key), *expired)
+
+    def queue_record_many(self, pipe: Pipeline, score_key: str, events: Sequence[LeaderboardEvent]) -> None:
+        by_bucket: Dict[int, Dict[str, float]] = {}
+        for event in events:
+            by_bucket.setdefault(int(event.occurred_at // self.bucket_seconds), {})[event.event_id] = event.score
+        for bucket, mapping in by_bucket.items():
+            pipe.zadd(self._bucket_key(score_key, bucket), mapping)
+        pipe.zadd(self._index_key(score_key), {str(bucket): bucket for bucket in by_bucket})
+
+    def _merge_live(self, pipe: Pipeline, score_key: str, live: Sequence[bytes], limit: int) -> List[bytes]:
+        skipped = len(pipe)
+        for bucket in live:
+            pipe.zrevrange_withscores(self._bucket_key(score_key, bucket), 0, limit - 1)
+        per_bucket = pipe.execute()[skipped:]
+        # Each bucket is already sorted by score; ties favour older buckets.
+        merged = heapq.merge(*per_bucket, key=lambda item: -item[1])
+        return [member for member, _ in islice(merged, max(limit, 0))]
+
+    def top_event_ids(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> List[bytes]:
+        first_live = self._first_live_bucket(window_seconds, now)
+        lookup = client.pipeline()
+        self.queue_expiry_lookup(lookup, score_key, window_seconds, now)
+        lookup.zrangebyscore(self._index_key(score_key), first_live, math.inf)
+        expired, live = lookup.execute()
+
+        pipe = client.pipeline()
+        self.queue_drop_expired(pipe, score_key, expired)
+        return self._merge_live(pipe, score_key, live, limit)
+
+    def read_clean(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> Optional[List[bytes]]:
+        # Only live buckets are read, so leftover expired buckets never leak in.
+        live = client.zrangebyscore(self._index_key(score_key), self._first_live_bucket(window_seconds, now), math.inf)
+        return self._merge_live(client.pipeline(), score_key, live, limit)
+
+    def expiry_due(self, event: LeaderboardEvent, window_seconds: int) -> float:
+        return self._bucket_expiry(event.occurred_at // self.bucket_seconds, window_seconds)
+
+    def prune_slice(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        now: float,
+        max_entries: int,
+    ) -> Optional[float]:
+        index_key = self._index_key(score_key)
+        last_expired = self._first_live_bucket(window_seconds, now) - 1
+        expired = client.zrangebyscore(index_key, -math.inf, last_expired, 0, max_entries)
+        pipe = client.pipeline()
+        self.queue_drop_expired(pipe, score_key, expired)
+        pipe.zrange_withscores(index_key, 0, 0)
+        oldest = pipe.execute()[-1]
+        if not oldest:
+            return None
+        return self._bucket_expiry(oldest[0][1], window_seconds)
+
+
+@dataclass(frozen=True)
+class RankedPlayer:
+    rank: int
+    player_id: str
+    score: float
+
+
+@dataclass(frozen=True)
+class PlayerRank:
+    """A player's standing; ``neighbours`` includes the player, ordered by rank."""
+
+    player_id: str
+    rank: int
+    score: float
+    total: int
+    neighbours: List[RankedPlayer]
+
+
+def _rank_in(
+    client: "LeaderboardClient",
+    key: str,
+    player_id: str,
+    neighbours: int,
+    attempts: int = 3,
+) -> Optional[PlayerRank]:
+    """Competition rank of ``player_id`` in the player-scored sorted set ``key``.
+
+    The lookup spans several round trips. A write, expiry or bucket drop that
+    lands in between can empty the neighbour window or move the player out of
+    it, in which case the lookup starts over, and gives ``None`` after
+    ``attempts`` tries.
+    """
+
+    for _ in range(attempts):
+        lookup = client.pipeline(transaction=True)
+        lookup.zscore(key, player_id)
+        lookup.zrevrank(key, player_id)
+        lookup.zcard(key)
+        score, position, total = lookup.execute()
+        if score is None or position is None:
+            return None
+        first = max(position - neighbours, 0)
+        window = client.zrevrange_withscores(key, first, position + neighbours)
+        if not window:
+            continue
+        # Ties share a rank, so the first row's rank counts strictly higher scores.
+        ahead_of_first = client.zcount(key, math.nextafter(window[0][1], math.inf), math.inf)
+
+        standings: List[RankedPlayer] = []
+        rank = ahead_of_first + 1
+        for offset, (member, member_score) in enumerate(window):
+            if standings and member_score != standings[-1].score:
+                rank = first + offset + 1
+            standings.append(RankedPlayer(rank=rank, player_id=_decode_member(member), score=member_score))
+        own = next((entry for entry in standings if entry.player_id == player_id), None)
+        if own is None:
+            continue
+        return PlayerRank(player_id=player_id, rank=own.rank, score=own.score, total=total, neighbours=standings)
+    return None
+
+
+class PlayerBestView:
+    """Ready-to-serve per-player best entries, kept per time bucket.
+
+    Each bucket sorted set (``{score_key}:players:{bucket}``) holds at most one
+    row per player: the JSON-encoded player id, a newline, then the serialized
+    event. An owner key per bucket and player points at the current row so a
+    write only replaces it when the new score beats it. A window read merges
+    the top ``limit`` rows of each live bucket, which is exact because a player
+    in the overall top ``limit`` is also within ``limit`` of their best bucket.
+    Like ``BucketedWindowEngine``, windows are accurate to one bucket.
+
+    For rank lookups each player also has a sorted set of their per-bucket
+    bests, and ``{score_key}:player-best`` holds every player's best across the
+    live buckets. Writes raise it with ``ZADD GT``; when a bucket expires the
+    affected players are re-derived from their remaining buckets.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600) -> None:
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+
+    def _index_key(self, score_key: str) -> str:
+        return f"{score_key}:players:buckets"
+
+    def _view_key(self, score_key: str, bucket: object) -> str:
+        return f"{score_key}:players:{_decode_member(bucket)}"
+
+    def _owner_key(self, score_key: str, bucket: object, player_id: str) -> str:
+        return f"{self._view_key(score_key, bucket)}:{player_id}"
+
+    def _best_key(self, score_key: str) -> str:
+        return f"{score_key}:player-best"
+
+    def _player_buckets_key(self, score_key: str, player_id: str) -> str:
+        return f"{score_key}:player-buckets:{player_id}"
+
+    def _bucket(self, occurred_at: float) -> int:
+        return int(occurred_at // self.bucket_seconds)
+
+    def _first_live_bucket(self, window_seconds: int, now: float) -> int:
+        return int((now - window_seconds) // self.bucket_seconds)
+
+    def _bucket_expiry(self, bucket: float, window_seconds: int) -> float:
+        return (bucket + 1) * self.bucket_seconds + window_seconds
+
+    @staticmethod
+    def _row(event: LeaderboardEvent) -> str:
+        return f"{json.dumps(event.player_id)}\n{event.serialize()}"
+
+    @staticmethod
+    def _row_event(row: bytes) -> LeaderboardEvent:
+        return LeaderboardEvent.deserialize(row.split(b"\n", 1)[1].decode())
+
+    def best_per_player(self, events: Sequence[LeaderboardEvent]) -> List[LeaderboardEvent]:
+        """Collapse ``events`` to the best one per bucket and player, first wins on ties."""
+
+        best: Dict[Tuple[int, str], LeaderboardEvent] = {}
+        for event in events:
+            slot = (self._bucket(event.occurred_at), event.player_id)
+            if slot not in best or event.score > best[slot].score:
+                best[slot] = event
+        return list(best.values())
+
+    def queue_current(self, pipe: Pipeline, score_key: str, event: LeaderboardEvent) -> None:
+        pipe.get(self._owner_key(score_key, self._bucket(event.occurred_at), event.player_id))
+
+    def queue_update(self, pipe: Pipeline, score_key: str, event: LeaderboardEvent, current: Optional[bytes]) -> None:
+        """Queue the row replacement if ``event`` beats the player's ``current`` row."""
+
+        if current and self._row_event(current).score >= event.score:
+            return
+        bucket = self._bucket(event.occurred_at)
+        view_key = self._view_key(score_key, bucket)
+        row = self._row(event)
+        if current:
+            pipe.zrem(view_key, current)
+        pipe.zadd(view_key, {row: event.score})
+        pipe.set(self._owner_key(score_key, bucket, event.player_id), row)
+        pipe.zadd(self._index_key(score_key), {str(bucket): bucket})
+        pipe.zadd(self._player_buckets_key(score_key, event.player_id), {str(bucket): event.score})
+        pipe.zadd(self._best_key(score_key), {event.player_id: event.score}, gt=True)
+
+    def queue_expiry_lookup(self, pipe: Pipeline, score_key: str, window_seconds: int, now: float) -> None:
+        pipe.zrangebyscore(self._index_key(score_key), -math.inf, self._first_live_bucket(window_seconds, now) - 1)
+
+    def drop_buckets(self, client: LeaderboardClient, score_key: str, buckets: Sequence[bytes]) -> None:
+        if not buckets:
+            return
+        listing = client.pipeline()
+        for bucket in buckets:
+            listing.zrevrange(self._view_key(score_key, bucket), 0, -1)
+        keys: List[str] = []
+        affected: Dict[str, List[bytes]] = {}
+        for bucket, rows in zip(buckets, listing.execute()):
+            keys.append(self._view_key(score_key, bucket))
+            for row in rows:
+                player_id = json.loads(row.split(b"\n", 1)[0])
+                keys.append(self._owner_key(score_key, bucket, player_id))
+                affected.setdefault(player_id, []).append(bucket)
+        pipe = client.pipeline()
+        pipe.delete(*keys)
+        pipe.zrem(self._index_key(score_key), *buckets)
+        players = list(affected)
+        for player_id in players:
+            buckets_key = self._player_buckets_key(score_key, player_id)
+            pipe.zrem(buckets_key, *affected[player_id])
+            pipe.zrevrange_withscores(buckets_key, 0, 0)
+        results = pipe.execute()[2:]
+        self._rederive_bests(client, score_key, players, results[1::2])
+
+    def _rederive_bests(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        players: Sequence[str],
+        remaining: Sequence[List[Tuple[bytes, float]]],
+    ) -> None:
+        # A write landing between the read above and this update can be lowered
+        # again until that player's next write; the view rows stay exact.
+        if not players:
+            return
+        best_key = self._best_key(score_key)
+        pipe = client.pipeline()
+        for player_id, top in zip(players, remaining):
+            if top:
+                pipe.zadd(best_key, {player_id: top[0][1]})
+            else:
+                pipe.zrem(best_key, player_id)
+        pipe.execute()
+
+    def _drop_expired(self, client: LeaderboardClient, score_key: str, window_seconds: int, now: float) -> None:
+        last_expired = self._first_live_bucket(window_seconds, now) - 1
+        self.drop_buckets(client, score_key, client.zrangebyscore(self._index_key(score_key), -math.inf, last_expired))
+
+    def rank(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        player_id: str,
+        neighbours: int,
+        now: float,
+    ) -> Optional["PlayerRank"]:
+        """Competition rank, score and surrounding players in O(log n) lookups."""
+
+        # Expiry may have fallen behind; settle the bests before ranking on them.
+        self._drop_expired(client, score_key, window_seconds, now)
+        return _rank_in(client, self._best_key(score_key), player_id, neighbours)
+
+    def expiry_due(self, event: LeaderboardEvent, window_seconds: int) -> float:
+        return self._bucket_expiry(self._bucket(event.occurred_at), window_seconds)
+
+    def prune_slice(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        now: float,
+        max_entries: int,
+    ) -> Optional[float]:
+        index_key = self._index_key(score_key)
+        last_expired = self._first_live_bucket(window_seconds, now) - 1
+        self.drop_buckets(client, score_key, client.zrangebyscore(index_key, -math.inf, last_expired, 0, max_entries))
+        oldest = client.zrange_withscores(index_key, 0, 0)
+        if not oldest:
+            return None
+        return self._bucket_expiry(oldest[0][1], window_seconds)
+
+    def read_top(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+    ) -> List[LeaderboardEvent]:
+        live = client.zrangebyscore(self._index_key(score_key), self._first_live_bucket(window_seconds, now), math.inf)
+        pipe = client.pipeline()
+        for bucket in live:
+            pipe.zrevrange_withscores(self._view_key(score_key, bucket), 0, limit - 1)
+        merged = heapq.merge(*pipe.execute(), key=lambda item: -item[1])
+        seen: set = set()
+        rows: List[bytes] = []
+        for row, _ in merged:
+            if len(rows) >= limit:
+                break
+            player = row.split(b"\n", 1)[0]
+            if player in seen:
+                continue
+            seen.add(player)
+            rows.append(row)
+        return [self._row_event(row) for row in rows]
+
+
+class PlayerTotalsView:
+    """Per-player windowed totals for counter metrics such as most hits.
+
+    Writes are blind ``ZINCRBY`` calls, one into the player's count for the event's
+    time bucket (``{score_key}:totals:{bucket}``) and one into the running window
+    total (``{score_key}:totals``), so recording adds commands but no reads or
+    round trips. When a bucket leaves the window it is read and deleted in one
+    transaction and its counts are subtracted from the totals, which keeps a
+    top-k read to a single range over ready totals instead of a sum over events.
+    Windows are accurate to one bucket; writes for buckets already outside the
+    window are ignored so an expired bucket is never recreated.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600) -> None:
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+
+    def _index_key(self, score_key: str) -> str:
+        return f"{score_key}:totals:buckets"
+
+    def _bucket_key(self, score_key: str, bucket: object) -> str:
+        return f"{score_key}:totals:{_decode_member(bucket)}"
+
+    def _totals_key(self, score_key: str) -> str:
+        return f"{score_key}:totals"
+
+    def _last_seen_key(self, score_key: str) -> str:
+        return f"{score_key}:totals:last-seen"
+
+    def _bucket(self, occurred_at: float) -> int:
+        return int(occurred_at // self.bucket_seconds)
+
+    def _first_live_bucket(self, window_seconds: int, now: float) -> int:
+        return int((now - window_seconds) // self.bucket_seconds)
+
+    def _bucket_expiry(self, bucket: float, window_seconds: int) -> float:
+        return (bucket + 1) * self.bucket_seconds + window_seconds
+
+    def queue_record_many(
+        self,
+        pipe: Pipeline,
+        score_key: str,
+        window_seconds: int,
+        events: Sequence[LeaderboardEvent],
+        now: float,
+    ) -> None:
+        first_live = self._first_live_bucket(window_seconds, now)
+        counts: Dict[Tuple[int, str], float] = {}
+        last_seen: Dict[str, float] = {}
+        for event in events:
+            bucket = self._bucket(event.occurred_at)
+            if bucket < first_live:
+                continue
+            counts[(bucket, event.player_id)] = counts.get((bucket, event.player_id), 0.0) + event.score
+            last_seen[event.player_id] = max(last_seen.get(event.player_id, -math.inf), event.occurred_at)
+        if not counts:
+            return
+        totals: Dict[str, float] = {}
+        for (bucket, player_id), amount in counts.items():
+            pipe.zincrby(self._bucket_key(score_key, bucket), amount, player_id)
+            totals[player_id] = totals.get(player_id, 0.0) + amount
+        pipe.zadd(self._index_key(score_key), {str(bucket): bucket for bucket, _ in counts})
+        for player_id, amount in totals.items():
+            pipe.zincrby(self._totals_key(score_key), amount, player_id)
+        pipe.zadd(self._last_seen_key(score_key), last_seen, gt=True)
+
+    def queue_expiry_lookup(self, pipe: Pipeline, score_key: str, window_seconds: int, now: float) -> None:
+        pipe.zrangebyscore(self._index_key(score_key), -math.inf, self._first_live_bucket(window_seconds, now) - 1)
+
+    def drop_buckets(self, client: LeaderboardClient, score_key: str, buckets: Sequence[bytes]) -> None:
+        if not buckets:
+            return
+        # Reading and deleting together means no increment is subtracted twice or lost.
+        take = client.pipeline(transaction=True)
+        for bucket in buckets:
+            take.zrange_withscores(self._bucket_key(score_key, bucket), 0, -1)
+        take.delete(*[self._bucket_key(score_key, bucket) for bucket in buckets])
+        take.zrem(self._index_key(score_key), *buckets)
+        expired: Dict[str, float] = {}
+        for rows in take.execute()[: len(buckets)]:
+            for member, count in rows:
+                player_id = _decode_member(member)
+                expired[player_id] = expired.get(player_id, 0.0) + count
+        if not expired:
+            return
+        totals_key = self._totals_key(score_key)
+        pipe = client.pipeline()
+        for player_id, count in expired.items():
+            pipe.zincrby(totals_key, -count, player_id)
+        pipe.zremrangebyscore(totals_key, -math.inf, 0)
+        remaining = pipe.execute()[:-1]
+        gone = [player_id for player_id, total in zip(expired, remaining) if total <= 0]
+        if gone:
+            client.zrem(self._last_seen_key(score_key), *gone)
+
+    def _drop_expired(self, client: LeaderboardClient, score_key: str, window_seconds: int, now: float) -> None:
+        last_expired = self._first_live_bucket(window_seconds, now) - 1
+        self.drop_buckets(client, score_key, client.zrangebyscore(self._index_key(score_key), -math.inf, last_expired))
+
+    def expiry_due(self, event: LeaderboardEvent, window_seconds: int) -> float:
+        return self._bucket_expiry(self._bucket(event.occurred_at), window_seconds)
+
+    def prune_slice(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        now: float,
+        max_entries: int,
+    ) -> Optional[float]:
+        index_key = self._index_key(score_key)
+        last_expired = self._first_live_bucket(window_seconds, now) - 1
+        self.drop_buckets(client, score_key, client.zrangebyscore(index_key, -math.inf, last_expired, 0, max_entries))
+        oldest = client.zrange_withscores(index_key, 0, 0)
+        if not oldest:
+            return None
+        return self._bucket_expiry(oldest[0][1], window_seconds)
+
+    def read_top(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        limit: int,
+        now: float,
+        location: Tuple[Optional[str], Optional[str]] = (None, None),
+    ) -> List[LeaderboardEvent]:
+        """Top players by window total; ``occurred_at`` is each player's latest counted event."""
+
+        pipe = client.pipeline()
+        self.queue_expiry_lookup(pipe, score_key, window_seconds, now)
+        pipe.zrevrange_withscores(self._totals_key(score_key), 0, limit - 1)
+        expired, top = pipe.execute()
+        if expired:
+            # Expiry has fallen behind; settle the totals before serving them.
+            self.drop_buckets(client, score_key, expired)
+            top = client.zrevrange_withscores(self._totals_key(score_key), 0, limit - 1)
+        if not top:
+            return []
+        seen = client.pipeline()
+        for member, _ in top:
+            seen.zscore(self._last_seen_key(score_key), member)
+        country, city = location
+        return [
+            LeaderboardEvent(
+                event_id="",
+                player_id=_decode_member(member),
+                score=total,
+                occurred_at=last_seen or 0.0,
+                country=country,
+                city=city,
+            )
+            for (member, total), last_seen in zip(top, seen.execute())
+        ]
+
+    def rank(
+        self,
+        client: LeaderboardClient,
+        score_key: str,
+        window_seconds: int,
+        player_id: str,
+        neighbours: int,
+        now: float,
+    ) -> Optional[PlayerRank]:
+        self._drop_expired(client, score_key, window_seconds, now)
+        return _rank_in(client, self._totals_key(score_key), player_id, neighbours)
+
+
+def _earliest(first: Optional[float], second: Optional[float]) -> Optional[float]:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first, second)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Rendered response body; shared between requests, so treat it as read-only."""
+
+    body: Dict[str, object]
+    etag: str
+    expires_at: float
+
+
+def compute_etag(body: object) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha1(canonical.encode()).hexdigest()[:20]}"'
+
+
+class LeaderboardResponseCache:
+    """Rendered leaderboard responses keyed by score key, kept for a short TTL.
+
+    Submissions invalidate the keys they touch in this process and the TTL bounds
+    staleness from writes made elsewhere. A per-key generation stops a read that
+    raced with a write from caching its already stale result.
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: Dict[str, CachedResponse] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            return entry
+
+    def put(self, key: str, body: Dict[str, object], generation: int) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=compute_etag(body), expires_at=self._clock() + self.ttl_seconds)
+        with self._lock:
+            if self._generations.get(key, 0) == generation and self.ttl_seconds > 0:
+                self._entries[key] = entry
+        return entry
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
 class LeaderboardService:
-    def __init__(self, client: InMemoryRedis) -> None:
+    """Windowed leaderboards stored as sorted sets kept in window by a ``WindowEngine``.
+
+    Every submission is written with a single pipelined round trip that also looks
+    up expired entries for the touched keys; a follow-up batch removes them only
+    when something actually expired.
+
+    With background expiry enabled, submissions only schedule their keys and an
+    ``ExpiryScheduler`` prunes them in bounded slices. Reads then just check that
+    the key is already clean and fall back to a synchronous prune when it is not.
+
+    An optional ``PlayerBestView`` is maintained alongside the raw events and
+    serves ``read_player_leaderboard``; updating it costs a second round trip
+    only when a player's best score for the bucket improves. An optional
+    ``LeaderboardResponseCache`` holds rendered responses between writes.
+
+    For ``COUNTER_METRICS`` an optional ``PlayerTotalsView`` replaces the best
+    view: player boards and ranks then use each player's summed window total.
+    """
+
+    def __init__(
+        self,
+        client: LeaderboardClient,
+        window_engine: Optional[WindowEngine] = None,
+        player_view: Optional[PlayerBestView] = None,
+        response_cache: Optional[LeaderboardResponseCache] = None,
+        player_totals: Optional[PlayerTotalsView] = None,
+    ) -> None:
         self._client = client
+        self._engine = window_engine or PruningWindowEngine()
+        self._view = player_view
+        self._response_cache = response_cache
+        self._totals = player_totals
+        self._ids = EventIdAllocator(client)
+        self._expiry: Optional[ExpiryScheduler] = None
+        self._slice_entries = 128
+
+    @property
+    def expiry(self) -> Optional[ExpiryScheduler]:
+        return self._expiry
+
+    def enable_background_expiry(self, *, slice_entries: int = 128, slice_seconds: float = 0.005) -> ExpiryScheduler:
+        """Move pruning off the request path; the caller starts the returned scheduler."""
+
+        if self._expiry is None:
+            self._slice_entries = max(slice_entries, 1)
+            self._expiry = ExpiryScheduler(self._expire_slice, slice_seconds=slice_seconds)
+        return self._expiry
+
+    def close(self) -> None:
+        """Stop background expiry and release backend connections."""
+
+        if self._expiry is not None:
+            self._expiry.stop()
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            close()
+
+    def _uses_totals(self, score_key: str) -> bool:
+        return self._totals is not None and score_key.split(":", 2)[1] in COUNTER_METRICS
+
+    def _player_view_for(self, score_key: str) -> Optional[Union[PlayerBestView, PlayerTotalsView]]:
+        return self._totals if self._uses_totals(score_key) else self._view
+
+    def _expire_slice(self, key: Tuple[str, int], now: float) -> Optional[float]:
+        score_key, window_seconds = key
+        next_due = self._engine.prune_slice(self._client, score_key, window_seconds, now, self._slice_entries)
+        view = self._player_view_for(score_key)
+        if view is not None:
+            view_due = view.prune_slice(self._client, score_key, window_seconds, now, self._slice_entries)
+            next_due = _earliest(next_due, view_due)
+        return next_due
+
+    def _expiry_due(self, score_key: str, event: LeaderboardEvent, window_seconds: int) -> float:
+        due = self._engine.expiry_due(event, window_seconds)
+        view = self._player_view_for(score_key)
+        if view is not None:
+            due = min(due, view.expiry_due(event, window_seconds))
+        return due
 
     def _score_key(self, metric: str, window: str, scope: str, location: Tuple[Optional[str], Optional[str]]) -> str:
         country, city = location
@@ -119,60 +1335,131 @@ class LeaderboardService:
             suffix = f"city:{country.upper()}:{city.lower()}"
         return f"leaderboard:{metric}:{window}:{suffix}"
 
-    def _timestamp_key(self, score_key: str) -> str:
-        return f"{score_key}:timestamps"
+    def _event_key(self, event_id: str) -> str:
+        return f"leaderboard:event:{event_id}"
 
-    def _prune(self, score_key: str, window_seconds: int) -> None:
-        now = time.time()
-        timestamp_key = self._timestamp_key(score_key)
-        cutoff = now - window_seconds
-        expired_ids = self._client.zrangebyscore(timestamp_key, 0, cutoff)
-        for event_id in expired_ids:
-            self._client.zrem(score_key, event_id)
-        self._client.zremrangebyscore(timestamp_key, 0, cutoff)
-
-    def _store_event(self, event: LeaderboardEvent) -> None:
-        self._client.set(f"leaderboard:event:{event.event_id}", event.serialize())
-
-    def _record(
+    def _targets(
         self,
         metric: str,
-        window: str,
-        scope: str,
+        windows: Sequence[str],
         location: Tuple[Optional[str], Optional[str]],
-        event: LeaderboardEvent,
-        window_seconds: int,
-    ) -> None:
-        score_key = self._score_key(metric, window, scope, location)
-        self._prune(score_key, window_seconds)
-        self._store_event(event)
-        self._client.zadd(score_key, {event.event_id: event.score})
-        self._client.zadd(self._timestamp_key(score_key), {event.event_id: event.occurred_at})
+    ) -> List[Tuple[str, int]]:
+        country, city = location
+        scopes = [SCOPE_GLOBAL]
+        if country:
+            scopes.append(SCOPE_COUNTRY)
+        if country and city:
+            scopes.append(SCOPE_CITY)
+        return [
+            (self._score_key(metric, window, scope, location), WINDOWS[window])
+            for window in windows
+            for scope in scopes
+        ]
 
-    def submit_hardest_shot(
+    def _submit(self, metric: str, event: LeaderboardEvent) -> None:
+        self._submit_many([(metric, event)])
+
+    def _submit_many(self, submissions: Sequence[Tuple[str, LeaderboardEvent]]) -> None:
+        """Write ``(metric, event)`` pairs grouped by score key in one pipelined batch.
+
+        Each touched key gets one expiry lookup and one batched record regardless
+        of how many submissions land on it.
+        """
+
+        grouped: Dict[str, Tuple[int, List[LeaderboardEvent]]] = {}
+        for metric, event in submissions:
+            for score_key, window_seconds in self._targets(metric, METRIC_WINDOWS[metric], (event.country, event.city)):
+                grouped.setdefault(score_key, (window_seconds, []))[1].append(event)
+        if not grouped:
+            return
+        targets = [(score_key, window_seconds) for score_key, (window_seconds, _) in grouped.items()]
+        view, totals = self._view, self._totals
+        totals_targets = [target for target in targets if self._uses_totals(target[0])]
+        view_targets = [target for target in targets if not self._uses_totals(target[0])] if view is not None else []
+        view_rows = [
+            (score_key, event)
+            for score_key, _ in view_targets
+            for event in view.best_per_player(grouped[score_key][1])
+        ]
+        background = self._expiry is not None
+        now = time.time()
+        pipe = self._client.pipeline()
+        if not background:
+            for score_key, window_seconds in targets:
+                self._engine.queue_expiry_lookup(pipe, score_key, window_seconds, now)
+            for score_key, window_seconds in view_targets:
+                view.queue_expiry_lookup(pipe, score_key, window_seconds, now)
+            for score_key, window_seconds in totals_targets:
+                totals.queue_expiry_lookup(pipe, score_key, window_seconds, now)
+        for score_key, event in view_rows:
+            view.queue_current(pipe, score_key, event)
+        pipe.mset({self._event_key(event.event_id): event.encode() for _, event in submissions})
+        for score_key, (_, events) in grouped.items():
+            self._engine.queue_record_many(pipe, score_key, events)
+        for score_key, window_seconds in totals_targets:
+            totals.queue_record_many(pipe, score_key, window_seconds, grouped[score_key][1], now)
+        results = iter(pipe.execute())
+
+        expired = [next(results) for _ in targets] if not background else []
+        view_expired = [next(results) for _ in view_targets] if not background else []
+        totals_expired = [next(results) for _ in totals_targets] if not background else []
+        current_rows = [next(results) for _ in view_rows]
+
+        cleanup = self._client.pipeline()
+        for (score_key, _), expired_entries in zip(targets, expired):
+            self._engine.queue_drop_expired(cleanup, score_key, expired_entries)
+        for (score_key, event), current in zip(view_rows, current_rows):
+            view.queue_update(cleanup, score_key, event, current)
+        if len(cleanup):
+            cleanup.execute()
+        for (score_key, _), buckets in zip(view_targets, view_expired):
+            view.drop_buckets(self._client, score_key, buckets)
+        for (score_key, _), buckets in zip(totals_targets, totals_expired):
+            totals.drop_buckets(self._client, score_key, buckets)
+        if background:
+            for score_key, (window_seconds, events) in grouped.items():
+                due = min(self._expiry_due(score_key, event, window_seconds) for event in events)
+                self._expiry.schedule((score_key, window_seconds), due)
+        if self._response_cache is not None:
+            self._response_cache.invalidate(grouped)
+
+    def new_event(
         self,
-        *,
         player_id: str,
-        ball_speed_kph: float,
+        score: float,
         occurred_at: float,
         country: Optional[str],
         city: Optional[str],
-    ) -> None:
-        event_id = uuid.uuid4().hex
-        event = LeaderboardEvent(
-            event_id=event_id,
+    ) -> LeaderboardEvent:
+        _check_event_fields(player_id, country, city)
+        return LeaderboardEvent(
+            event_id=self._ids.next_id(),
             player_id=player_id,
-            score=ball_speed_kph,
+            score=score,
             occurred_at=occurred_at,
             country=country,
             city=city,
         )
-        for window in ("24h", "7d"):
-            self._record(METRIC_HARDEST_SHOT, window, SCOPE_GLOBAL, (country, city), event, WINDOWS[window])
-            if country:
-                self._record(METRIC_HARDEST_SHOT, window, SCOPE_COUNTRY, (country, city), event, WINDOWS[window])
-            if country and city:
-                self._record(METRIC_HARDEST_SHOT, window, SCOPE_CITY, (country, city), event, WINDOWS[window])
+
+    def submit_batch(self, submissions: Sequence[Tuple[str, LeaderboardEvent]]) -> None:
+        """Record many ``(metric, event)`` submissions; build events with ``new_event``."""
+
+        unknown = sorted({metric for metric, _ in submissions if metric not in METRIC_WINDOWS})
+        if unknown:
+            raise ValueError(f"Unsupported metric(s): {', '.join(unknown)}")
+        self._submit_many(submissions)
+
+    def submit_hardest_shot(
+        self,
+        *,
+        player_id: str,
+        ball_speed_kph: float,
+        occurred_at: float,
+        country: Optional[str],
+        city: Optional[str],
+    ) -> None:
+        event = self.new_event(player_id, ball_speed_kph, occurred_at, country, city)
+        self._submit(METRIC_HARDEST_SHOT, event)
 
     def submit_most_hits(
         self,
@@ -183,30 +1470,14 @@ class LeaderboardService:
         country: Optional[str],
         city: Optional[str],
     ) -> None:
-        event_id = uuid.uuid4().hex
-        event = LeaderboardEvent(
-            event_id=event_id,
-            player_id=player_id,
-            score=float(hits),
-            occurred_at=occurred_at,
-            country=country,
-            city=city,
-        )
-        window = "7d"
-        self._record(METRIC_MOST_HITS, window, SCOPE_GLOBAL, (country, city), event, WINDOWS[window])
-        if country:
-            self._record(METRIC_MOST_HITS, window, SCOPE_COUNTRY, (country, city), event, WINDOWS[window])
-        if country and city:
-            self._record(METRIC_MOST_HITS, window, SCOPE_CITY, (country, city), event, WINDOWS[window])
+        event = self.new_event(player_id, float(hits), occurred_at, country, city)
+        self._submit(METRIC_MOST_HITS, event)
 
-    def _collect_events(self, event_ids: Iterable[bytes]) -> List[LeaderboardEvent]:
-        events: List[LeaderboardEvent] = []
-        for event_id in event_ids:
-            payload = self._client.get(f"leaderboard:event:{event_id.decode()}")
-            if not payload:
-                continue
-            events.append(LeaderboardEvent.deserialize(payload.decode()))
-        return events
+    def _collect_events(self, event_ids: Sequence[bytes]) -> List[LeaderboardEvent]:
+        if not event_ids:
+            return []
+        payloads = self._client.mget(*[self._event_key(event_id.decode()) for event_id in event_ids])
+        return LeaderboardEvent.decode_many(event_ids, payloads)
 
     def read_leaderboard(
         self,
@@ -222,10 +1493,92 @@ class LeaderboardService:
         if window_seconds is None:
             raise ValueError(f"Unsupported window {window}")
         score_key = self._score_key(metric, window, scope, (country, city))
-        self._prune(score_key, window_seconds)
-        event_ids = self._client.zrevrange(score_key, 0, limit - 1)
+        now = time.time()
+        event_ids = None
+        if self._expiry is not None:
+            event_ids = self._engine.read_clean(self._client, score_key, window_seconds, limit, now)
+        if event_ids is None:
+            event_ids = self._engine.top_event_ids(self._client, score_key, window_seconds, limit, now)
         return self._collect_events(event_ids)
 
+    def read_player_leaderboard(
+        self,
+        *,
+        metric: str,
+        window: str,
+        scope: str,
+        country: Optional[str],
+        city: Optional[str],
+        limit: int = 10,
+    ) -> List[LeaderboardEvent]:
+        """Each player's best event in the window, or their window total for counter metrics.
+
+        Without a matching view this is the raw event board.
+        """
+
+        score_key = self._score_key(metric, window, scope, (country, city))
+        if self._uses_totals(score_key):
+            window_seconds = WINDOWS.get(window)
+            if window_seconds is None:
+                raise ValueError(f"Unsupported window {window}")
+            location = (country if scope != SCOPE_GLOBAL else None, city if scope == SCOPE_CITY else None)
+            return self._totals.read_top(self._client, score_key, window_seconds, limit, time.time(), location)
+        if self._view is None:
+            return self.read_leaderboard(
+                metric=metric, window=window, scope=scope, country=country, city=city, limit=limit
+            )
+        window_seconds = WINDOWS.get(window)
+        if window_seconds is None:
+            raise ValueError(f"Unsupported window {window}")
+        return self._view.read_top(self._client, score_key, window_seconds, limit, time.time())
+
+    def player_rank(
+        self,
+        *,
+        metric: str,
+        window: str,
+        scope: str,
+        country: Optional[str],
+        city: Optional[str],
+        player_id: str,
+        neighbours: int = 2,
+    ) -> Optional[PlayerRank]:
+        """The player's rank on the player board, or ``None`` if they have no live entry."""
+
+        if window not in WINDOWS:
+            raise ValueError(f"Unsupported window {window}")
+        score_key = self._score_key(metric, window, scope, (country, city))
+        if self._uses_totals(score_key):
+            return self._totals.rank(self._client, score_key, WINDOWS[window], player_id, max(neighbours, 0), time.time())
+        if self._view is None:
+            raise ValueError("rank lookups require a PlayerBestView")
+        return self._view.rank(self._client, score_key, WINDOWS[window], player_id, max(neighbours, 0), time.time())
+
+    def leaderboard_response(
+        self,
+        *,
+        metric: str,
+        window: str,
+        scope: str,
+        country: Optional[str],
+        city: Optional[str],
+        render: Callable[[List[LeaderboardEvent]], Dict[str, object]],
+    ) -> CachedResponse:
+        """Rendered player leaderboard, served from the response cache while fresh."""
+
+        score_key = self._score_key(metric, window, scope, (country, city))
+        cache = self._response_cache
+        if cache is not None:
+            cached = cache.get(score_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation(score_key)
+        events = self.read_player_leaderboard(metric=metric, window=window, scope=scope, country=country, city=city)
+        body = render(events)
+        if cache is None:
+            return CachedResponse(body=body, etag=compute_etag(body), expires_at=0.0)
+        return cache.put(score_key, body, generation)
+
 
 def _normalize_country(value: Optional[str]) -> Optional[str]:
     return value.upper() if isinstance(value, str) and value else None
@@ -256,15 +1609,97 @@ def _parse_location(payload: Optional[Dict[str, object]]) -> Tuple[Optional[str]
     return country, city
 
 
+def _window_engine_from_env() -> WindowEngine:
+    engine = os.environ.get("LEADERBOARD_WINDOW_ENGINE", "prune").lower()
+    if engine == "bucketed":
+        return BucketedWindowEngine(int(os.environ.get("LEADERBOARD_BUCKET_SECONDS", "3600")))
+    if engine != "prune":
+        raise ValueError(f"Unsupported leaderboard window engine: {engine}")
+    return PruningWindowEngine()
+
+
+_RESPONSE_CACHE = LeaderboardResponseCache(float(os.environ.get("LEADERBOARD_CACHE_TTL_SECONDS", "2")))
+
+
+def score_key_tag(key: str) -> str:
+    """Shard routing tag: keys derived from a score key hash as that score key.
+
+    A board's sorted set, timestamp index, buckets and player view are read and
+    written together in one pipeline, so they must live on the same backend.
+    Event payloads and other keys hash on their own and spread across shards.
+    """
+
+    parts = key.split(":")
+    if len(parts) >= 4 and parts[0] == "leaderboard" and parts[1] in METRIC_WINDOWS:
+        width = _SCORE_KEY_PARTS.get(parts[3])
+        if width is not None and len(parts) >= width:
+            return ":".join(parts[:width])
+    return key
+
+
+def _client_from_env() -> LeaderboardClient:
+    """``LEADERBOARD_REDIS_URL`` may list several comma-separated backends to shard across.
+
+    Without a URL the store is in-process; ``LEADERBOARD_DATA_DIR`` makes it durable.
+    """
+
+    urls = [url.strip() for url in os.environ.get("LEADERBOARD_REDIS_URL", "").split(",") if url.strip()]
+    pool_size = int(os.environ.get("LEADERBOARD_REDIS_POOL_SIZE", "16"))
+    if not urls:
+        data_dir = os.environ.get("LEADERBOARD_DATA_DIR")
+        if data_dir:
+            from server.persistence import DurableRedis  # persistence builds on this module
+
+            return DurableRedis(
+                data_dir,
+                fsync_every_ops=int(os.environ.get("LEADERBOARD_FSYNC_EVERY_OPS", "1000")),
+                fsync_interval=float(os.environ.get("LEADERBOARD_FSYNC_INTERVAL_MS", "50")) / 1000.0,
+            )
+        return InMemoryRedis()
+    if len(urls) == 1:
+        return RespClient.from_url(urls[0], max_connections=pool_size)
+    return ShardedClient.from_urls(urls, max_connections=pool_size, key_tag=score_key_tag)
+
+
 def _service_factory() -> LeaderboardService:
-    return LeaderboardService(InMemoryRedis())
+    bucket_seconds = int(os.environ.get("LEADERBOARD_BUCKET_SECONDS", "3600"))
+    service = LeaderboardService(
+        _client_from_env(),
+        _window_engine_from_env(),
+        PlayerBestView(bucket_seconds),
+        _RESPONSE_CACHE,
+        PlayerTotalsView(bucket_seconds),
+    )
+    if os.environ.get("LEADERBOARD_BACKGROUND_EXPIRY", "").lower() in ("1", "true", "yes"):
+        service.enable_background_expiry().start()
+    return service
 
 
 leaderboard_app = FastAPI(title="SIQ Leaderboards")
 
+_SERVICE: Optional[LeaderboardService] = None
+_SERVICE_LOCK = threading.Lock()
+
 
 def get_service() -> LeaderboardService:
-    return _service_factory()
+    """Process-wide service, built from the environment on first use."""
+
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = _service_factory()
+    return _SERVICE
+
+
+def reset_service() -> None:
+    """Stop and drop the shared service so the next request rebuilds it."""
+
+    global _SERVICE
+    with _SERVICE_LOCK:
+        service, _SERVICE = _SERVICE, None
+    if service is not None:
+        service.close()
 
 
 def _format_entries(events: List[LeaderboardEvent]) -> List[Dict[str, object]]:
@@ -294,13 +1729,16 @@ def post_hardest_shot(
         raise HTTPException(status_code=400, detail="player_id and ball_speed_kph are required")
     occurred_at = _parse_timestamp(payload.get("occurred_at")) or time.time()
     country, city = _parse_location(payload.get("location"))
-    service.submit_hardest_shot(
-        player_id=player_id,
-        ball_speed_kph=float(ball_speed),
-        occurred_at=occurred_at,
-        country=country,
-        city=city,
-    )
+    try:
+        service.submit_hardest_shot(
+            player_id=player_id,
+            ball_speed_kph=float(ball_speed),
+            occurred_at=occurred_at,
+            country=country,
+            city=city,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"status": "accepted"}
 
 
@@ -315,16 +1753,75 @@ def post_most_hits(
         raise HTTPException(status_code=400, detail="player_id and hits are required")
     occurred_at = _parse_timestamp(payload.get("occurred_at")) or time.time()
     country, city = _parse_location(payload.get("location"))
-    service.submit_most_hits(
-        player_id=player_id,
-        hits=int(hits),
-        occurred_at=occurred_at,
-        country=country,
-        city=city,
-    )
+    try:
+        service.submit_most_hits(
+            player_id=player_id,
+            hits=int(hits),
+            occurred_at=occurred_at,
+            country=country,
+            city=city,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"status": "accepted"}
 
 
+_BATCH_SCORE_FIELDS = {
+    METRIC_HARDEST_SHOT: "ball_speed_kph",
+    METRIC_MOST_HITS: "hits",
+}
+
+
+def _parse_batch_item(item: object, service: LeaderboardService) -> Tuple[str, LeaderboardEvent]:
+    if not isinstance(item, dict):
+        raise ValueError("submission must be an object")
+    metric = item.get("metric")
+    score_field = _BATCH_SCORE_FIELDS.get(metric) if isinstance(metric, str) else None
+    if score_field is None:
+        raise ValueError(f"metric must be one of: {', '.join(_BATCH_SCORE_FIELDS)}")
+    player_id = str(item.get("player_id")) if item.get("player_id") else None
+    raw_score = item.get(score_field)
+    if not player_id or raw_score is None:
+        raise ValueError(f"player_id and {score_field} are required")
+    try:
+        score = float(int(raw_score)) if metric == METRIC_MOST_HITS else float(raw_score)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{score_field} must be numeric") from exc
+    try:
+        occurred_at = _parse_timestamp(item.get("occurred_at")) or time.time()
+    except HTTPException as exc:
+        raise ValueError(str(exc.detail)) from exc
+    country, city = _parse_location(item.get("location"))
+    return metric, service.new_event(player_id, score, occurred_at, country, city)
+
+
+@leaderboard_app.post("/leaderboard/batch")
+def post_batch(
+    payload: Dict[str, object],
+    service: LeaderboardService = Depends(get_service),
+) -> Dict[str, object]:
+    items = payload.get("submissions")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="submissions must be a list")
+    if len(items) > MAX_BATCH_SUBMISSIONS:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_BATCH_SUBMISSIONS} submissions per batch")
+    accepted: List[Tuple[str, LeaderboardEvent]] = []
+    results: List[Dict[str, object]] = []
+    for index, item in enumerate(items):
+        try:
+            accepted.append(_parse_batch_item(item, service))
+        except ValueError as exc:
+            results.append({"index": index, "status": "rejected", "error": str(exc)})
+        else:
+            results.append({"index": index, "status": "accepted"})
+    service.submit_batch(accepted)
+    return {
+        "accepted": len(accepted),
+        "rejected": len(items) - len(accepted),
+        "results": results,
+    }
+
+
 def _validate_scope(scope: str, country: Optional[str], city: Optional[str]) -> None:
     if scope == SCOPE_COUNTRY and not country:
         raise HTTPException(status_code=400, detail="country scope requires country code")
@@ -332,48 +1829,181 @@ def _validate_scope(scope: str, country: Optional[str], city: Optional[str]) ->
         raise HTTPException(status_code=400, detail="city scope requires country and city")
 
 
+def _header(request: Request, name: str) -> Optional[str]:
+    for key, value in request.headers.items():
+        if key.lower() == name:
+            return str(value)
+    return None
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _board_response(
+    request: Request,
+    response: Response,
+    service: LeaderboardService,
+    *,
+    metric: str,
+    window: str,
+    scope: str,
+    country: Optional[str],
+    city: Optional[str],
+) -> Union[Dict[str, object], Response]:
+    _validate_scope(scope, country, city)
+    cached = service.leaderboard_response(
+        metric=metric,
+        window=window,
+        scope=scope,
+        country=_normalize_country(country),
+        city=_normalize_city(city),
+        render=lambda events: {
+            "entries": _format_entries(events),
+            "window": window,
+            "metric": metric,
+            "scope": scope,
+        },
+    )
+    # Pollers revalidate every time; a matching ETag costs no body at all.
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(_header(request, "if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return cached.body
+
+
 @leaderboard_app.get("/leaderboard/hardest-shot")
 def get_hardest_shot(
+    request: Request,
+    response: Response,
     window: str = Query("24h", enum=("24h", "7d")),
     scope: str = Query("global", enum=(SCOPE_GLOBAL, SCOPE_COUNTRY, SCOPE_CITY)),
     country: Optional[str] = None,
     city: Optional[str] = None,
     service: LeaderboardService = Depends(get_service),
+) -> Union[Dict[str, object], Response]:
+    return _board_response(
+        request,
+        response,
+        service,
+        metric=METRIC_HARDEST_SHOT,
+        window=window,
+        scope=scope,
+        country=country,
+        city=city,
+    )
+
+
+@leaderboard_app.get("/leaderboard/most-hits")
+def get_most_hits(
+    request: Request,
+    response: Response,
+    scope: str = Query("global", enum=(SCOPE_GLOBAL, SCOPE_COUNTRY, SCOPE_CITY)),
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    service: LeaderboardService = Depends(get_service),
+) -> Union[Dict[str, object], Response]:
+    return _board_response(
+        request,
+        response,
+        service,
+        metric=METRIC_MOST_HITS,
+        window="7d",
+        scope=scope,
+        country=country,
+        city=city,
+    )
+
+
+MAX_RANK_NEIGHBOURS = 10
+
+
+def _rank_response(
+    service: LeaderboardService,
+    *,
+    metric: str,
+    window: str,
+    scope: str,
+    country: Optional[str],
+    city: Optional[str],
+    player_id: Optional[str],
+    neighbours: object,
 ) -> Dict[str, object]:
     _validate_scope(scope, country, city)
-    events = service.read_leaderboard(
-        metric=METRIC_HARDEST_SHOT,
+    if not player_id:
+        raise HTTPException(status_code=400, detail="player_id is required")
+    try:
+        count = min(max(int(neighbours), 0), MAX_RANK_NEIGHBOURS)  # type: ignore[arg-type]
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="neighbours must be an integer") from exc
+    standing = service.player_rank(
+        metric=metric,
         window=window,
         scope=scope,
         country=_normalize_country(country),
         city=_normalize_city(city),
+        player_id=player_id,
+        neighbours=count,
     )
+    if standing is None:
+        raise HTTPException(status_code=404, detail="player has no entry in this window")
     return {
-        "entries": _format_entries(events),
+        "player_id": standing.player_id,
+        "rank": standing.rank,
+        "score": standing.score,
+        "total_players": standing.total,
+        "neighbours": [
+            {"rank": entry.rank, "player_id": entry.player_id, "score": entry.score}
+            for entry in standing.neighbours
+        ],
         "window": window,
-        "metric": METRIC_HARDEST_SHOT,
+        "metric": metric,
         "scope": scope,
     }
 
 
-@leaderboard_app.get("/leaderboard/most-hits")
-def get_most_hits(
+@leaderboard_app.get("/leaderboard/hardest-shot/rank")
+def get_hardest_shot_rank(
+    player_id: Optional[str] = None,
+    window: str = Query("24h", enum=("24h", "7d")),
     scope: str = Query("global", enum=(SCOPE_GLOBAL, SCOPE_COUNTRY, SCOPE_CITY)),
     country: Optional[str] = None,
     city: Optional[str] = None,
+    neighbours: int = 2,
     service: LeaderboardService = Depends(get_service),
 ) -> Dict[str, object]:
-    _validate_scope(scope, country, city)
-    events = service.read_leaderboard(
+    return _rank_response(
+        service,
+        metric=METRIC_HARDEST_SHOT,
+        window=window,
+        scope=scope,
+        country=country,
+        city=city,
+        player_id=player_id,
+        neighbours=neighbours,
+    )
+
+
+@leaderboard_app.get("/leaderboard/most-hits/rank")
+def get_most_hits_rank(
+    player_id: Optional[str] = None,
+    scope: str = Query("global", enum=(SCOPE_GLOBAL, SCOPE_COUNTRY, SCOPE_CITY)),
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    neighbours: int = 2,
+    service: LeaderboardService = Depends(get_service),
+) -> Dict[str, object]:
+    return _rank_response(
+        service,
         metric=METRIC_MOST_HITS,
         window="7d",
         scope=scope,
-        country=_normalize_country(country),
-        city=_normalize_city(city),
+        country=country,
+        city=city,
+        player_id=player_id,
+        neighbours=neighbours,
     )
-    return {
-        "entries": _format_entries(events),
-        "window": "7d",
-        "metric": METRIC_MOST_HITS,
-        "scope": scope,
-    }
@@ -36,6 +36,7 @@ from siq.coach import (
     RunHistory,
     WeeklySummaryJob,
 )
+from siq.models.warmup import ModelWarmup
 from siq.observability import cv_stage, record_frame_inference
 
 app = MiniAPI()
@@ -99,6 +100,13 @@ weekly_summary_job = WeeklySummaryJob(run_history, registry=_persona_registry)
 
 _TRACER = trace.get_tracer("siq.cv")
 
+model_warmup = ModelWarmup.from_env()
+
+
+@app.on_event("startup")
+def start_model_warmup() -> None:
+    model_warmup.start()
+
 
 def _resolve_persona_or_422(user_id: str, persona_alias: str | None) -> PersonaProfile:
     try:
@@ -360,6 +368,31 @@ def post_telemetry(payload, headers):
 billing_routes.register(app)
 
 
+@app.get("/health")
+def health(query, headers):
+    if not model_warmup.ready:
+        error = model_warmup.error
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "status": "error" if error else "warming",
+                "reason": str(error) if error else "model warm-up in progress",
+            },
+        )
+    return {
+        "status": "ok",
+        "models": [
+            {
+                "name": report.model_name,
+                "source": report.source,
+                "coldStartMs": round(report.cold_start_ms, 3),
+                "warmMs": round(report.warm_ms, 3),
+            }
+            for report in model_warmup.reports
+        ],
+    }
+
+
 @app.get("/entitlements/demo-pro")
 def entitlements_demo_pro(query, headers):
     user_id = (query or {}).get("userId")
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from typing import ClassVar, Dict, Literal
+from typing import ClassVar, Dict, Literal, Optional
 
 EntitlementStatus = Literal["active", "expired", "revoked"]
 EntitlementSource = Literal["apple", "google", "stripe", "mock", "test"]
 
 
+def expiry_epoch(expires_at: str | None) -> Optional[float]:
+    """POSIX timestamp of an ISO-8601 ``expires_at``; ``None`` if absent or unparsable."""
+
+    if not expires_at:
+        return None
+    try:
+        return datetime.fromisoformat(expires_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
 @dataclass(frozen=True, slots=True)
 class Entitlement:
-    """Represents a product entitlement for a specific user."""
+    """Represents a product entitlement for a specific user.
+
+    ``expires_epoch`` is ``expires_at`` parsed once at construction, so checks
+    on the request path compare floats instead of parsing timestamps.
+    """
 
     user_id: str
     product_id: str
@@ -18,9 +33,18 @@ class Entitlement:
     source: EntitlementSource
     expires_at: str | None
     created_at: str
+    expires_epoch: Optional[float] = field(init=False, repr=False, compare=False)
 
     _VALID_STATUS: ClassVar[set[str]] = {"active", "expired", "revoked"}
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "expires_epoch", expiry_epoch(self.expires_at))
+
+    def is_active(self, now: float) -> bool:
+        """Whether the entitlement grants access at POSIX time ``now``."""
+
+        return self.status == "active" and (self.expires_epoch is None or now < self.expires_epoch)
+
     @staticmethod
     def _now_iso() -> str:
         return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -0,0 +1,459 @@
+"""Snapshot plus append-only log persistence for ``InMemoryRedis``.
+
+Every state-changing command is appended to the current log segment in RESP
+form, the same encoding ``RespClient`` sends, and the log is fsynced in batches
+of ``fsync_every_ops`` records or every ``fsync_interval`` seconds, whichever
+comes first. A crash therefore loses at most one batch.
+
+A snapshot rewrites the whole store as the minimal commands that rebuild it.
+Starting one rotates to a new log segment and takes references to the sorted
+sets and strings, without copying any members. A background thread then copies
+the sorted sets a chunk at a time, each under a short hold of the store lock;
+a write to a set it has not reached yet copies that set first, so the snapshot
+still holds the state at the rotation. The snapshot is atomically renamed into
+place, after which the segments it covers are deleted. Restart replays the
+snapshot followed by the remaining segments, truncating a torn final record.
+"""
+from __future__ import annotations
+
+import inspect
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from server.leaderboard import InMemoryRedis
+from server.resp import COMMANDS, encode_command
+
+SNAPSHOT_FILE = "snapshot.aof"
+_SEGMENT_RE = re.compile(r"^log-(\d{8})\.aof$")
+_SNAPSHOT_CHUNK = 1000
+# Sorted-set members the snapshot thread copies per hold of the store lock.
+_SNAPSHOT_COPY_MEMBERS = 50_000
+
+WRITE_COMMANDS = ("zadd", "zincrby", "zrem", "zremrangebyscore", "set", "mset", "incrby", "delete", "flushall")
+# Commands whose zero result means nothing changed, so there is nothing to log.
+_NOOP_ON_ZERO = frozenset({"zrem", "zremrangebyscore", "delete"})
+# Writes that change the sorted set named by their first argument.
+_SORTED_SET_WRITES = frozenset({"zadd", "zincrby", "zrem", "zremrangebyscore"})
+
+
+def _segment_name(segment: int) -> str:
+    return f"log-{segment:08d}.aof"
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - platforms without directory handles
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AppendOnlyLog:
+    """Buffered log file fsynced every ``fsync_every_ops`` records or ``fsync_interval`` seconds.
+
+    A daemon thread covers the interval when writes stop, so a quiet period
+    never leaves records unsynced for longer than ``fsync_interval``.
+    """
+
+    def __init__(self, path: Path, *, fsync_every_ops: int = 1000, fsync_interval: float = 0.05) -> None:
+        self.path = path
+        self._file = open(path, "ab")
+        self._fsync_every_ops = max(fsync_every_ops, 1)
+        self._fsync_interval = fsync_interval
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="siq-aof-fsync", daemon=True)
+        self._thread.start()
+
+    def append(self, record: bytes) -> None:
+        with self._lock:
+            self._file.write(record)
+            self.bytes_written += len(record)
+            self._pending += 1
+            if self._pending >= self._fsync_every_ops or time.monotonic() - self._last_sync >= self._fsync_interval:
+                self._sync_locked()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        self._last_sync = time.monotonic()
+        if not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self.fsyncs += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._fsync_interval):
+            with self._lock:
+                if self._pending and time.monotonic() - self._last_sync >= self._fsync_interval:
+                    self._sync_locked()
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        with self._lock:
+            self._sync_locked()
+            self._file.close()
+
+
+class TornRecord(ValueError):
+    """The log ends part-way through a record, as after a crash mid-write."""
+
+
+def _parse_record(data: bytes, pos: int) -> Tuple[List[bytes], int]:
+    """Parse the RESP array of bulk strings at ``pos``; returns it and the next offset."""
+
+    find = data.find
+    end = find(b"\r\n", pos)
+    if end == -1 or data[pos : pos + 1] != b"*":
+        raise TornRecord("bad record header")
+    count = int(data[pos + 1 : end])
+    pos = end + 2
+    parts: List[bytes] = []
+    append = parts.append
+    for _ in range(count):
+        end = find(b"\r\n", pos)
+        if end == -1:
+            raise TornRecord("incomplete argument header")
+        start = end + 2
+        # Each argument header is ``$<length>``; a corrupt one fails int().
+        pos = start + int(data[pos + 1 : end])
+        append(data[start:pos])
+        pos += 2
+    if pos > len(data) or data[pos - 2 : pos] != b"\r\n":
+        raise TornRecord("incomplete argument")
+    return parts, pos
+
+
+def read_records(path: Path) -> Iterator[Tuple[List[bytes], int]]:
+    """Yield each complete record with the file offset just past it.
+
+    Stops quietly at a torn final record; the last yielded offset is then the
+    length of the valid prefix.
+    """
+
+    data = path.read_bytes()
+    pos = 0
+    while pos < len(data):
+        try:
+            parts, pos = _parse_record(data, pos)
+        except ValueError:
+            return
+        yield parts, pos
+
+
+def _apply(store: InMemoryRedis, parts: List[bytes]) -> None:
+    """Re-run one logged command against ``store`` without logging it again."""
+
+    name = parts[0].decode().upper()
+    args = parts[1:]
+    text = [arg.decode("utf-8", "surrogateescape") for arg in args]
+    if name == "ZADD":
+        gt = len(text) > 1 and text[1].upper() == "GT"
+        start = 2 if gt else 1
+        mapping = {text[i + 1]: float(text[i]) for i in range(start, len(text), 2)}
+        InMemoryRedis.zadd(store, text[0], mapping, gt)
+    elif name == "ZINCRBY":
+        InMemoryRedis.zincrby(store, text[0], float(text[1]), text[2])
+    elif name == "ZREM":
+        InMemoryRedis.zrem(store, text[0], *text[1:])
+    elif name == "ZREMRANGEBYSCORE":
+        InMemoryRedis.zremrangebyscore(store, text[0], float(text[1]), float(text[2]))
+    elif name == "SET":
+        InMemoryRedis.set(store, text[0], args[1])
+    elif name == "MSET":
+        InMemoryRedis.mset(store, {text[i]: args[i + 1] for i in range(0, len(args), 2)})
+    elif name == "INCRBY":
+        InMemoryRedis.incrby(store, text[0], int(text[1]))
+    elif name == "DEL":
+        InMemoryRedis.delete(store, *text)
+    elif name == "FLUSHALL":
+        InMemoryRedis.flushall(store)
+    elif name != "SNAPSHOT":
+        raise ValueError(f"unexpected command in log: {name}")
+
+
+class _SnapshotCopy:
+    """Copy-on-write view of the sorted sets as they were when a snapshot started.
+
+    ``pending`` holds the sets nobody has copied yet. The snapshot thread copies
+    them through ``take``; a write reaching one first copies it in ``preserve``.
+    Both run under the store lock.
+    """
+
+    def __init__(self, sorted_sets: Dict[str, Any]) -> None:
+        self.pending = dict(sorted_sets)
+        self.copied: List[Tuple[str, Dict[str, float]]] = []
+
+    def preserve(self, name: str, args: tuple) -> None:
+        if name == "flushall":
+            keys: List[str] = list(self.pending)
+        elif name == "delete":
+            keys = list(args)
+        elif name in _SORTED_SET_WRITES:
+            keys = [args[0]]
+        else:
+            return  # strings were copied when the snapshot started
+        for key in keys:
+            store = self.pending.pop(key, None)
+            if store is not None:
+                self.copied.append((key, store.copy_scores()))
+
+    def take(self, members: int) -> List[Tuple[str, Dict[str, float]]]:
+        """Copy pending sets until about ``members`` members are taken; ``[]`` when done."""
+
+        chunk, self.copied = self.copied, []
+        taken = 0
+        while self.pending and taken < members:
+            key, store = self.pending.popitem()
+            scores = store.copy_scores()
+            chunk.append((key, scores))
+            taken += len(scores)
+        return chunk
+
+
+@dataclass
+class PersistenceStats:
+    log_bytes: int = 0
+    snapshot_bytes: int = 0
+    fsyncs: int = 0
+    snapshots: int = 0
+    recovered_records: int = 0
+    recovery_seconds: float = 0.0
+    # Longest single hold of the store lock for snapshot work, writers' copies included.
+    snapshot_pause_seconds: float = 0.0
+
+
+class DurableRedis(InMemoryRedis):
+    """``InMemoryRedis`` that survives restarts via snapshots and a batched-fsync log.
+
+    Opening a directory recovers whatever it holds. Once ``snapshot_every_ops``
+    records have been logged since the last snapshot a new one is started in the
+    background; ``snapshot()`` takes one on demand. Call ``close()`` on shutdown
+    to sync the log.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        fsync_every_ops: int = 1000,
+        fsync_interval: float = 0.05,
+        snapshot_every_ops: Optional[int] = 1_000_000,
+    ) -> None:
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._fsync_every_ops = fsync_every_ops
+        self._fsync_interval = fsync_interval
+        self._snapshot_every_ops = snapshot_every_ops
+        self._ops_since_snapshot = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_copy: Optional[_SnapshotCopy] = None
+        self._closing: Optional[AppendOnlyLog] = None
+        self._closed_log_bytes = 0
+        self._closed_fsyncs = 0
+        self._stats = PersistenceStats()
+        self._segment = self._recover()
+        self._log = self._open_segment(self._segment)
+
+    @property
+    def stats(self) -> PersistenceStats:
+        with self._lock:
+            logs = [self._log] + ([self._closing] if self._closing is not None else [])
+            self._stats.log_bytes = self._closed_log_bytes + sum(log.bytes_written for log in logs)
+            self._stats.fsyncs = self._closed_fsyncs + sum(log.fsyncs for log in logs)
+            return PersistenceStats(**vars(self._stats))
+
+    def _segments(self) -> Dict[int, Path]:
+        found: Dict[int, Path] = {}
+        for path in self.directory.iterdir():
+            match = _SEGMENT_RE.match(path.name)
+            if match:
+                found[int(match.group(1))] = path
+        return found
+
+    def _open_segment(self, segment: int) -> AppendOnlyLog:
+        return AppendOnlyLog(
+            self.directory / _segment_name(segment),
+            fsync_every_ops=self._fsync_every_ops,
+            fsync_interval=self._fsync_interval,
+        )
+
+    def _recover(self) -> int:
+        """Load the snapshot and replay newer segments; returns the segment to append to."""
+
+        started = time.perf_counter()
+        records = 0
+        first_segment = 0
+        snapshot = self.directory / SNAPSHOT_FILE
+        if snapshot.exists():
+            for parts, _ in read_records(snapshot):
+                if parts[0] == b"SNAPSHOT":
+                    first_segment = int(parts[1])
+                else:
+                    _apply(self, parts)
+                    records += 1
+        segments = self._segments()
+        live = sorted(segment for segment in segments if segment >= first_segment)
+        for segment in live:
+            path = segments[segment]
+            valid = 0
+            for parts, valid in read_records(path):
+                _apply(self, parts)
+                records += 1
+            if valid < path.stat().st_size:
+                # Only the final batch can be torn; drop it so appends start clean.
+                with open(path, "r+b") as handle:
+                    handle.truncate(valid)
+        for segment, path in segments.items():
+            if segment < first_segment:
+                path.unlink()
+        self._stats.recovered_records = records
+        self._stats.recovery_seconds = time.perf_counter() - started
+        return max([first_segment - 1, *live]) + 1
+
+    def _record(self, name: str, args: tuple) -> None:
+        self._log.append(encode_command(*COMMANDS[name][0](*args)))
+        self._ops_since_snapshot += 1
+        if self._snapshot_every_ops is not None and self._ops_since_snapshot >= self._snapshot_every_ops:
+            self.snapshot()
+
+    def snapshot(self, *, wait: bool = False) -> Optional[threading.Thread]:
+        """Start a background snapshot; returns ``None`` if one is already running."""
+
+        with self._lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return None
+            started = time.perf_counter()
+            # Strings are immutable bytes, so copying the dict copies only references.
+            copy, strings = _SnapshotCopy(self._sorted_sets), dict(self._strings)
+            self._snapshot_copy = copy
+            previous = self._log
+            self._segment += 1
+            self._log = self._open_segment(self._segment)
+            self._ops_since_snapshot = 0
+            self._closing = previous
+            covered = self._segment
+            thread = threading.Thread(
+                target=self._write_snapshot,
+                args=(previous, covered, copy, strings),
+                name="siq-aof-snapshot",
+                daemon=True,
+            )
+            self._snapshot_thread = thread
+            self._note_pause(time.perf_counter() - started)
+            thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def _write_snapshot(
+        self,
+        previous: AppendOnlyLog,
+        covered: int,
+        copy: _SnapshotCopy,
+        strings: Dict[str, bytes],
+    ) -> None:
+        previous.close()
+        with self._lock:
+            self._closing = None
+            self._closed_log_bytes += previous.bytes_written
+            self._closed_fsyncs += previous.fsyncs
+        temporary = self.directory / f"{SNAPSHOT_FILE}.tmp"
+        written = 0
+        with open(temporary, "wb") as handle:
+
+            def emit(*command: object) -> None:
+                nonlocal written
+                record = encode_command(*command)
+                handle.write(record)
+                written += len(record)
+
+            emit("SNAPSHOT", covered)
+            while True:
+                with self._lock:
+                    started = time.perf_counter()
+                    chunk = copy.take(_SNAPSHOT_COPY_MEMBERS)
+                    if not chunk:
+                        self._snapshot_copy = None
+                    self._note_pause(time.perf_counter() - started)
+                if not chunk:
+                    break
+                # One ZADD per key lets recovery bulk-load each sorted set with a single sort.
+                for key, scores in chunk:
+                    emit(*COMMANDS["zadd"][0](key, scores, False))
+            pairs = list(strings.items())
+            for offset in range(0, len(pairs), _SNAPSHOT_CHUNK):
+                emit(*COMMANDS["mset"][0](dict(pairs[offset : offset + _SNAPSHOT_CHUNK])))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self.directory / SNAPSHOT_FILE)
+        _fsync_directory(self.directory)
+        for segment, path in self._segments().items():
+            if segment < covered:
+                path.unlink()
+        with self._lock:
+            self._stats.snapshot_bytes += written
+            self._stats.snapshots += 1
+
+    def _preserve(self, name: str, args: tuple) -> None:
+        """Copy the sets ``name`` is about to change if a running snapshot still needs them."""
+
+        copy = self._snapshot_copy
+        if copy is not None:
+            started = time.perf_counter()
+            copy.preserve(name, args)
+            self._note_pause(time.perf_counter() - started)
+
+    def _note_pause(self, seconds: float) -> None:
+        self._stats.snapshot_pause_seconds = max(self._stats.snapshot_pause_seconds, seconds)
+
+    def close(self) -> None:
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._log.close()
+
+
+def _logged(name: str):
+    base = getattr(InMemoryRedis, name)
+    signature = inspect.signature(base)
+
+    def method(self: DurableRedis, *args: object, **kwargs: object):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        with self._lock:
+            self._preserve(name, bound.args[1:])
+            result = base(self, *args, **kwargs)
+            if not (name in _NOOP_ON_ZERO and result == 0):
+                self._record(name, bound.args[1:])
+        return result
+
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = base.__doc__
+    return method
+
+
+for _name in WRITE_COMMANDS:
+    setattr(DurableRedis, _name, _logged(_name))
+
+
+__all__ = ["AppendOnlyLog", "DurableRedis", "PersistenceStats", "WRITE_COMMANDS", "read_records"]
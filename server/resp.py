@@ -0,0 +1,499 @@
+"""Minimal RESP2 client for Redis-compatible leaderboard backends.
+
+Only the commands the leaderboard relies on are implemented. Replies are decoded
+to the same shapes ``InMemoryRedis`` returns so both backends are interchangeable,
+and both expose ``pipeline()`` for batching many commands into one round trip.
+"""
+from __future__ import annotations
+
+import math
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+Reply = Any
+
+
+class RedisError(RuntimeError):
+    """Raised when the server answers a command with an error reply."""
+
+
+def _format_score(value: float) -> bytes:
+    number = float(value)
+    if math.isinf(number):
+        return b"+inf" if number > 0 else b"-inf"
+    return repr(number).encode()
+
+
+def _to_bytes(value: object) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, bytearray):
+        return bytes(value)
+    if isinstance(value, float):
+        return _format_score(value)
+    return str(value).encode()
+
+
+def encode_command(*args: object) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = _to_bytes(arg)
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def read_reply(stream: Any) -> Reply:
+    """Read one RESP2 reply; error replies are returned as ``RedisError`` instances."""
+
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        return RedisError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise RedisError(f"unexpected reply prefix {prefix!r}")
+
+
+def _ok(reply: Reply) -> bool:
+    return reply == "OK"
+
+
+def _identity(reply: Reply) -> Reply:
+    return reply
+
+
+def _members(reply: Reply) -> List[bytes]:
+    return list(reply or [])
+
+
+def _optional_float(reply: Reply) -> Optional[float]:
+    return float(reply) if reply is not None else None
+
+
+def _scored_members(reply: Reply) -> List[Tuple[bytes, float]]:
+    items = list(reply or [])
+    return [(items[i], float(items[i + 1])) for i in range(0, len(items), 2)]
+
+
+CommandSpec = Tuple[Callable[..., Sequence[object]], Callable[[Reply], Any]]
+
+# name -> (argument builder, reply decoder)
+COMMANDS: Dict[str, CommandSpec] = {
+    "zadd": (
+        lambda key, mapping, gt=False: [
+            "ZADD",
+            key,
+            *(["GT"] if gt else []),
+            *[item for member, score in mapping.items() for item in (float(score), member)],
+        ],
+        _identity,
+    ),
+    "zincrby": (lambda key, amount, member: ["ZINCRBY", key, float(amount), member], _optional_float),
+    "zscore": (lambda key, member: ["ZSCORE", key, member], _optional_float),
+    "zrevrank": (lambda key, member: ["ZREVRANK", key, member], _identity),
+    "zcount": (lambda key, min_score, max_score: ["ZCOUNT", key, float(min_score), float(max_score)], _identity),
+    "zrangebyscore": (
+        lambda key, min_score, max_score, start=None, num=None: [
+            "ZRANGEBYSCORE",
+            key,
+            float(min_score),
+            float(max_score),
+            *(["LIMIT", int(start or 0), int(num)] if num is not None else []),
+        ],
+        _members,
+    ),
+    "zrange_withscores": (
+        lambda key, start, stop: ["ZRANGE", key, int(start), int(stop), "WITHSCORES"],
+        _scored_members,
+    ),
+    "zrevrange": (lambda key, start, stop: ["ZREVRANGE", key, int(start), int(stop)], _members),
+    "zrevrange_withscores": (
+        lambda key, start, stop: ["ZREVRANGE", key, int(start), int(stop), "WITHSCORES"],
+        _scored_members,
+    ),
+    "zrem": (lambda key, *members: ["ZREM", key, *members], _identity),
+    "zremrangebyscore": (
+        lambda key, min_score, max_score: ["ZREMRANGEBYSCORE", key, float(min_score), float(max_score)],
+        _identity,
+    ),
+    "zcard": (lambda key: ["ZCARD", key], _identity),
+    "set": (lambda key, value: ["SET", key, value], _ok),
+    "mset": (lambda mapping: ["MSET", *[item for key, value in mapping.items() for item in (key, value)]], _ok),
+    "get": (lambda key: ["GET", key], _identity),
+    "mget": (lambda *keys: ["MGET", *keys], _members),
+    "incrby": (lambda key, amount: ["INCRBY", key, int(amount)], _identity),
+    "delete": (lambda *keys: ["DEL", *keys], _identity),
+    "flushall": (lambda: ["FLUSHALL"], _ok),
+}
+
+
+class Pipeline:
+    """Queues commands and sends them together when ``execute`` is called."""
+
+    def __init__(self) -> None:
+        self._queued: List[Tuple[str, tuple]] = []
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._queued = []
+
+    def _queue(self, name: str, *args: object) -> "Pipeline":
+        self._queued.append((name, args))
+        return self
+
+    def zadd(self, key: str, mapping: Mapping[str, float], gt: bool = False) -> "Pipeline":
+        return self._queue("zadd", key, dict(mapping), gt)
+
+    def zincrby(self, key: str, amount: float, member: object) -> "Pipeline":
+        return self._queue("zincrby", key, amount, member)
+
+    def zscore(self, key: str, member: object) -> "Pipeline":
+        return self._queue("zscore", key, member)
+
+    def zrevrank(self, key: str, member: object) -> "Pipeline":
+        return self._queue("zrevrank", key, member)
+
+    def zcount(self, key: str, min_score: float, max_score: float) -> "Pipeline":
+        return self._queue("zcount", key, min_score, max_score)
+
+    def zrangebyscore(
+        self,
+        key: str,
+        min_score: float,
+        max_score: float,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+    ) -> "Pipeline":
+        return self._queue("zrangebyscore", key, min_score, max_score, start, num)
+
+    def zrange_withscores(self, key: str, start: int, stop: int) -> "Pipeline":
+        return self._queue("zrange_withscores", key, start, stop)
+
+    def zrevrange(self, key: str, start: int, stop: int) -> "Pipeline":
+        return self._queue("zrevrange", key, start, stop)
+
+    def zrevrange_withscores(self, key: str, start: int, stop: int) -> "Pipeline":
+        return self._queue("zrevrange_withscores", key, start, stop)
+
+    def zrem(self, key: str, *members: object) -> "Pipeline":
+        return self._queue("zrem", key, *members)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> "Pipeline":
+        return self._queue("zremrangebyscore", key, min_score, max_score)
+
+    def zcard(self, key: str) -> "Pipeline":
+        return self._queue("zcard", key)
+
+    def set(self, key: str, value: str | bytes) -> "Pipeline":
+        return self._queue("set", key, value)
+
+    def mset(self, mapping: Mapping[str, str | bytes]) -> "Pipeline":
+        return self._queue("mset", dict(mapping))
+
+    def get(self, key: str) -> "Pipeline":
+        return self._queue("get", key)
+
+    def mget(self, *keys: str) -> "Pipeline":
+        return self._queue("mget", *keys)
+
+    def incrby(self, key: str, amount: int = 1) -> "Pipeline":
+        return self._queue("incrby", key, amount)
+
+    def delete(self, *keys: str) -> "Pipeline":
+        return self._queue("delete", *keys)
+
+    def flushall(self) -> "Pipeline":
+        return self._queue("flushall")
+
+    def execute(self) -> List[Any]:
+        raise NotImplementedError
+
+
+class RespPipeline(Pipeline):
+    def __init__(self, client: "RespClient", *, transaction: bool = False) -> None:
+        super().__init__()
+        self._client = client
+        self._transaction = transaction
+
+    def execute(self) -> List[Any]:
+        queued, self._queued = self._queued, []
+        if not queued:
+            return []
+        commands = [COMMANDS[name][0](*args) for name, args in queued]
+        if self._transaction:
+            commands = [["MULTI"], *commands, ["EXEC"]]
+        replies = self._client._round_trip(commands)
+        if self._transaction:
+            for reply in replies[:-1]:
+                if isinstance(reply, RedisError):
+                    raise reply
+            replies = replies[-1]
+            if replies is None:
+                raise RedisError("transaction aborted")
+        results: List[Any] = []
+        for (name, _), reply in zip(queued, replies):
+            if isinstance(reply, RedisError):
+                raise reply
+            results.append(COMMANDS[name][1](reply))
+        return results
+
+
+class _Connection:
+    """One TCP connection to the backend, with ``SELECT`` already applied."""
+
+    def __init__(self, address: Tuple[str, int], db: int, timeout: float) -> None:
+        sock = socket.create_connection(address, timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._stream = sock.makefile("rb")
+        if db:
+            (reply,) = self.round_trip([["SELECT", db]])
+            if isinstance(reply, RedisError):
+                self.close()
+                raise reply
+
+    def round_trip(self, commands: Sequence[Sequence[object]]) -> List[Reply]:
+        self._sock.sendall(b"".join(encode_command(*command) for command in commands))
+        return [read_reply(self._stream) for _ in commands]
+
+    def close(self) -> None:
+        self._stream.close()
+        self._sock.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections to one backend.
+
+    Idle connections are reused across callers; at most ``max_connections`` are
+    open at once and further callers wait up to ``timeout`` for one to free up.
+    A connection that fails mid-exchange is discarded rather than returned.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        timeout: float = 5.0,
+        max_connections: int = 16,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self._address = (host, port)
+        self._db = db
+        self._timeout = timeout
+        self._idle: List[_Connection] = []
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+
+    @property
+    def idle_connections(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def acquire(self) -> _Connection:
+        if not self._slots.acquire(timeout=self._timeout):
+            raise ConnectionError(f"no free backend connection after {self._timeout}s")
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return _Connection(self._address, self._db, self._timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: _Connection, *, discard: bool = False) -> None:
+        if discard:
+            connection.close()
+        else:
+            with self._lock:
+                self._idle.append(connection)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[_Connection]:
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            # A partially sent or read exchange would desynchronise the next caller.
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones close when released as discarded."""
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class RespClient:
+    """Blocking RESP2 client drawing connections from a shared ``ConnectionPool``.
+
+    One client is safe to share between threads; each command or pipeline holds
+    a pooled connection only for its round trip.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        timeout: float = 5.0,
+        max_connections: int = 16,
+        pool: Optional[ConnectionPool] = None,
+    ) -> None:
+        self._pool = pool or ConnectionPool(host, port, db=db, timeout=timeout, max_connections=max_connections)
+
+    @classmethod
+    def from_url(cls, url: str, *, timeout: float = 5.0, max_connections: int = 16) -> "RespClient":
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported backend URL scheme: {parsed.scheme}")
+        db = int(parsed.path.lstrip("/") or 0)
+        return cls(
+            parsed.hostname or "127.0.0.1",
+            parsed.port or 6379,
+            db=db,
+            timeout=timeout,
+            max_connections=max_connections,
+        )
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    def _round_trip(self, commands: Sequence[Sequence[object]]) -> List[Reply]:
+        with self._pool.connection() as connection:
+            return connection.round_trip(commands)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def pipeline(self, transaction: bool = False) -> RespPipeline:
+        return RespPipeline(self, transaction=transaction)
+
+    def _call(self, name: str, *args: object) -> Any:
+        (reply,) = self._round_trip([COMMANDS[name][0](*args)])
+        if isinstance(reply, RedisError):
+            raise reply
+        return COMMANDS[name][1](reply)
+
+    def execute_command(self, *args: object) -> Reply:
+        """Send a raw command and return its undecoded reply."""
+        (reply,) = self._round_trip([args])
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    def ping(self) -> bool:
+        return self.execute_command("PING") == "PONG"
+
+    def zadd(self, key: str, mapping: Mapping[str, float], gt: bool = False) -> int:
+        """Add or rescore members; with ``gt`` existing members only ever move up."""
+        return self._call("zadd", key, dict(mapping), gt)
+
+    def zincrby(self, key: str, amount: float, member: object) -> float:
+        return self._call("zincrby", key, amount, member)
+
+    def zscore(self, key: str, member: object) -> Optional[float]:
+        return self._call("zscore", key, member)
+
+    def zrevrank(self, key: str, member: object) -> Optional[int]:
+        return self._call("zrevrank", key, member)
+
+    def zcount(self, key: str, min_score: float, max_score: float) -> int:
+        return self._call("zcount", key, min_score, max_score)
+
+    def zrangebyscore(
+        self,
+        key: str,
+        min_score: float,
+        max_score: float,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+    ) -> List[bytes]:
+        return self._call("zrangebyscore", key, min_score, max_score, start, num)
+
+    def zrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        return self._call("zrange_withscores", key, start, stop)
+
+    def zrevrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        return self._call("zrevrange", key, start, stop)
+
+    def zrevrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        return self._call("zrevrange_withscores", key, start, stop)
+
+    def zrem(self, key: str, *members: object) -> int:
+        return self._call("zrem", key, *members)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        return self._call("zremrangebyscore", key, min_score, max_score)
+
+    def zcard(self, key: str) -> int:
+        return self._call("zcard", key)
+
+    def set(self, key: str, value: str | bytes) -> bool:
+        return self._call("set", key, value)
+
+    def mset(self, mapping: Mapping[str, str | bytes]) -> bool:
+        return self._call("mset", dict(mapping))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call("get", key)
+
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        return self._call("mget", *keys) if keys else []
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        return self._call("incrby", key, amount)
+
+    def delete(self, *keys: str) -> int:
+        return self._call("delete", *keys)
+
+    def flushall(self) -> bool:
+        return self._call("flushall")
+
+
+__all__ = [
+    "COMMANDS",
+    "ConnectionPool",
+    "Pipeline",
+    "RedisError",
+    "RespClient",
+    "RespPipeline",
+    "encode_command",
+    "read_reply",
+]
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import os
+
 from fastapi import HTTPException, status
 
-from server.services.entitlements import EntitlementService
+from server.services.entitlements import EntitlementDecisionCache, EntitlementExpirySweeper, EntitlementService
 
 _service = EntitlementService()
+_decisions = EntitlementDecisionCache(_service.store.get)
+_service.add_grant_listener(_decisions.on_grant)
+_sweeper = EntitlementExpirySweeper(_service.store)
+_service.add_grant_listener(_sweeper.on_grant)
+if os.environ.get("ENTITLEMENT_EXPIRY_SWEEPER", "").lower() in ("1", "true", "yes"):
+    _sweeper.start()
 
 
 def require_entitlement(product_id: str):
@@ -19,16 +27,24 @@ def require_entitlement(product_id: str):
                 status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail={"status": "error", "reason": "userId required"},
             )
-        entitlement = _service.store.get(str(user_id), normalized)
-        if entitlement is None or entitlement.status != "active":
+        decision = _decisions.check(str(user_id), normalized)
+        if not decision.allowed:
             raise HTTPException(
                 status.HTTP_403_FORBIDDEN,
                 detail={"status": "error", "reason": f"requires {normalized}"},
             )
-        return entitlement
+        return decision.entitlement
 
     return _dependency
 
 
 def get_service() -> EntitlementService:
     return _service
+
+
+def get_decision_cache() -> EntitlementDecisionCache:
+    return _decisions
+
+
+def get_expiry_sweeper() -> EntitlementExpirySweeper:
+    return _sweeper
@@ -1,41 +1,78 @@
-import json
 import os
-import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from server.services.journal import JournaledFile, Record
 
 DEFAULT_PATH = Path(os.environ.get("BILLING_STORE_PATH", "data/users.json"))
 
+# One journal line per tier change in ``<name>.jsonl`` next to the configured path,
+# compacted by ``JournaledFile``. A document left at the path itself is imported once.
+_Users = Dict[str, dict]
+
+
+def _apply(users: _Users, record: Record) -> None:
+    user_id = record.get("userId")
+    if user_id:
+        users[str(user_id)] = dict(record)
+
+
+def _snapshot(users: _Users) -> Iterator[Record]:
+    yield from users.values()
+
+
+def _legacy_records(document: Any) -> Optional[List[Record]]:
+    """Records from the ``{user_id: record}`` document older releases rewrote in place."""
+
+    if not isinstance(document, dict) or "userId" in document:
+        return None
+    return [
+        {**record, "userId": record.get("userId") or user_id}
+        for user_id, record in document.items()
+        if isinstance(record, dict)
+    ]
+
+
+_JOURNALS: Dict[Path, JournaledFile[_Users]] = {}
+_JOURNALS_LOCK = threading.Lock()
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+
+def _journal_for(path: Path) -> JournaledFile[_Users]:
+    with _JOURNALS_LOCK:
+        journal = _JOURNALS.get(path)
+        if journal is None:
+            journal = _JOURNALS[path] = JournaledFile(
+                path.with_suffix(".jsonl"),
+                initial=dict,
+                apply=_apply,
+                snapshot=_snapshot,
+                legacy=_legacy_records,
+                legacy_path=path,
+            )
+        return journal
 
 
 def load_store(path: Path = DEFAULT_PATH) -> Dict[str, dict]:
-    if not path.exists():
-        return {}
-    with path.open("r", encoding="utf-8") as handle:
-        try:
-            return json.load(handle)
-        except json.JSONDecodeError:
-            return {}
+    return _journal_for(path).read(lambda users: {user_id: dict(record) for user_id, record in users.items()})
 
 
 def save_store(store: Dict[str, dict], path: Path = DEFAULT_PATH) -> None:
-    _ensure_parent(path)
-    fd, tmp_name = tempfile.mkstemp(prefix="users_", suffix=".json", dir=str(path.parent))
-    os.close(fd)
-    tmp_path = Path(tmp_name)
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(store, handle, ensure_ascii=False, indent=2)
-    tmp_path.replace(path)
+    """Replace every record; the file is rewritten once through a compaction."""
+
+    def _replace(users: _Users) -> None:
+        users.clear()
+        for user_id, record in store.items():
+            users[user_id] = {**record, "userId": record.get("userId") or user_id}
+
+    _journal_for(path).compact(_replace)
 
 
 def get_user(user_id: str, path: Path = DEFAULT_PATH) -> Optional[dict]:
     if not user_id:
         return None
-    store = load_store(path)
-    return store.get(user_id)
+    record = _journal_for(path).read(lambda users: users.get(user_id))
+    return dict(record) if record is not None else None
 
 
 def set_tier(
@@ -51,7 +88,5 @@ def set_tier(
         "expiresAt": expires_at,
         "provider": provider,
     }
-    store = load_store(path)
-    store[user_id] = record
-    save_store(store, path)
+    _journal_for(path).append(record)
     return record
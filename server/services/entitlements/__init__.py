@@ -1,4 +1,17 @@
+from .decisions import EntitlementDecision, EntitlementDecisionCache
+from .expiry import EntitlementExpirySweeper
 from .service import EntitlementService, WebhookOutcome
-from .store import EntitlementStore
+from .sqlite_store import SqliteEntitlementStore, migrate_json_store
+from .store import EntitlementStore, open_store
 
-__all__ = ["EntitlementService", "EntitlementStore", "WebhookOutcome"]
+__all__ = [
+    "EntitlementDecision",
+    "EntitlementDecisionCache",
+    "EntitlementExpirySweeper",
+    "EntitlementService",
+    "EntitlementStore",
+    "SqliteEntitlementStore",
+    "WebhookOutcome",
+    "migrate_json_store",
+    "open_store",
+]
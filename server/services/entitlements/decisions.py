@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+from server.models import Entitlement
+
+_POSITIVE_TTL = float(os.environ.get("ENTITLEMENT_CACHE_TTL_SECONDS", "30"))
+_NEGATIVE_TTL = float(os.environ.get("ENTITLEMENT_NEGATIVE_CACHE_TTL_SECONDS", "2"))
+
+
+@dataclass(frozen=True, slots=True)
+class EntitlementDecision:
+    """Outcome of a gate check; ``entitlement`` is set only when access is allowed."""
+
+    allowed: bool
+    entitlement: Entitlement | None
+    valid_until: float
+
+
+class EntitlementDecisionCache:
+    """Remembers allow/deny decisions per ``(user_id, product_id)``.
+
+    An allow is kept for ``positive_ttl`` seconds but never past the
+    entitlement's ``expires_at``. A deny is kept for the much shorter
+    ``negative_ttl`` so a purchase made in another process is seen quickly.
+    Grants made in this process call ``invalidate`` so they apply at once.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str, str], Entitlement | None],
+        *,
+        positive_ttl: float = _POSITIVE_TTL,
+        negative_ttl: float = _NEGATIVE_TTL,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._lookup = lookup
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._decisions: Dict[Tuple[str, str], EntitlementDecision] = {}
+        # Bumped by every invalidation so a lookup that raced a grant is not cached.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._decisions)
+
+    def check(self, user_id: str, product_id: str) -> EntitlementDecision:
+        key = (user_id, product_id)
+        now = self._clock()
+        decision = self._decisions.get(key)
+        if decision is not None and now < decision.valid_until:
+            return decision
+        generation = self._generation
+        entitlement = self._lookup(user_id, product_id)
+        if entitlement is not None and entitlement.is_active(now):
+            valid_until = now + self.positive_ttl
+            if entitlement.expires_epoch is not None:
+                valid_until = min(valid_until, entitlement.expires_epoch)
+            decision = EntitlementDecision(True, entitlement, valid_until)
+        else:
+            decision = EntitlementDecision(False, None, now + self.negative_ttl)
+        with self._lock:
+            if generation != self._generation:
+                return decision
+            if key not in self._decisions and len(self._decisions) >= self._max_entries:
+                # Dicts keep insertion order, so this drops the oldest decision.
+                self._decisions.pop(next(iter(self._decisions)))
+            self._decisions[key] = decision
+        return decision
+
+    def invalidate(self, user_id: str, product_id: str | None = None) -> None:
+        """Forget one decision, or every decision for ``user_id`` when no product is given."""
+
+        with self._lock:
+            self._generation += 1
+            if product_id is not None:
+                self._decisions.pop((user_id, product_id), None)
+                return
+            for key in [key for key in self._decisions if key[0] == user_id]:
+                del self._decisions[key]
+
+    def on_grant(self, entitlement: Entitlement) -> None:
+        """Grant listener for ``EntitlementService.add_grant_listener``."""
+
+        self.invalidate(entitlement.user_id, entitlement.product_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._decisions.clear()
+
+
+__all__ = ["EntitlementDecision", "EntitlementDecisionCache"]
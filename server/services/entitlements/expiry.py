@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+from server.expiry import ExpiryScheduler
+from server.models import Entitlement
+from .store import AnyEntitlementStore
+
+_BATCH_SIZE = int(os.environ.get("ENTITLEMENT_EXPIRY_BATCH_SIZE", "500"))
+_POLL_SECONDS = float(os.environ.get("ENTITLEMENT_EXPIRY_POLL_SECONDS", "60"))
+
+# The store keeps its own expiry index, so the scheduler only tracks one key.
+_SWEEP_KEY = "entitlements"
+
+
+class EntitlementExpirySweeper:
+    """Flips active entitlements to ``expired`` in bulk once ``expires_at`` passes.
+
+    An ``ExpiryScheduler`` wakes the sweeper when the store's earliest expiry is
+    due. Each pass expires at most ``batch_size`` entitlements in one store
+    write and comes back straight away if more are due. Grants made in this
+    process reschedule the sweep through ``on_grant``. Grants made in other
+    processes are noticed within ``poll_interval`` seconds.
+
+    Gate checks do not depend on the sweep: ``Entitlement.is_active`` already
+    compares the precomputed ``expires_epoch``. The sweep makes the stored
+    status match, for listings, exports and other readers of the records.
+    """
+
+    def __init__(
+        self,
+        store: AnyEntitlementStore,
+        *,
+        batch_size: int = _BATCH_SIZE,
+        poll_interval: float = _POLL_SECONDS,
+        slice_seconds: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._store = store
+        self._batch_size = max(batch_size, 1)
+        self._poll_interval = poll_interval
+        self._scheduler = ExpiryScheduler(self._sweep, slice_seconds=slice_seconds, clock=clock)
+        self._scheduler.schedule(_SWEEP_KEY, clock())
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    @property
+    def scheduler(self) -> ExpiryScheduler:
+        return self._scheduler
+
+    def on_grant(self, entitlement: Entitlement) -> None:
+        """Grant listener for ``EntitlementService.add_grant_listener``."""
+
+        if entitlement.status == "active" and entitlement.expires_epoch is not None:
+            self._scheduler.schedule(_SWEEP_KEY, entitlement.expires_epoch)
+
+    def _sweep(self, key: Hashable, now: float) -> Optional[float]:
+        expired = self._store.expire_due(now, limit=self._batch_size)
+        with self._lock:
+            self.expired += len(expired)
+        if len(expired) >= self._batch_size:
+            return now  # more may be due; yield the slice and come straight back
+        poll_at = now + self._poll_interval
+        next_expiry = self._store.next_expiry()
+        return poll_at if next_expiry is None else min(next_expiry, poll_at)
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Run one sweep if it is due; returns the number of batches run."""
+
+        return self._scheduler.run_pending(now)
+
+    def start(self, interval: float = 1.0) -> threading.Thread:
+        return self._scheduler.start(interval)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._scheduler.stop(timeout)
+
+
+__all__ = ["EntitlementExpirySweeper"]
@@ -6,6 +6,7 @@ from .apple import AppleVerificationAdapter
 from .base import VerificationAdapter, VerificationError, VerificationResult
 from .google import GoogleVerificationAdapter
 from .stripe import StripeVerificationAdapter
+from .transport import HttpStatusError, HttpTransport, HttpTransportError, default_transport
 
 
 def create_default_adapters() -> Dict[str, VerificationAdapter]:
@@ -19,9 +20,13 @@ def create_default_adapters() -> Dict[str, VerificationAdapter]:
 __all__ = [
     "AppleVerificationAdapter",
     "GoogleVerificationAdapter",
+    "HttpStatusError",
+    "HttpTransport",
+    "HttpTransportError",
     "StripeVerificationAdapter",
     "VerificationAdapter",
     "VerificationError",
     "VerificationResult",
     "create_default_adapters",
+    "default_transport",
 ]
@@ -5,9 +5,10 @@ import json
 import os
 from collections.abc import Mapping
 from datetime import datetime, timezone
-from typing import Any, Callable
+from typing import Any
 
 from .base import VerificationError, VerificationResult
+from .transport import HttpPost, default_transport
 from .utils import dev_sandbox_enabled, future_iso, sandbox_result
 
 _SANDBOX_SUBSCRIPTIONS_URL = "https://api.storekit-sandbox.itunes.apple.com/inApps/v1/subscriptions/lookup"
@@ -28,11 +29,12 @@ def _encode_jwt(header: Mapping[str, Any], claims: Mapping[str, Any], private_ke
 class AppleVerificationAdapter:
     provider = "apple"
 
-    def __init__(self, *, http_post: Callable[[str, bytes, Mapping[str, str]], bytes] | None = None) -> None:
+    def __init__(self, *, http_post: HttpPost | None = None) -> None:
         self._issuer_id = os.environ.get("APPLE_ISSUER_ID")
         self._key_id = os.environ.get("APPLE_KEY_ID")
         self._private_key = os.environ.get("APPLE_PRIVATE_KEY")
-        self._http_post = http_post or self._default_http_post
+        # The shared pooled transport keeps the connection to Apple alive between receipts.
+        self._http_post = http_post or default_transport().post
 
     def verify(
         self,
@@ -103,13 +105,5 @@ class AppleVerificationAdapter:
             expires_at=expires_at or future_iso(30),
         )
 
-    @staticmethod
-    def _default_http_post(url: str, body: bytes, headers: Mapping[str, str]) -> bytes:  # pragma: no cover - network
-        import urllib.request
-
-        request = urllib.request.Request(url, data=body, headers=dict(headers), method="POST")
-        with urllib.request.urlopen(request, timeout=5) as handle:  # type: ignore[call-arg]
-            return handle.read()
-
 
 __all__ = ["AppleVerificationAdapter"]
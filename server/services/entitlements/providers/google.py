@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import json
 import os
 from collections.abc import Mapping
 from typing import Any, Callable
 
 from .base import VerificationError, VerificationResult
+from .transport import HttpPost, default_transport
 from .utils import dev_sandbox_enabled, sandbox_result
 
 
 class GoogleVerificationAdapter:
     provider = "google"
 
-    def __init__(self, *, http_post: Callable[[Mapping[str, Any]], Mapping[str, Any]] | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        http_post: Callable[[Mapping[str, Any]], Mapping[str, Any]] | None = None,
+        transport: HttpPost | None = None,
+    ) -> None:
         self._credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        self._verify_url = os.environ.get("GOOGLE_VERIFICATION_URL")
+        self._transport = transport
         self._http_post = http_post or self._default_http_post
 
     def verify(
@@ -54,9 +63,15 @@ class GoogleVerificationAdapter:
             expires_at=str(expires_at) if expires_at is not None else None,
         )
 
-    @staticmethod
-    def _default_http_post(payload: Mapping[str, Any]) -> Mapping[str, Any]:  # pragma: no cover - network placeholder
-        raise RuntimeError("google verification transport not configured")
+    def _default_http_post(self, payload: Mapping[str, Any]) -> Mapping[str, Any]:
+        """POST the purchase to ``GOOGLE_VERIFICATION_URL`` over the pooled transport."""
+
+        if not self._verify_url:
+            raise RuntimeError("google verification transport not configured")
+        post = self._transport or default_transport().post
+        body = json.dumps(payload).encode("utf-8")
+        response = post(self._verify_url, body, {"Content-Type": "application/json"})
+        return json.loads(response.decode("utf-8"))
 
 
 __all__ = ["GoogleVerificationAdapter"]
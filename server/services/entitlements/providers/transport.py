@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import http.client
+import os
+import random
+import ssl
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# ``(url, body, headers) -> response body``, the shape of the adapters' ``http_post`` hooks.
+HttpPost = Callable[[str, bytes, Mapping[str, str]], bytes]
+
+_TIMEOUT_SECONDS = float(os.environ.get("VERIFICATION_HTTP_TIMEOUT_SECONDS", "5"))
+_MAX_CONNECTIONS_PER_HOST = int(os.environ.get("VERIFICATION_HTTP_MAX_CONNECTIONS", "8"))
+_RETRIES = int(os.environ.get("VERIFICATION_HTTP_RETRIES", "2"))
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Failures worth retrying: protocol errors, refused or reset connections, timeouts.
+_CONNECTION_ERRORS = (http.client.HTTPException, ConnectionError, OSError)
+
+_Origin = Tuple[str, str, int]
+
+
+class HttpTransportError(RuntimeError):
+    """Raised when a request cannot be completed."""
+
+
+class HttpStatusError(HttpTransportError):
+    """Raised for a non-2xx response once retries are exhausted."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+
+@dataclass(frozen=True, slots=True)
+class HttpResponse:
+    status: int
+    body: bytes
+
+
+class _StaleConnection(Exception):
+    """A pooled keep-alive connection was closed by the server while idle."""
+
+
+class _HostPool:
+    """Keep-alive connections to one origin, at most ``max_connections`` at once.
+
+    Mirrors ``server.resp.ConnectionPool``: idle connections are reused, callers
+    wait up to ``timeout`` for a free slot, and a connection that fails
+    mid-exchange is discarded rather than returned.
+    """
+
+    def __init__(
+        self,
+        origin: _Origin,
+        *,
+        timeout: float,
+        max_connections: int,
+        ssl_context: Optional[ssl.SSLContext],
+    ) -> None:
+        self._origin = origin
+        self._timeout = timeout
+        self._ssl_context = ssl_context
+        self._idle: List[http.client.HTTPConnection] = []
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def idle_connections(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _open(self) -> http.client.HTTPConnection:
+        scheme, host, port = self._origin
+        if scheme == "https":
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=self._timeout, context=self._ssl_context
+            )
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=self._timeout)
+        with self._lock:
+            self.opened += 1
+        return connection
+
+    @contextmanager
+    def connection(self, *, fresh: bool = False) -> Iterator[Tuple[http.client.HTTPConnection, bool]]:
+        """Yield ``(connection, reused)``; ``fresh`` skips the idle connections."""
+
+        if not self._slots.acquire(timeout=self._timeout):
+            raise HttpTransportError(f"no free connection to {self._origin[1]} after {self._timeout}s")
+        try:
+            connection = None
+            if not fresh:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+            reused = connection is not None
+            if connection is None:
+                connection = self._open()
+            try:
+                yield connection, reused
+            except BaseException:
+                # A half-finished exchange would desynchronise the next caller.
+                connection.close()
+                raise
+            if connection.sock is not None:  # not closed by a ``Connection: close`` reply
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class HttpTransport:
+    """Thread-safe HTTP client shared by the store verification adapters.
+
+    Connections are kept alive in a pool per origin, so only the first request
+    to a provider pays for the TCP and TLS handshakes. At most
+    ``max_connections_per_host`` requests to one origin are in flight at once,
+    and the rest wait for a free connection. ``timeout`` bounds connecting,
+    each socket read and the wait for a connection.
+
+    A request that fails on a pooled connection the server already closed is
+    resent at once on a new connection. Other connection errors and
+    ``429``/``5xx`` responses are retried up to ``retries`` times, after a sleep
+    with full jitter capped at ``max_backoff``. Receipt lookups are read-only on
+    the provider side, so resending a ``POST`` is safe.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = _TIMEOUT_SECONDS,
+        max_connections_per_host: int = _MAX_CONNECTIONS_PER_HOST,
+        retries: int = _RETRIES,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if max_connections_per_host < 1:
+            raise ValueError("max_connections_per_host must be at least 1")
+        self._timeout = timeout
+        self._max_connections = max_connections_per_host
+        self._retries = max(retries, 0)
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._ssl_context = ssl_context
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._pools: Dict[_Origin, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, origin: _Origin) -> _HostPool:
+        with self._lock:
+            pool = self._pools.get(origin)
+            if pool is None:
+                pool = self._pools[origin] = _HostPool(
+                    origin,
+                    timeout=self._timeout,
+                    max_connections=self._max_connections,
+                    ssl_context=self._ssl_context,
+                )
+            return pool
+
+    def connections_opened(self) -> int:
+        with self._lock:
+            pools = list(self._pools.values())
+        return sum(pool.opened for pool in pools)
+
+    def post(self, url: str, body: bytes, headers: Mapping[str, str]) -> bytes:
+        """``HttpPost`` hook: POST ``body`` and return the 2xx response body."""
+
+        response = self.request("POST", url, body=body, headers=headers)
+        if not 200 <= response.status < 300:
+            raise HttpStatusError(response.status, response.body)
+        return response.body
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> HttpResponse:
+        """Send one request with retries; non-2xx responses are returned, not raised."""
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        pool = self._pool((parts.scheme, parts.hostname, port))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = dict(headers or {})
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(pool, method, target, body, request_headers)
+            except _CONNECTION_ERRORS as exc:
+                if attempt >= self._retries:
+                    raise HttpTransportError(f"{method} {url} failed: {exc}") from exc
+            else:
+                if response.status not in _RETRY_STATUSES or attempt >= self._retries:
+                    return response
+            self._sleep(self._rng.uniform(0.0, min(self._max_backoff, self._backoff * 2**attempt)))
+            attempt += 1
+
+    def _send(
+        self,
+        pool: _HostPool,
+        method: str,
+        target: str,
+        body: bytes | None,
+        headers: Dict[str, str],
+    ) -> HttpResponse:
+        try:
+            return self._exchange(pool, method, target, body, headers, fresh=False)
+        except _StaleConnection:
+            return self._exchange(pool, method, target, body, headers, fresh=True)
+
+    def _exchange(
+        self,
+        pool: _HostPool,
+        method: str,
+        target: str,
+        body: bytes | None,
+        headers: Dict[str, str],
+        *,
+        fresh: bool,
+    ) -> HttpResponse:
+        with pool.connection(fresh=fresh) as (connection, reused):
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                if reused:
+                    raise _StaleConnection() from exc
+                raise
+            data = response.read()
+            if response.will_close:
+                connection.close()
+            return HttpResponse(response.status, data)
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+_DEFAULT_TRANSPORT: Optional[HttpTransport] = None
+_DEFAULT_TRANSPORT_LOCK = threading.Lock()
+
+
+def default_transport() -> HttpTransport:
+    """Process-wide transport, configured from the environment on first use."""
+
+    global _DEFAULT_TRANSPORT
+    with _DEFAULT_TRANSPORT_LOCK:
+        if _DEFAULT_TRANSPORT is None:
+            _DEFAULT_TRANSPORT = HttpTransport()
+        return _DEFAULT_TRANSPORT
+
+
+__all__ = [
+    "HttpPost",
+    "HttpResponse",
+    "HttpStatusError",
+    "HttpTransport",
+    "HttpTransportError",
+    "default_transport",
+]
@@ -0,0 +1,97 @@
+"""Entitlement records as the JSON store journals them.
+
+``EntitlementStore`` folds its journal into an ``EntitlementState`` with these
+helpers, and the SQLite migrator reads the same files with them.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from server.models import Entitlement
+from server.services.journal import Record
+
+
+class EntitlementState:
+    """Entitlements by user and product, plus an expiry index over active ones.
+
+    ``expiry`` is a min-heap of ``(expires_epoch, user_id, product_id)``. An
+    entry goes stale when the entitlement is renewed, revoked or expired, and
+    stale entries are dropped lazily as they reach the top.
+    """
+
+    __slots__ = ("users", "expiry")
+
+    def __init__(self) -> None:
+        # user id -> product id -> entitlement, in first-grant order.
+        self.users: Dict[str, Dict[str, Entitlement]] = {}
+        self.expiry: List[Tuple[float, str, str]] = []
+
+    def get(self, user_id: str, product_id: str) -> Optional[Entitlement]:
+        return self.users.get(user_id, {}).get(product_id)
+
+    def _is_live(self, entry: Tuple[float, str, str]) -> bool:
+        expires_epoch, user_id, product_id = entry
+        current = self.get(user_id, product_id)
+        return current is not None and current.status == "active" and current.expires_epoch == expires_epoch
+
+    def next_expiry(self) -> Optional[float]:
+        while self.expiry and not self._is_live(self.expiry[0]):
+            heapq.heappop(self.expiry)
+        return self.expiry[0][0] if self.expiry else None
+
+    def pop_due(self, now: float, limit: int) -> List[Entitlement]:
+        due: List[Entitlement] = []
+        seen = set()
+        while self.expiry and self.expiry[0][0] <= now and len(due) < limit:
+            entry = heapq.heappop(self.expiry)
+            # A revoked-then-restored entitlement can leave two live entries behind.
+            if entry[1:] not in seen and self._is_live(entry):
+                seen.add(entry[1:])
+                due.append(self.get(entry[1], entry[2]))  # type: ignore[arg-type]
+        return due
+
+
+def apply_record(state: EntitlementState, record: Record) -> None:
+    """Fold one journaled record into ``state``."""
+
+    try:
+        entitlement = Entitlement.from_dict(record)
+    except ValueError:
+        return  # an unknown status; older code would have failed reading it too
+    products = state.users.setdefault(entitlement.user_id, {})
+    previous = products.get(entitlement.product_id)
+    products[entitlement.product_id] = entitlement
+    if entitlement.status != "active" or entitlement.expires_epoch is None:
+        return
+    if previous is not None and previous.status == "active" and previous.expires_epoch == entitlement.expires_epoch:
+        return  # re-verifying a receipt; the existing heap entry still covers it
+    heapq.heappush(state.expiry, (entitlement.expires_epoch, entitlement.user_id, entitlement.product_id))
+
+
+def snapshot_records(state: EntitlementState) -> Iterator[Record]:
+    """The records that rebuild ``state``, one per entitlement."""
+
+    for products in state.users.values():
+        for entitlement in products.values():
+            yield entitlement.to_dict()
+
+
+def legacy_records(document: Any) -> Optional[List[Record]]:
+    """Records from the ``{user_id: [entitlement, ...]}`` document older releases rewrote in place."""
+
+    if not isinstance(document, dict) or not all(isinstance(entries, list) for entries in document.values()):
+        return None
+    records: List[Record] = []
+    for user_id, entries in document.items():
+        seen = set()
+        for item in entries:
+            # The old store matched the first entry per product; later duplicates were dead.
+            if isinstance(item, dict) and item.get("productId") not in seen:
+                seen.add(item.get("productId"))
+                records.append({"userId": user_id, **item})
+    return records
+
+
+__all__ = ["EntitlementState", "apply_record", "legacy_records", "snapshot_records"]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from fastapi import HTTPException, status
 
@@ -15,7 +15,7 @@ from .providers import (
 )
 from .providers.metrics import increment as increment_metric
 from .providers.utils import sandbox_result
-from .store import EntitlementStore
+from .store import AnyEntitlementStore, open_store
 from .webhooks import WebhookEventStore
 
 
@@ -30,23 +30,41 @@ class EntitlementService:
 
     def __init__(
         self,
-        store: EntitlementStore | None = None,
+        store: AnyEntitlementStore | None = None,
         *,
         adapters: Dict[str, VerificationAdapter] | None = None,
         webhook_store: WebhookEventStore | None = None,
     ) -> None:
-        self._store = store or EntitlementStore()
+        self._store = store or open_store()
         self._adapters = adapters or create_default_adapters()
         self._webhook_store = webhook_store or WebhookEventStore()
+        self._grant_listeners: List[Callable[[Entitlement], None]] = []
 
     @property
-    def store(self) -> EntitlementStore:
+    def store(self) -> AnyEntitlementStore:
         return self._store
 
     @property
     def webhook_store(self) -> WebhookEventStore:
         return self._webhook_store
 
+    def add_grant_listener(self, listener: Callable[[Entitlement], None]) -> None:
+        """Call ``listener`` with every entitlement this service grants, after it is stored."""
+
+        self._grant_listeners.append(listener)
+
+    def _grant(self, result: VerificationResult, source: str) -> Entitlement:
+        entitlement = self._store.grant(
+            user_id=result.user_id,
+            product_id=result.product_id,
+            status=result.status,
+            source=source,
+            expires_at=result.expires_at,
+        )
+        for listener in self._grant_listeners:
+            listener(entitlement)
+        return entitlement
+
     # -- Receipt verification -------------------------------------------------
     def verify_and_grant(
         self,
@@ -80,14 +98,7 @@ class EntitlementService:
                 expires_at=result.expires_at,
             )
 
-        entitlement = self._store.grant(
-            user_id=user_id,
-            product_id=result.product_id,
-            status=result.status,
-            source=provider_key,
-            expires_at=result.expires_at,
-        )
-        return entitlement
+        return self._grant(result, provider_key)
 
     # -- Stripe webhook -------------------------------------------------------
     def process_stripe_checkout(
@@ -137,13 +148,7 @@ class EntitlementService:
                 detail={"status": "error", "reason": str(exc)},
             ) from exc
 
-        entitlement = self._store.grant(
-            user_id=result.user_id,
-            product_id=result.product_id,
-            status=result.status,
-            source=provider,
-            expires_at=result.expires_at,
-        )
+        entitlement = self._grant(result, provider)
         increment_metric(provider, "verified")
         self._webhook_store.record(provider, event_id, "processed")
         return WebhookOutcome(status="granted", entitlement=entitlement)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from server.models import Entitlement
+from server.models.entitlement import expiry_epoch
+from server.services.journal import read_records
+from .records import EntitlementState, apply_record, legacy_records
+
+DEFAULT_DB_PATH = Path(os.environ.get("ENTITLEMENTS_DB_PATH", "data/entitlements.sqlite3"))
+
+_COLUMNS = "user_id, product_id, status, source, expires_at, created_at"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entitlements (
+    user_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL,
+    expires_at TEXT,
+    created_at TEXT NOT NULL,
+    expires_epoch REAL,
+    PRIMARY KEY (user_id, product_id)
+)
+"""
+# Only active rows can expire, so the partial index stays as small as the live set.
+_EXPIRY_INDEX = """
+CREATE INDEX IF NOT EXISTS entitlements_active_expiry
+ON entitlements (expires_epoch) WHERE status = 'active' AND expires_epoch IS NOT NULL
+"""
+# Statements are module constants so sqlite3's per-connection statement cache
+# prepares each one once and reuses it.
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM entitlements WHERE user_id = ? AND product_id = ?"
+_SELECT_USER = f"SELECT {_COLUMNS} FROM entitlements WHERE user_id = ? ORDER BY rowid"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM entitlements ORDER BY rowid"
+_SELECT_ACTIVE = """
+SELECT 1 FROM entitlements WHERE user_id = ? AND product_id = ? AND status = 'active'
+AND (expires_epoch IS NULL OR expires_epoch > ?)
+"""
+_NEXT_EXPIRY = "SELECT MIN(expires_epoch) FROM entitlements WHERE status = 'active' AND expires_epoch IS NOT NULL"
+_EXPIRE_DUE = f"""
+UPDATE entitlements SET status = 'expired' WHERE rowid IN (
+    SELECT rowid FROM entitlements
+    WHERE status = 'active' AND expires_epoch IS NOT NULL AND expires_epoch <= ?
+    ORDER BY expires_epoch LIMIT ?
+) RETURNING {_COLUMNS}
+"""
+# An existing row keeps its created_at, matching ``Entitlement.update``.
+_UPSERT = f"""
+INSERT INTO entitlements ({_COLUMNS}, expires_epoch) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, product_id) DO UPDATE SET
+    status = excluded.status,
+    source = excluded.source,
+    expires_at = excluded.expires_at,
+    expires_epoch = excluded.expires_epoch
+"""
+_UPSERT_RETURNING = _UPSERT + f" RETURNING {_COLUMNS}"
+
+_Row = Tuple[str, str, str, str, Optional[str], str]
+
+
+def _to_entitlement(row: _Row) -> Entitlement:
+    user_id, product_id, status, source, expires_at, created_at = row
+    return Entitlement(
+        user_id=user_id,
+        product_id=product_id,
+        status=status,  # type: ignore[arg-type]
+        source=source,  # type: ignore[arg-type]
+        expires_at=expires_at,
+        created_at=created_at,
+    )
+
+
+def _to_row(entitlement: Entitlement) -> Tuple[object, ...]:
+    return (
+        entitlement.user_id,
+        entitlement.product_id,
+        entitlement.status,
+        entitlement.source,
+        entitlement.expires_at,
+        entitlement.created_at,
+        entitlement.expires_epoch,
+    )
+
+
+def _migrate(connection: sqlite3.Connection) -> None:
+    """Add and backfill ``expires_epoch`` in databases created before it existed."""
+
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(entitlements)")}
+    if "expires_epoch" not in columns:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(entitlements)")}
+            if "expires_epoch" not in columns:  # another process may have won the race
+                connection.execute("ALTER TABLE entitlements ADD COLUMN expires_epoch REAL")
+                rows = connection.execute(
+                    "SELECT rowid, expires_at FROM entitlements WHERE expires_at IS NOT NULL"
+                ).fetchall()
+                connection.executemany(
+                    "UPDATE entitlements SET expires_epoch = ? WHERE rowid = ?",
+                    [(expiry_epoch(expires_at), rowid) for rowid, expires_at in rows],
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    connection.execute(_EXPIRY_INDEX)
+
+
+class SqliteEntitlementStore:
+    """SQLite-backed store for entitlement records.
+
+    Same interface as ``EntitlementStore``. Rows are keyed on
+    ``(user_id, product_id)``, so lookups and upserts are B-tree operations
+    instead of a full file parse or rewrite. The database runs in WAL mode so
+    readers never block the single writer, and several worker processes can
+    share one file. Each thread gets its own connection.
+    """
+
+    def __init__(self, path: Path | None = None, *, timeout: float = 5.0) -> None:
+        self._path = path or DEFAULT_DB_PATH
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute(_SCHEMA)
+        _migrate(connection)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: every statement is its own transaction unless one is opened
+            # explicitly. Only ``close`` touches a connection from another thread.
+            connection = sqlite3.connect(
+                str(self._path), timeout=self._timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def list_for_user(self, user_id: str) -> List[Entitlement]:
+        rows = self._connection().execute(_SELECT_USER, (user_id,)).fetchall()
+        return [_to_entitlement(row) for row in rows]
+
+    def upsert(self, entitlement: Entitlement) -> Entitlement:
+        rows = self._connection().execute(_UPSERT_RETURNING, _to_row(entitlement)).fetchall()
+        return _to_entitlement(rows[0])
+
+    def upsert_many(self, entitlements: Iterable[Entitlement]) -> int:
+        """Upsert ``entitlements`` in one transaction; returns how many were written."""
+
+        connection = self._connection()
+        rows = [_to_row(entitlement) for entitlement in entitlements]
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(_UPSERT, rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return len(rows)
+
+    def grant(
+        self,
+        *,
+        user_id: str,
+        product_id: str,
+        status: str,
+        source: str,
+        expires_at: str | None,
+    ) -> Entitlement:
+        normalized = product_id.lower()
+        entitlement = Entitlement.new(
+            user_id=user_id,
+            product_id=normalized,
+            status=status,  # type: ignore[arg-type]
+            source=source,  # type: ignore[arg-type]
+            expires_at=expires_at,
+        )
+        return self.upsert(entitlement)
+
+    def get(self, user_id: str, product_id: str) -> Optional[Entitlement]:
+        row = self._connection().execute(_SELECT_ONE, (user_id, product_id)).fetchone()
+        return _to_entitlement(row) if row is not None else None
+
+    def has_active(self, user_id: str, product_id: str) -> bool:
+        row = self._connection().execute(_SELECT_ACTIVE, (user_id, product_id, time.time())).fetchone()
+        return row is not None
+
+    def next_expiry(self) -> Optional[float]:
+        """Earliest ``expires_epoch`` among active entitlements, or ``None``."""
+
+        return self._connection().execute(_NEXT_EXPIRY).fetchone()[0]
+
+    def expire_due(self, now: float | None = None, *, limit: int = 500) -> List[Entitlement]:
+        """Mark up to ``limit`` active entitlements past their expiry as expired.
+
+        One ``UPDATE`` driven by the partial expiry index; returns the updated records.
+        """
+
+        cutoff = time.time() if now is None else now
+        rows = self._connection().execute(_EXPIRE_DUE, (cutoff, limit)).fetchall()
+        # RETURNING order is unspecified; report in expiry order like the JSON store.
+        return sorted((_to_entitlement(row) for row in rows), key=lambda item: item.expires_epoch or 0.0)
+
+    def iter_all(self) -> Iterator[Entitlement]:
+        for row in self._connection().execute(_SELECT_ALL):
+            yield _to_entitlement(row)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+def migrate_json_store(json_path: Path, store: SqliteEntitlementStore) -> int:
+    """Copy every record from an ``EntitlementStore`` file into ``store``.
+
+    ``json_path`` is the configured JSON store path; its ``.jsonl`` journal is
+    read when there is one, else the document at the path itself. The source
+    is only read: nothing is converted, no lock file is created and a missing
+    file copies nothing. Runs as a single transaction and upserts, so re-running
+    it after a partial cut-over is safe. Returns the number of records copied.
+    """
+
+    return store.upsert_many(_read_json_store(json_path))
+
+
+def _read_json_store(json_path: Path) -> List[Entitlement]:
+    journal = json_path.with_suffix(".jsonl")
+    source = journal if journal.exists() else json_path
+    data = source.read_bytes() if source.exists() else b""
+    state = EntitlementState()
+    for record in read_records(data, legacy_records):
+        apply_record(state, record)
+    return [item for products in state.users.values() for item in products.values()]
+
+
+__all__ = ["DEFAULT_DB_PATH", "SqliteEntitlementStore", "migrate_json_store"]
@@ -1,77 +1,77 @@
 from __future__ import annotations
 
-import json
 import os
-import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
 
 from server.models import Entitlement
+from server.services.journal import JournaledFile, Record
+from .records import EntitlementState, apply_record, legacy_records, snapshot_records
 
-DEFAULT_PATH = Path(os.environ.get("ENTITLEMENTS_STORE_PATH", "data/entitlements.json"))
-
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .sqlite_store import SqliteEntitlementStore
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+DEFAULT_PATH = Path(os.environ.get("ENTITLEMENTS_STORE_PATH", "data/entitlements.json"))
 
+_JOURNALS: Dict[Path, JournaledFile[EntitlementState]] = {}
+_JOURNALS_LOCK = threading.Lock()
 
-def _load_raw(path: Path) -> Dict[str, List[dict]]:
-    if not path.exists():
-        return {}
-    try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            if isinstance(data, dict):
-                return {key: value if isinstance(value, list) else [] for key, value in data.items()}
-    except json.JSONDecodeError:
-        pass
-    return {}
 
+def _journal_for(path: Path) -> JournaledFile[EntitlementState]:
+    """One journal per file per process, shared by every store opened on it."""
 
-def _save_raw(payload: Dict[str, List[dict]], path: Path) -> None:
-    _ensure_parent(path)
-    fd, tmp_name = tempfile.mkstemp(prefix="entitlements_", suffix=".json", dir=str(path.parent))
-    os.close(fd)
-    tmp_path = Path(tmp_name)
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=2)
-    tmp_path.replace(path)
+    with _JOURNALS_LOCK:
+        journal = _JOURNALS.get(path)
+        if journal is None:
+            journal = _JOURNALS[path] = JournaledFile(
+                path.with_suffix(".jsonl"),
+                initial=EntitlementState,
+                apply=apply_record,
+                snapshot=snapshot_records,
+                legacy=legacy_records,
+                legacy_path=path,
+            )
+        return journal
 
 
 class EntitlementStore:
-    """File-backed store for entitlement records."""
+    """File-backed store for entitlement records.
+
+    The records live in a ``JournaledFile`` named ``<name>.jsonl`` next to
+    ``path``; a whole document an older release left at ``path`` is imported
+    on first open and never rewritten. Each grant appends one JSON line and
+    reads are served from the state materialised in memory, so checks cost a
+    ``stat`` and writes cost one record rather than a rewrite of every user.
+    Active entitlements with an expiry are also indexed in a min-heap, which is
+    what ``expire_due`` sweeps.
+    """
 
     def __init__(self, path: Path | None = None) -> None:
         self._path = path or DEFAULT_PATH
+        self._journal = _journal_for(self._path)
 
     @property
     def path(self) -> Path:
-        return self._path
+        return self._journal.path
 
     def list_for_user(self, user_id: str) -> List[Entitlement]:
-        raw = _load_raw(self._path)
-        entries = raw.get(user_id, [])
-        return [Entitlement.from_dict(item) for item in entries]
+        return self._journal.read(lambda state: list(state.users.get(user_id, {}).values()))
 
     def upsert(self, entitlement: Entitlement) -> Entitlement:
-        raw = _load_raw(self._path)
-        entries = raw.setdefault(entitlement.user_id, [])
-        updated = entitlement
-        for idx, item in enumerate(entries):
-            if item.get("productId") == entitlement.product_id:
-                existing = Entitlement.from_dict(item)
-                updated = existing.update(
-                    status=entitlement.status,
-                    source=entitlement.source,
-                    expires_at=entitlement.expires_at,
-                )
-                entries[idx] = updated.to_dict()
-                break
-        else:
-            entries.append(entitlement.to_dict())
-        raw[entitlement.user_id] = entries
-        _save_raw(raw, self._path)
-        return updated
+        def _merge(state: EntitlementState) -> Record:
+            existing = state.get(entitlement.user_id, entitlement.product_id)
+            if existing is None:
+                return entitlement.to_dict()
+            updated = existing.update(
+                status=entitlement.status,
+                source=entitlement.source,
+                expires_at=entitlement.expires_at,
+            )
+            return updated.to_dict()
+
+        return Entitlement.from_dict(self._journal.append_from(_merge))
 
     def grant(
         self,
@@ -93,18 +93,56 @@ class EntitlementStore:
         return self.upsert(entitlement)
 
     def get(self, user_id: str, product_id: str) -> Optional[Entitlement]:
-        raw = _load_raw(self._path)
-        for item in raw.get(user_id, []):
-            if item.get("productId") == product_id:
-                return Entitlement.from_dict(item)
-        return None
+        return self._journal.read(lambda state: state.get(user_id, product_id))
 
     def has_active(self, user_id: str, product_id: str) -> bool:
         entitlement = self.get(user_id, product_id)
-        return entitlement is not None and entitlement.status == "active"
+        return entitlement is not None and entitlement.is_active(time.time())
+
+    def iter_all(self) -> Iterable[Entitlement]:
+        return self._journal.read(
+            lambda state: [item for products in state.users.values() for item in products.values()]
+        )
+
+    def next_expiry(self) -> Optional[float]:
+        """Earliest ``expires_epoch`` among active entitlements, or ``None``."""
+
+        return self._journal.read(lambda state: state.next_expiry())
+
+    def expire_due(self, now: float | None = None, *, limit: int = 500) -> List[Entitlement]:
+        """Mark up to ``limit`` active entitlements past their expiry as expired.
+
+        The transitions are journaled as one batch; returns the updated records.
+        """
+
+        cutoff = time.time() if now is None else now
+        next_expiry = self.next_expiry()
+        if next_expiry is None or next_expiry > cutoff:
+            return []  # the common case, answered without taking the write lock
+
+        def _expire(state: EntitlementState) -> List[Record]:
+            return [
+                entitlement.update(status="expired", source=entitlement.source, expires_at=entitlement.expires_at).to_dict()
+                for entitlement in state.pop_due(cutoff, limit)
+            ]
+
+        return [Entitlement.from_dict(record) for record in self._journal.extend_from(_expire)]
+
+    def compact(self) -> None:
+        self._journal.compact()
+
+
+AnyEntitlementStore = Union[EntitlementStore, "SqliteEntitlementStore"]
+
+
+def open_store() -> AnyEntitlementStore:
+    """Store selected by ``ENTITLEMENTS_STORE_BACKEND`` ("json", the default, or "sqlite")."""
+
+    backend = os.environ.get("ENTITLEMENTS_STORE_BACKEND", "json").lower()
+    if backend == "sqlite":
+        from .sqlite_store import SqliteEntitlementStore
 
-    def iter_all(self) -> Iterable[Entitlement]:  # pragma: no cover - not used in tests
-        raw = _load_raw(self._path)
-        for entries in raw.values():
-            for item in entries:
-                yield Entitlement.from_dict(item)
+        return SqliteEntitlementStore()
+    if backend != "json":
+        raise ValueError(f"Unsupported entitlement store backend: {backend}")
+    return EntitlementStore()
@@ -1,54 +1,67 @@
 from __future__ import annotations
 
-import json
 import os
-import tempfile
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from server.services.journal import JournaledFile, Record
 
 _DEFAULT_PATH = Path(os.environ.get("WEBHOOK_EVENTS_STORE_PATH", "data/webhook_events.json"))
+_RETENTION_SECONDS = float(os.environ.get("WEBHOOK_EVENTS_RETENTION_DAYS", "30")) * 86400
+_COMPACT_INTERVAL_SECONDS = float(os.environ.get("WEBHOOK_EVENTS_COMPACT_INTERVAL_SECONDS", "3600"))
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-
-def _load_raw(path: Path) -> Dict[str, Dict[str, Dict[str, str]]]:
-    if not path.exists():
-        return {}
-    try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            if isinstance(data, dict):
-                normalized: Dict[str, Dict[str, Dict[str, str]]] = {}
-                for provider, entries in data.items():
-                    if not isinstance(entries, dict):
-                        continue
-                    normalized[str(provider)] = {
-                        str(event_id): item
-                        for event_id, item in entries.items()
-                        if isinstance(item, dict)
-                    }
-                return normalized
-    except json.JSONDecodeError:
-        return {}
-    return {}
-
-
-def _save_raw(payload: Mapping[str, Dict[str, Dict[str, str]]], path: Path) -> None:
-    _ensure_parent(path)
-    fd, tmp_name = tempfile.mkstemp(prefix="webhook_events_", suffix=".json", dir=str(path.parent))
-    os.close(fd)
-    tmp_path = Path(tmp_name)
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=2)
-    tmp_path.replace(path)
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _timestamp(value: object) -> float:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+_Events = Dict[str, Dict[str, Tuple[float, str]]]
+
+
+def _apply(events: _Events, record: Record) -> None:
+    provider = str(record.get("provider", ""))
+    event_id = str(record.get("eventId", ""))
+    if provider and event_id:
+        events.setdefault(provider, {})[event_id] = (
+            _timestamp(record.get("processedAt")),
+            str(record.get("status", "")),
+        )
+
+
+def _snapshot(events: _Events) -> Iterator[Record]:
+    for provider, entries in events.items():
+        for event_id, (processed_at, status) in entries.items():
+            yield {"provider": provider, "eventId": event_id, "status": status, "processedAt": _iso(processed_at)}
+
+
+def _legacy_records(document: Any) -> Optional[List[Record]]:
+    """Records from the ``{provider: {event_id: record}}`` document older releases rewrote in place."""
+
+    if not isinstance(document, dict) or not all(isinstance(entries, dict) for entries in document.values()):
+        return None
+    return [
+        {"provider": str(provider), "eventId": str(event_id), **item}
+        for provider, entries in document.items()
+        for event_id, item in entries.items()
+        if isinstance(item, dict)
+    ]
 
 
 @dataclass(frozen=True, slots=True)
@@ -60,33 +73,94 @@ class WebhookEventRecord:
 
 
 class WebhookEventStore:
-    def __init__(self, path: Path | None = None) -> None:
-        self._path = path or _DEFAULT_PATH
+    """Idempotency ledger for provider webhooks, kept in a ``JournaledFile``.
+
+    Every processed event is one appended journal line and the ids live in an
+    in-memory dict per provider, so ``is_duplicate`` is a dict lookup however
+    long the history grows. Lookups see events other workers recorded.
+
+    Compaction drops events older than ``retention_seconds``. It runs in the
+    background every ``compact_interval`` seconds, and whenever the journal has
+    doubled since it was last compacted. The journal lives next to ``path``
+    as ``<name>.jsonl``; a document the old whole-document store left at
+    ``path`` is imported into it on first open and left as it was.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        retention_seconds: float = _RETENTION_SECONDS,
+        compact_interval: float = _COMPACT_INTERVAL_SECONDS,
+    ) -> None:
+        path = path or _DEFAULT_PATH
+        self._journal: JournaledFile[_Events] = JournaledFile(
+            path.with_suffix(".jsonl"),
+            initial=dict,
+            apply=_apply,
+            snapshot=_snapshot,
+            legacy=_legacy_records,
+            legacy_path=path,
+        )
+        self._retention_seconds = retention_seconds
+        self._compact_interval = compact_interval
+        self._last_compaction = time.monotonic()
+        self._compaction: Optional[threading.Thread] = None
 
     @property
     def path(self) -> Path:
-        return self._path
+        return self._journal.path
+
+    def __len__(self) -> int:
+        return self._journal.read(lambda events: sum(len(entries) for entries in events.values()))
 
     def is_duplicate(self, provider: str, event_id: str) -> bool:
-        raw = _load_raw(self._path)
-        provider_events = raw.get(provider, {})
-        return event_id in provider_events
+        return self._journal.read(lambda events: event_id in events.get(provider, ()))
 
     def record(self, provider: str, event_id: str, status: str) -> WebhookEventRecord:
-        raw = _load_raw(self._path)
-        provider_events = raw.setdefault(provider, {})
-        record = {
-            "status": status,
-            "processedAt": _now_iso(),
-        }
-        provider_events[event_id] = record
-        _save_raw(raw, self._path)
+        processed_at = _now_iso()
+        self._journal.append({"provider": provider, "eventId": event_id, "status": status, "processedAt": processed_at})
+        if time.monotonic() - self._last_compaction >= self._compact_interval:
+            self._compact_in_background()
         return WebhookEventRecord(
             provider=provider,
             event_id=event_id,
             status=status,
-            processed_at=record["processedAt"],
+            processed_at=processed_at,
         )
 
+    def compact(self, now: float | None = None) -> int:
+        """Rewrite the journal without events past retention; returns how many were dropped."""
+
+        cutoff = (time.time() if now is None else now) - self._retention_seconds
+
+        def _drop_expired(events: _Events) -> int:
+            dropped = 0
+            for entries in events.values():
+                expired = [event_id for event_id, (processed_at, _) in entries.items() if processed_at < cutoff]
+                for event_id in expired:
+                    del entries[event_id]
+                dropped += len(expired)
+            return dropped
+
+        self._last_compaction = time.monotonic()
+        return self._journal.compact(_drop_expired) or 0
+
+    def _compact_in_background(self) -> None:
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._last_compaction = time.monotonic()
+        self._compaction = threading.Thread(target=self.compact, name="siq-webhook-compaction", daemon=True)
+        self._compaction.start()
+
+    def wait_for_compaction(self) -> None:
+        if self._compaction is not None:
+            self._compaction.join()
+        self._journal.wait_for_compaction()
+
+    def close(self) -> None:
+        self.wait_for_compaction()
+        self._journal.close()
+
 
 __all__ = ["WebhookEventRecord", "WebhookEventStore"]
@@ -0,0 +1,435 @@
+"""Append-only JSON-lines journal with an in-memory materialised state.
+
+File-backed stores used to load the whole document, change one record and
+rewrite everything, which costs O(total) bytes per change. A ``JournaledFile``
+instead appends one JSON line per mutation and folds it into state kept in
+memory, so a change costs O(record). Once the journal has grown well past its
+last compacted size it is rewritten from the state through the usual temp
+file and rename.
+
+Several worker processes may share a journal. Writers and compactions take
+an ``fcntl`` lock on a ``<name>.lock`` file next to the journal, and
+concurrent writers in one process are group committed: one thread writes the
+whole queued batch and fsyncs it once on behalf of everybody waiting.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; journals are then single-process only
+    fcntl = None  # type: ignore[assignment]
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+Record = Dict[str, Any]
+
+
+def _ensure_parent(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - platforms without directory handles
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def encode_record(record: Record) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def parse_lines(data: bytes) -> Iterable[Record]:
+    """The JSON objects in ``data``, one per line; torn or corrupt lines are skipped."""
+
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # a torn or corrupt line
+        if isinstance(record, dict):
+            yield record
+
+
+def read_records(data: bytes, legacy: Optional[Callable[[Any], Optional[Iterable[Record]]]] = None) -> Iterable[Record]:
+    """Records in a store file: the whole document if ``legacy`` accepts it, else its JSON lines."""
+
+    # Journals hold one object per line; older stores wrote one indented document.
+    if legacy is not None and data.lstrip().startswith(b"{"):
+        try:
+            imported = legacy(json.loads(data))
+        except ValueError:
+            imported = None
+        if imported is not None:
+            return imported
+    return parse_lines(data)
+
+
+class _PendingWrite:
+    __slots__ = ("build", "records", "error", "done")
+
+    def __init__(self, build: Callable[[Any], List[Record]]) -> None:
+        self.build = build
+        self.records: List[Record] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class JournaledFile(Generic[S]):
+    """State of type ``S`` materialised from a JSON-lines journal at ``path``.
+
+    ``apply(state, record)`` folds one record into the state. It sees each
+    record at least once and in file order, so it must be idempotent (upserts
+    and deletes keyed on the record are). ``snapshot(state)`` yields the
+    records that rebuild the state, and is what compaction writes.
+
+    Older stores kept one whole JSON document at ``legacy_path``. When the
+    journal does not exist yet it is created from that file, which ``legacy``
+    turns into records (it returns ``None`` for anything that is not such a
+    document, whose JSON lines are then imported as they are). The old file is
+    only read, so a release that still loads it keeps working after a rollback.
+
+    Every read first loads lines other processes appended since the last look,
+    which costs one ``stat`` when nothing changed. If another process compacted
+    the file, the state is rebuilt from its copy. Reads take no file lock.
+
+    Writes hold the inter-process lock while they catch up, build their record
+    and append it, so a read-modify-write through ``append_from`` cannot lose
+    another process's update. Threads that write while a commit is in flight
+    queue up and the next one to run writes the whole queue with one
+    ``write`` and one ``fsync``, so the fsync cost is shared by every
+    concurrent writer rather than paid by each. ``commit_window`` seconds of
+    extra wait lets a batch fill up further; ``fsync=False`` leaves flushing
+    to the OS. A write returns once its batch is durable, although readers in
+    this process may see the record while the fsync is still running.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        initial: Callable[[], S],
+        apply: Callable[[S, Record], None],
+        snapshot: Callable[[S], Iterable[Record]],
+        legacy: Optional[Callable[[Any], Optional[Iterable[Record]]]] = None,
+        legacy_path: Optional[Path] = None,
+        compact_ratio: float = 2.0,
+        min_compact_bytes: int = 1 << 20,
+        fsync: bool = True,
+        commit_window: float = 0.0,
+    ) -> None:
+        self._path = path
+        self._initial = initial
+        self._apply = apply
+        self._snapshot = snapshot
+        self._legacy = legacy
+        self._legacy_path = legacy_path
+        self._compact_ratio = compact_ratio
+        self._min_compact_bytes = min_compact_bytes
+        self._fsync = fsync
+        self._commit_window = commit_window
+        self._state = initial()
+        self._lock = threading.RLock()
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._lock_depth = 0
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._compacted_bytes = 0
+        self._compaction: Optional[threading.Thread] = None
+        # Group commit: writes queue in ``_pending`` while another thread is committing.
+        self._queue = threading.Condition(threading.Lock())
+        self._pending: List[_PendingWrite] = []
+        self._committing = False
+        self.commits = 0
+        self.fsyncs = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    # -- Locking ------------------------------------------------------------------
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the inter-process lock; callers already hold ``self._lock``.
+
+        The lock lives on a separate file because compaction replaces the
+        journal itself. It is reentrant within the thread holding ``self._lock``.
+        """
+
+        if fcntl is None or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        if self._lock_fd is None:
+            _ensure_parent(self._path)
+            self._lock_fd = os.open(self._path.with_name(self._path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._lock_depth = 1
+        try:
+            yield
+        finally:
+            self._lock_depth = 0
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # -- Reading ------------------------------------------------------------------
+    def read(self, view: Callable[[S], T]) -> T:
+        """Catch up with the file, then return ``view(state)`` computed under the lock.
+
+        ``view`` must not keep references to mutable parts of the state.
+        """
+
+        with self._lock:
+            self._ensure_open()
+            self._catch_up()
+            return view(self._state)
+
+    def _ensure_open(self) -> None:
+        if self._fd is not None:
+            return
+        with self._file_lock():
+            # Checked under the lock, so only one process imports the legacy file.
+            legacy = self._legacy_path
+            if legacy is not None and legacy != self._path and legacy.exists() and not self._path.exists():
+                self._import(legacy.read_bytes())
+                return
+            self._reset()
+            self._catch_up()
+            self._compacted_bytes = self._offset
+
+    def _import(self, data: bytes) -> None:
+        for record in read_records(data, self._legacy):
+            self._apply(self._state, record)
+        lines = [encode_record(record) for record in self._snapshot(self._state)]
+        self._replace_with(self._write_copy(lines))
+
+    def _open_fd(self) -> None:
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _reset(self) -> None:
+        self._close_fd()
+        self._state = self._initial()
+        self._open_fd()
+        self._offset = 0
+
+    def _catch_up(self) -> None:
+        """Apply lines appended since the last read, by this or any other process."""
+
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            self._reset()  # removed; start again from the empty file just created
+            return
+        if stat.st_ino == self._inode and stat.st_size <= self._offset:
+            return
+        try:
+            handle = open(self._path, "rb")
+        except FileNotFoundError:
+            self._reset()
+            return
+        with handle:
+            inode = os.fstat(handle.fileno()).st_ino
+            if inode != self._inode:
+                # Replaced by another process's compaction; rebuild from the new file.
+                self._reset()
+                if inode != self._inode:
+                    return  # replaced yet again while reopening; the next call retries
+            handle.seek(self._offset)
+            data = handle.read()
+        complete = data.rfind(b"\n") + 1
+        for record in parse_lines(data[:complete]):
+            self._apply(self._state, record)
+        self._offset += complete
+
+    # -- Writing ------------------------------------------------------------------
+    def append(self, record: Record) -> None:
+        """Apply ``record`` to the state and append it to the journal."""
+
+        self.append_from(lambda _: record)
+
+    def append_from(self, build: Callable[[S], Record]) -> Record:
+        """Append the record ``build(state)`` returns and apply it; returns the record.
+
+        ``build`` runs under both locks against up-to-date state, so a
+        read-modify-write such as an upsert is atomic across processes.
+        """
+
+        return self.extend_from(lambda state: [build(state)])[0]
+
+    def extend_from(self, build: Callable[[S], List[Record]]) -> List[Record]:
+        """Append every record ``build(state)`` returns and apply them in order.
+
+        The records go out in the same ``write`` and ``fsync``, which makes a bulk
+        change cost one commit rather than one per record.
+        """
+
+        write = _PendingWrite(build)
+        with self._queue:
+            self._pending.append(write)
+            while self._committing and not write.done:
+                self._queue.wait()
+            if not write.done:
+                self._committing = True
+        if not write.done:
+            self._lead_commits()
+        if write.error is not None:
+            raise write.error
+        return write.records
+
+    def _lead_commits(self) -> None:
+        if self._commit_window > 0:
+            time.sleep(self._commit_window)
+        with self._queue:
+            batch, self._pending = self._pending, []
+        try:
+            self._commit(batch)
+        except BaseException as exc:
+            for write in batch:
+                if write.error is None:
+                    write.error = exc
+        finally:
+            with self._queue:
+                for write in batch:
+                    write.done = True
+                # A waiter whose write is still queued becomes the next leader.
+                self._committing = False
+                self._queue.notify_all()
+
+    def _commit(self, batch: List[_PendingWrite]) -> None:
+        with self._lock:
+            with self._file_lock():
+                self._ensure_open()
+                self._catch_up()
+                size = os.fstat(self._fd).st_size  # type: ignore[arg-type]
+                # Every writer holds the file lock, so an unterminated tail was torn by a crash.
+                lines: List[bytes] = [b"\n"] if size > self._offset else []
+                for write in batch:
+                    try:
+                        records = write.build(self._state)
+                        encoded = [encode_record(record) for record in records]
+                    except Exception as exc:
+                        write.error = exc
+                        continue
+                    for record in records:
+                        self._apply(self._state, record)
+                    write.records = records
+                    lines.extend(encoded)
+                data = b"".join(lines)
+                if data:
+                    os.write(self._fd, data)  # type: ignore[arg-type]
+                self._offset = size = size + len(data)
+            self.commits += 1
+            # A compaction may swap the descriptor once the lock is released.
+            sync_fd = os.dup(self._fd) if self._fsync and data else None  # type: ignore[arg-type]
+            if size >= max(self._min_compact_bytes, self._compacted_bytes * self._compact_ratio):
+                self.compact_in_background()
+        if sync_fd is not None:
+            try:
+                os.fsync(sync_fd)
+            finally:
+                os.close(sync_fd)
+            self.fsyncs += 1
+
+    # -- Compaction ---------------------------------------------------------------
+    def compact(self, prepare: Optional[Callable[[S], T]] = None) -> Optional[T]:
+        """Rewrite the journal as ``snapshot(state)``; returns what ``prepare`` returned.
+
+        ``prepare(state)`` runs under the lock first, which is where callers
+        drop expired records or replace the state wholesale. The copy is written
+        without holding any lock. Lines appended to the journal meanwhile, by any
+        process, are copied over before the swap; if another process compacted
+        in between, the compaction starts over from its copy.
+        """
+
+        while True:
+            with self._lock:
+                with self._file_lock():
+                    self._ensure_open()
+                    self._catch_up()
+                    result = prepare(self._state) if prepare is not None else None
+                    lines = [encode_record(record) for record in self._snapshot(self._state)]
+                    inode, base = self._inode, self._offset
+            tmp_name: Optional[str] = self._write_copy(lines)
+            try:
+                with self._lock:
+                    with self._file_lock():
+                        self._catch_up()
+                        if self._inode == inode:
+                            with open(self._path, "rb") as handle:
+                                handle.seek(base)
+                                tail = handle.read(self._offset - base)
+                            with open(tmp_name, "ab") as copy:  # type: ignore[arg-type]
+                                copy.write(tail)
+                            self._replace_with(tmp_name)  # type: ignore[arg-type]
+                            tmp_name = None
+                            return result
+            finally:
+                if tmp_name is not None:
+                    os.unlink(tmp_name)
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Start ``compact`` on a daemon thread unless one is already running."""
+
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return None
+            self._compaction = threading.Thread(target=self.compact, name="siq-journal-compaction", daemon=True)
+            self._compaction.start()
+            return self._compaction
+
+    def wait_for_compaction(self) -> None:
+        thread = self._compaction
+        if thread is not None:
+            thread.join()
+
+    def _write_copy(self, lines: List[bytes]) -> str:
+        _ensure_parent(self._path)
+        fd, tmp_name = tempfile.mkstemp(prefix=f"{self._path.stem}_", suffix=".jsonl", dir=str(self._path.parent))
+        with os.fdopen(fd, "wb") as handle:
+            handle.writelines(lines)
+        return tmp_name
+
+    def _replace_with(self, tmp_name: str) -> None:
+        """Atomically make the copy at ``tmp_name`` the journal; needs the file lock."""
+
+        with open(tmp_name, "rb+") as handle:
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, self._path)
+        _fsync_directory(self._path.parent)
+        self._close_fd()
+        self._open_fd()
+        self._offset = self._compacted_bytes = os.fstat(self._fd).st_size  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        self.wait_for_compaction()
+        with self._lock:
+            self._close_fd()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+
+__all__ = ["JournaledFile", "Record", "encode_record", "parse_lines", "read_records"]
@@ -0,0 +1,256 @@
+"""Consistent-hash sharding of leaderboard keys across several backends.
+
+Keys are placed on a hash ring with many virtual points per backend, so adding
+or removing a backend only moves the keys adjacent to its points. A ``key_tag``
+function maps each key to the string that is actually hashed, which lets a
+caller keep groups of related keys (a score key and everything derived from it)
+on one backend. ``ShardedClient`` exposes the same command and ``pipeline()``
+API as a single client; multi-key commands are split per shard and their
+replies reassembled in the caller's order.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from server.resp import Pipeline, RespClient
+
+KeyTag = Callable[[str], str]
+
+
+def hash_tag(key: str) -> str:
+    """Redis Cluster convention: hash only the ``{...}`` section when present."""
+
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Maps keys to node names with ``replicas`` virtual points per node."""
+
+    def __init__(self, nodes: Sequence[str], *, replicas: int = 128) -> None:
+        if not nodes:
+            raise ValueError("a hash ring needs at least one node")
+        if len(set(nodes)) != len(nodes):
+            raise ValueError("hash ring node names must be unique")
+        points = sorted((_ring_hash(f"{node}#{replica}"), node) for node in nodes for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect_right(self._hashes, _ring_hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+
+class ShardedPipeline(Pipeline):
+    """Splits queued commands into one pipeline per shard and merges the replies.
+
+    Each shard's pipeline is one round trip, and shards are executed concurrently.
+    ``transaction`` is forwarded per shard, so atomicity holds within a shard only.
+    """
+
+    def __init__(self, client: "ShardedClient", *, transaction: bool = False) -> None:
+        super().__init__()
+        self._client = client
+        self._transaction = transaction
+
+    def execute(self) -> List[Any]:
+        queued, self._queued = self._queued, []
+        if not queued:
+            return []
+        shard_pipes: Dict[int, Pipeline] = {}
+        plans: List[List[Tuple[int, int, tuple]]] = []
+        for name, args in queued:
+            plan: List[Tuple[int, int, tuple]] = []
+            for shard, fragment_args in self._client._fragments(name, args):
+                pipe = shard_pipes.get(shard)
+                if pipe is None:
+                    pipe = shard_pipes[shard] = self._client.shards[shard].pipeline(transaction=self._transaction)
+                plan.append((shard, len(pipe), fragment_args))
+                pipe._queue(name, *fragment_args)
+            plans.append(plan)
+
+        replies = self._client._execute_all(shard_pipes)
+        results: List[Any] = []
+        for (name, args), plan in zip(queued, plans):
+            fragments = [(fragment_args, replies[shard][position]) for shard, position, fragment_args in plan]
+            results.append(_merge(name, args, fragments))
+        return results
+
+
+def _merge(name: str, args: tuple, fragments: List[Tuple[tuple, Any]]) -> Any:
+    if name == "mget":
+        values: Dict[str, Any] = {}
+        for keys, reply in fragments:
+            values.update(zip(keys, reply))
+        return [values[key] for key in args]
+    if name == "delete":
+        return sum(reply for _, reply in fragments)
+    if name in ("mset", "flushall"):
+        return all(reply for _, reply in fragments)
+    ((_, reply),) = fragments
+    return reply
+
+
+class ShardedClient:
+    """Routes commands to one of several backends by consistent hashing of their key.
+
+    ``shards`` maps a stable node name (typically the backend URL) to its client;
+    names rather than list positions feed the ring, so reordering configuration
+    does not move keys.
+    """
+
+    def __init__(
+        self,
+        shards: Mapping[str, Any],
+        *,
+        key_tag: KeyTag = hash_tag,
+        replicas: int = 128,
+    ) -> None:
+        self._names = list(shards)
+        self.shards = [shards[name] for name in self._names]
+        self._index = {name: index for index, name in enumerate(self._names)}
+        self._ring = HashRing(self._names, replicas=replicas)
+        self._key_tag = key_tag
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: Sequence[str],
+        *,
+        timeout: float = 5.0,
+        max_connections: int = 16,
+        key_tag: KeyTag = hash_tag,
+    ) -> "ShardedClient":
+        return cls(
+            {url: RespClient.from_url(url, timeout=timeout, max_connections=max_connections) for url in urls},
+            key_tag=key_tag,
+        )
+
+    def shard_for(self, key: str) -> int:
+        return self._index[self._ring.node_for(self._key_tag(key))]
+
+    def _client_for(self, key: str) -> Any:
+        return self.shards[self.shard_for(key)]
+
+    def _fragments(self, name: str, args: tuple) -> List[Tuple[int, tuple]]:
+        if name == "flushall":
+            return [(shard, ()) for shard in range(len(self.shards))]
+        if name == "mset":
+            (mapping,) = args
+            grouped: Dict[int, Dict[str, Any]] = {}
+            for key, value in mapping.items():
+                grouped.setdefault(self.shard_for(key), {})[key] = value
+            return [(shard, (subset,)) for shard, subset in grouped.items()]
+        if name in ("mget", "delete"):
+            keys: Dict[int, List[str]] = {}
+            for key in dict.fromkeys(args) if name == "mget" else args:
+                keys.setdefault(self.shard_for(key), []).append(key)
+            return [(shard, tuple(subset)) for shard, subset in keys.items()]
+        return [(self.shard_for(args[0]), args)]
+
+    def _execute_all(self, pipes: Dict[int, Pipeline]) -> Dict[int, List[Any]]:
+        if len(pipes) == 1:
+            ((shard, pipe),) = pipes.items()
+            return {shard: pipe.execute()}
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="siq-shard")
+        futures = {shard: self._executor.submit(pipe.execute) for shard, pipe in pipes.items()}
+        return {shard: future.result() for shard, future in futures.items()}
+
+    def _call_multi(self, name: str, *args: object) -> Any:
+        (result,) = self.pipeline()._queue(name, *args).execute()
+        return result
+
+    def pipeline(self, transaction: bool = False) -> ShardedPipeline:
+        return ShardedPipeline(self, transaction=transaction)
+
+    def close(self) -> None:
+        for client in self.shards:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def zadd(self, key: str, mapping: Mapping[str, float], gt: bool = False) -> int:
+        return self._client_for(key).zadd(key, mapping, gt)
+
+    def zincrby(self, key: str, amount: float, member: object) -> float:
+        return self._client_for(key).zincrby(key, amount, member)
+
+    def zscore(self, key: str, member: object) -> Optional[float]:
+        return self._client_for(key).zscore(key, member)
+
+    def zrevrank(self, key: str, member: object) -> Optional[int]:
+        return self._client_for(key).zrevrank(key, member)
+
+    def zcount(self, key: str, min_score: float, max_score: float) -> int:
+        return self._client_for(key).zcount(key, min_score, max_score)
+
+    def zrangebyscore(
+        self,
+        key: str,
+        min_score: float,
+        max_score: float,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+    ) -> List[bytes]:
+        return self._client_for(key).zrangebyscore(key, min_score, max_score, start, num)
+
+    def zrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        return self._client_for(key).zrange_withscores(key, start, stop)
+
+    def zrevrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        return self._client_for(key).zrevrange(key, start, stop)
+
+    def zrevrange_withscores(self, key: str, start: int, stop: int) -> List[Tuple[bytes, float]]:
+        return self._client_for(key).zrevrange_withscores(key, start, stop)
+
+    def zrem(self, key: str, *members: object) -> int:
+        return self._client_for(key).zrem(key, *members)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        return self._client_for(key).zremrangebyscore(key, min_score, max_score)
+
+    def zcard(self, key: str) -> int:
+        return self._client_for(key).zcard(key)
+
+    def set(self, key: str, value: str | bytes) -> bool:
+        return self._client_for(key).set(key, value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client_for(key).get(key)
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        return self._client_for(key).incrby(key, amount)
+
+    def mset(self, mapping: Mapping[str, str | bytes]) -> bool:
+        return self._call_multi("mset", dict(mapping))
+
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        return self._call_multi("mget", *keys) if keys else []
+
+    def delete(self, *keys: str) -> int:
+        return self._call_multi("delete", *keys) if keys else 0
+
+    def flushall(self) -> bool:
+        return self._call_multi("flushall")
+
+
+__all__ = ["HashRing", "ShardedClient", "ShardedPipeline", "hash_tag"]
@@ -4,7 +4,7 @@ import asyncio
 import inspect
 import json as json_module
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 from fastapi import HTTPException, Request
 
@@ -28,6 +28,13 @@ class TestClient:
     def __init__(self, app: "MiniAPI") -> None:
         self._app = app
 
+    def __enter__(self) -> "TestClient":
+        self._app.startup()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
     def post(
         self,
         path: str,
@@ -78,6 +85,27 @@ class TestClient:
 class MiniAPI:
     def __init__(self) -> None:
         self.routes: Dict[Tuple[str, str], Callable[[Dict[str, Any], Dict[str, str]], Any]] = {}
+        self.startup_handlers: List[Callable[[], Any]] = []
+        self._started = False
+
+    def on_event(self, event: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+        if event != "startup":
+            raise ValueError(f"Unsupported event: {event}")
+
+        def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+            self.startup_handlers.append(func)
+            return func
+
+        return decorator
+
+    def startup(self) -> None:
+        """Run the startup handlers once, as the server does before taking traffic."""
+
+        if self._started:
+            return
+        self._started = True
+        for handler in self.startup_handlers:
+            handler()
 
     def post(self, path: str) -> Callable[[Callable[[Dict[str, Any], Dict[str, str]], Any]], Callable[[Dict[str, Any], Dict[str, str]], Any]]:
         def decorator(func: Callable[[Dict[str, Any], Dict[str, str]], Any]) -> Callable[[Dict[str, Any], Dict[str, str]], Any]:
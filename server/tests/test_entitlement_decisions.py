@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from server.models import Entitlement
+from server.services.entitlements import EntitlementDecisionCache, EntitlementService, EntitlementStore
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting(store: EntitlementStore, calls: list):
+    def _lookup(user_id: str, product_id: str) -> Entitlement | None:
+        calls.append((user_id, product_id))
+        return store.get(user_id, product_id)
+
+    return _lookup
+
+
+def test_decisions_are_cached_until_ttl_or_expiry(tmp_path: Path) -> None:
+    store = EntitlementStore(tmp_path / "entitlements.json")
+    store.grant(user_id="u1", product_id="pro", status="active", source="mock", expires_at="2030-01-01T00:00:10Z")
+    calls: list = []
+    clock = _Clock(1893456000.0)  # 2030-01-01T00:00:00Z
+    cache = EntitlementDecisionCache(_counting(store, calls), positive_ttl=60, negative_ttl=2, clock=clock)
+
+    for _ in range(50):
+        assert cache.check("u1", "pro").allowed
+        assert not cache.check("u2", "pro").allowed
+    assert len(calls) == 2
+
+    clock.now += 3  # the deny lapses, the allow does not
+    assert not cache.check("u2", "pro").allowed
+    assert cache.check("u1", "pro").entitlement.product_id == "pro"
+    assert len(calls) == 3
+
+    clock.now += 8  # past expires_at, well inside the positive TTL
+    cache.check("u1", "pro")
+    assert len(calls) == 4
+
+
+def test_service_grants_invalidate_cached_denials(tmp_path: Path) -> None:
+    service = EntitlementService(EntitlementStore(tmp_path / "entitlements.json"))
+    cache = EntitlementDecisionCache(service.store.get, negative_ttl=3600)
+    service.add_grant_listener(cache.on_grant)
+
+    assert not cache.check("u1", "pro").allowed
+    service.verify_and_grant("mock", {"productId": "pro", "receipt": "PRO-1"}, "u1")
+    assert cache.check("u1", "pro").allowed
+
+    service.store.grant(user_id="u1", product_id="pro", status="revoked", source="mock", expires_at=None)
+    assert cache.check("u1", "pro").allowed  # changed behind the service's back
+    cache.invalidate("u1")
+    assert not cache.check("u1", "pro").allowed
+
+
+def test_lookup_racing_a_grant_is_not_cached(tmp_path: Path) -> None:
+    store = EntitlementStore(tmp_path / "entitlements.json")
+    cache: EntitlementDecisionCache
+
+    def _lookup(user_id: str, product_id: str) -> Entitlement | None:
+        stale = store.get(user_id, product_id)
+        entitlement = store.grant(user_id=user_id, product_id=product_id, status="active", source="mock", expires_at=None)
+        cache.on_grant(entitlement)
+        return stale
+
+    cache = EntitlementDecisionCache(_lookup, negative_ttl=3600)
+    assert not cache.check("u1", "pro").allowed
+    assert len(cache) == 0
+
+
+def test_cache_is_bounded() -> None:
+    cache = EntitlementDecisionCache(lambda user_id, product_id: None, max_entries=3)
+    for idx in range(10):
+        cache.check(f"u{idx}", "pro")
+    assert len(cache) == 3
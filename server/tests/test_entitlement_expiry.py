@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from server.models.entitlement import expiry_epoch
+from server.services.entitlements import EntitlementExpirySweeper, EntitlementStore, SqliteEntitlementStore
+
+_PAST = "2020-01-01T00:00:00Z"
+_FUTURE = "2999-01-01T00:00:00Z"
+_NOW = 1893456000.0  # 2030-01-01T00:00:00Z
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path):
+    if request.param == "json":
+        yield EntitlementStore(tmp_path / "entitlements.json")
+        return
+    store = SqliteEntitlementStore(tmp_path / "entitlements.sqlite3")
+    yield store
+    store.close()
+
+
+def _grant(store, user_id: str, product_id: str, expires_at: str | None):
+    return store.grant(user_id=user_id, product_id=product_id, status="active", source="mock", expires_at=expires_at)
+
+
+def test_lapsed_entitlements_are_not_active_before_the_sweep(store) -> None:
+    lapsed = _grant(store, "u1", "pro", _PAST)
+    _grant(store, "u1", "elite", _FUTURE)
+    _grant(store, "u1", "forever", None)
+    assert lapsed.expires_epoch == 1577836800.0 and lapsed.status == "active"
+    assert not store.has_active("u1", "pro")
+    assert store.has_active("u1", "elite") and store.has_active("u1", "forever")
+
+
+def test_expire_due_sweeps_in_expiry_order_and_batches(store) -> None:
+    for day in range(5, 0, -1):
+        _grant(store, f"u{day}", "pro", f"2029-12-0{day}T00:00:00Z")
+    _grant(store, "u9", "pro", _FUTURE)
+    _grant(store, "u1", "pro", _FUTURE)  # a renewal leaves a stale index entry behind
+
+    assert store.next_expiry() == expiry_epoch("2029-12-02T00:00:00Z")
+    first = store.expire_due(_NOW, limit=3)
+    assert [item.user_id for item in first] == ["u2", "u3", "u4"]
+    assert all(item.status == "expired" for item in first)
+    assert [item.user_id for item in store.expire_due(_NOW, limit=3)] == ["u5"]
+    assert store.expire_due(_NOW) == []
+    assert store.get("u3", "pro").status == "expired"
+    assert store.get("u1", "pro").status == "active"
+    assert store.next_expiry() == expiry_epoch(_FUTURE)
+
+
+def test_json_expiry_batch_is_one_commit_and_survives_reload(tmp_path: Path) -> None:
+    path = tmp_path / "entitlements.json"
+    store = EntitlementStore(path)
+    for index in range(20):
+        _grant(store, f"u{index}", "pro", _PAST)
+    journal = store._journal
+    commits = journal.commits
+    assert len(store.expire_due(limit=100)) == 20
+    assert journal.commits == commits + 1
+    assert store.expire_due() == []
+    assert journal.commits == commits + 1
+
+    from server.services.entitlements import store as store_module
+
+    store_module._JOURNALS.pop(path).close()
+    reloaded = EntitlementStore(path)
+    assert {item.status for item in reloaded.iter_all()} == {"expired"}
+    assert reloaded.next_expiry() is None
+
+
+def test_sqlite_store_backfills_expiry_for_older_databases(tmp_path: Path) -> None:
+    path = tmp_path / "entitlements.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE entitlements (user_id TEXT NOT NULL, product_id TEXT NOT NULL, status TEXT NOT NULL,"
+        " source TEXT NOT NULL, expires_at TEXT, created_at TEXT NOT NULL, PRIMARY KEY (user_id, product_id))"
+    )
+    connection.execute("INSERT INTO entitlements VALUES ('u1', 'pro', 'active', 'mock', ?, 'x')", (_PAST,))
+    connection.commit()
+    connection.close()
+
+    store = SqliteEntitlementStore(path)
+    try:
+        assert not store.has_active("u1", "pro")
+        assert store.next_expiry() == 1577836800.0
+        assert [item.status for item in store.expire_due()] == ["expired"]
+        plan = store._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT MIN(expires_epoch) FROM entitlements"
+            " WHERE status = 'active' AND expires_epoch IS NOT NULL"
+        ).fetchall()
+        assert "entitlements_active_expiry" in " ".join(str(row) for row in plan)
+    finally:
+        store.close()
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sweeper_drains_due_entitlements_in_batches(store) -> None:
+    clock = _Clock(_NOW)
+    sweeper = EntitlementExpirySweeper(store, batch_size=2, poll_interval=60, clock=clock)
+    for index in range(5):
+        _grant(store, f"u{index}", "pro", "2029-12-01T00:00:00Z")
+    _grant(store, "late", "pro", "2030-01-01T00:00:30Z")
+
+    for _ in range(3):
+        assert sweeper.run_pending() == 1
+    assert sweeper.expired == 5
+    assert sweeper.scheduler.next_due() == pytest.approx(_NOW + 30)
+    assert sweeper.run_pending() == 0
+
+    clock.now += 30
+    assert sweeper.run_pending() == 1
+    assert store.get("late", "pro").status == "expired"
+    assert sweeper.scheduler.next_due() == pytest.approx(clock.now + 60)
+
+
+def test_sweeper_is_rescheduled_by_grants(store) -> None:
+    clock = _Clock(_NOW)
+    sweeper = EntitlementExpirySweeper(store, poll_interval=3600, clock=clock)
+    assert sweeper.run_pending() == 1
+    granted = _grant(store, "u1", "pro", "2030-01-01T00:00:10Z")
+    sweeper.on_grant(granted)
+    assert sweeper.scheduler.next_due() == pytest.approx(_NOW + 10)
+
+
+def test_sweeper_retries_after_a_failed_sweep(
+    store, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    clock = _Clock(_NOW)
+    sweeper = EntitlementExpirySweeper(store, poll_interval=3600, clock=clock)
+    _grant(store, "u1", "pro", _PAST)
+    expire_due = store.expire_due
+
+    def _busy_once(now, *, limit):
+        monkeypatch.setattr(store, "expire_due", expire_due)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "expire_due", _busy_once)
+    with caplog.at_level("ERROR", logger="siq.expiry"):
+        assert sweeper.run_pending() == 1
+    assert "database is locked" in caplog.text
+    assert sweeper.expired == 0
+    assert sweeper.scheduler.next_due() == pytest.approx(_NOW + 1)
+
+    clock.now += 1
+    assert sweeper.run_pending() == 1
+    assert sweeper.expired == 1
+    assert store.get("u1", "pro").status == "expired"
+
+
+def test_regrants_with_the_same_expiry_expire_once(store) -> None:
+    for _ in range(3):
+        _grant(store, "u1", "pro", _PAST)
+    store.grant(user_id="u1", product_id="pro", status="revoked", source="mock", expires_at=_PAST)
+    _grant(store, "u1", "pro", _PAST)
+    assert [item.user_id for item in store.expire_due(limit=10)] == ["u1"]
+    assert store.expire_due() == []
+    if isinstance(store, EntitlementStore):
+        assert store._journal.read(lambda state: list(state.expiry)) == []
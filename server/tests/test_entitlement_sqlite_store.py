@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from scripts.migrate_entitlements_sqlite import main as migrate_main
+from server.services.entitlements import EntitlementService, EntitlementStore, SqliteEntitlementStore
+from server.services.entitlements.sqlite_store import migrate_json_store
+from server.services.entitlements.store import open_store
+
+
+@pytest.fixture()
+def store(tmp_path: Path):
+    store = SqliteEntitlementStore(tmp_path / "entitlements.sqlite3")
+    yield store
+    store.close()
+
+
+def test_matches_json_store_behaviour(tmp_path: Path, store: SqliteEntitlementStore) -> None:
+    json_store = EntitlementStore(tmp_path / "entitlements.json")
+    for backend in (json_store, store):
+        first = backend.grant(user_id="u1", product_id="PRO", status="active", source="mock", expires_at=None)
+        backend.grant(user_id="u1", product_id="elite", status="active", source="mock", expires_at="2030-01-01T00:00:00Z")
+        updated = backend.grant(user_id="u1", product_id="pro", status="revoked", source="stripe", expires_at=None)
+        assert (updated.status, updated.source, updated.created_at) == ("revoked", "stripe", first.created_at)
+
+    assert store.list_for_user("u1") == json_store.list_for_user("u1")
+    assert [item.product_id for item in store.list_for_user("u1")] == ["pro", "elite"]
+    assert store.get("u1", "elite") == json_store.get("u1", "elite")
+    assert store.get("u1", "missing") is None
+    assert store.has_active("u1", "elite") and not store.has_active("u1", "pro")
+    assert store.list_for_user("nobody") == []
+
+
+def test_runs_in_wal_mode(store: SqliteEntitlementStore) -> None:
+    connection = sqlite3.connect(str(store.path))
+    try:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = connection.execute("PRAGMA index_list(entitlements)").fetchall()
+        assert any(row[3] == "pk" for row in indexes)
+    finally:
+        connection.close()
+
+
+def test_concurrent_writers_share_one_database(tmp_path: Path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    stores = [SqliteEntitlementStore(path) for _ in range(4)]
+
+    def _grant(index: int) -> None:
+        for user in range(50):
+            stores[index].grant(user_id=f"u{user}", product_id=f"p{index}", status="active", source="mock", expires_at=None)
+
+    threads = [threading.Thread(target=_grant, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(list(stores[0].iter_all())) == 200
+    assert {item.product_id for item in stores[3].list_for_user("u7")} == {"p0", "p1", "p2", "p3"}
+    for store in stores:
+        store.close()
+
+
+def test_migrates_json_store_once(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    json_store = EntitlementStore(tmp_path / "entitlements.json")
+    for user in range(20):
+        json_store.grant(user_id=f"u{user}", product_id="pro", status="active", source="apple", expires_at=None)
+    json_store.grant(user_id="u3", product_id="elite", status="expired", source="google", expires_at="2024-01-01T00:00:00Z")
+
+    target = tmp_path / "entitlements.sqlite3"
+    argv = ["--source", str(json_store.path), "--target", str(target)]
+    assert migrate_main(argv) == 0
+    assert "copied 21 entitlements" in capsys.readouterr().out
+    store = SqliteEntitlementStore(target)
+    assert migrate_json_store(json_store.path, store) == 21
+    assert sorted(item.user_id for item in store.iter_all()) == sorted(item.user_id for item in json_store.iter_all())
+    assert store.list_for_user("u3") == json_store.list_for_user("u3")
+    store.close()
+
+
+def test_migration_leaves_the_source_untouched(tmp_path: Path, store: SqliteEntitlementStore) -> None:
+    entry = {"productId": "pro", "status": "active", "source": "mock", "createdAt": "2024-01-01T00:00:00Z"}
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"u1": [entry, {**entry, "status": "expired"}], "u2": [entry]}, indent=2), encoding="utf-8")
+    journal = tmp_path / "journal.json"
+    journal.write_text(
+        "".join(json.dumps({"userId": "u3", **entry, "status": status}) + "\n" for status in ("active", "revoked")),
+        encoding="utf-8",
+    )
+    sources = {path: path.read_bytes() for path in (legacy, journal)}
+
+    assert migrate_json_store(legacy, store) == 2
+    assert migrate_json_store(journal, store) == 1
+    assert migrate_json_store(tmp_path / "missing.json", store) == 0
+
+    assert {path: path.read_bytes() for path in sources} == sources
+    assert sorted(path.name for path in tmp_path.iterdir() if ".json" in path.name) == ["journal.json", "legacy.json"]
+    assert store.get("u1", "pro").status == "active"
+    assert store.get("u3", "pro").status == "revoked"
+
+
+def test_service_uses_configured_backend(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ENTITLEMENTS_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr("server.services.entitlements.sqlite_store.DEFAULT_DB_PATH", tmp_path / "default.sqlite3")
+    service = EntitlementService()
+    assert isinstance(service.store, SqliteEntitlementStore)
+    entitlement = service.verify_and_grant("mock", {"productId": "pro", "receipt": "PRO-1"}, "user-1")
+    assert service.store.get("user-1", entitlement.product_id) == entitlement
+    service.store.close()
+
+    monkeypatch.setenv("ENTITLEMENTS_STORE_BACKEND", "mongo")
+    with pytest.raises(ValueError):
+        open_store()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from server.services import journal as journal_module
+from server.services.entitlements.store import EntitlementStore
+
+
+@pytest.fixture()
+def parses(monkeypatch: pytest.MonkeyPatch) -> list:
+    calls: list = []
+    original = journal_module.parse_lines
+
+    def _counting(data: bytes):
+        calls.append(len(data))
+        return original(data)
+
+    monkeypatch.setattr(journal_module, "parse_lines", _counting)
+    return calls
+
+
+def _record(user: str, product: str, status: str = "active") -> dict:
+    return {"userId": user, "productId": product, "status": status, "source": "mock", "createdAt": "2024-01-01T00:00:00Z"}
+
+
+def _append(path: Path, record: dict) -> None:
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+
+
+def test_reads_are_served_from_memory_while_file_is_unchanged(tmp_path: Path, parses: list) -> None:
+    path = tmp_path / "entitlements.jsonl"
+    _append(path, _record("u1", "pro"))
+    _append(path, _record("u1", "elite", "expired"))
+    store = EntitlementStore(path)
+    for _ in range(100):
+        assert store.has_active("u1", "pro")
+        assert not store.has_active("u1", "elite")
+        assert store.get("u2", "pro") is None
+    assert [item.product_id for item in store.list_for_user("u1")] == ["pro", "elite"]
+    # A second store on the same file shares the loaded state.
+    assert EntitlementStore(path).get("u1", "pro") == store.get("u1", "pro")
+    assert len(parses) == 1
+
+
+def test_changes_by_other_processes_are_picked_up(tmp_path: Path, parses: list) -> None:
+    path = tmp_path / "entitlements.jsonl"
+    store = EntitlementStore(path)
+    assert store.list_for_user("u1") == []
+
+    _append(path, _record("u1", "pro"))
+    assert store.has_active("u1", "pro")
+    _append(path, _record("u1", "pro", "revoked"))
+    assert not store.has_active("u1", "pro")
+
+    # A compaction elsewhere swaps in a new file.
+    replacement = tmp_path / "replacement.json"
+    _append(replacement, _record("u2", "elite"))
+    os.replace(replacement, path)
+    assert store.get("u1", "pro") is None
+    assert store.has_active("u2", "elite")
+
+    path.unlink()
+    assert store.get("u2", "elite") is None
+
+
+def test_own_writes_append_one_line_without_a_reparse(tmp_path: Path, parses: list) -> None:
+    path = tmp_path / "entitlements.jsonl"
+    store = EntitlementStore(path)
+    first = store.grant(user_id="u1", product_id="PRO", status="active", source="mock", expires_at=None)
+    assert store.has_active("u1", "pro")
+    updated = store.grant(user_id="u1", product_id="pro", status="revoked", source="mock", expires_at=None)
+    assert updated.created_at == first.created_at
+    assert not store.has_active("u1", "pro")
+    assert [item.status for item in store.iter_all()] == ["revoked"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    assert parses == []
+
+
+def test_legacy_document_is_imported_once(tmp_path: Path) -> None:
+    path = tmp_path / "entitlements.json"
+    legacy = {"u1": [_record("u1", "pro"), _record("u1", "elite")], "u2": [_record("u2", "pro", "expired")]}
+    path.write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+    original = path.read_bytes()
+    store = EntitlementStore(path)
+    assert [item.product_id for item in store.list_for_user("u1")] == ["pro", "elite"]
+    assert store.path == tmp_path / "entitlements.jsonl"
+    journal = store.path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["userId"] for line in journal] == ["u1", "u1", "u2"]
+    store.grant(user_id="u3", product_id="pro", status="active", source="mock", expires_at=None)
+    # The old document stays readable by a release that still loads it.
+    assert path.read_bytes() == original
+    store.compact()
+    assert not store.has_active("u2", "pro")
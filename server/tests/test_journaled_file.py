@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from server.services.billing import store as billing_store
+from server.services.journal import JournaledFile
+
+
+def _counter(path: Path, **kwargs: object) -> JournaledFile[Dict[str, int]]:
+    def _apply(state: Dict[str, int], record: dict) -> None:
+        state[record["key"]] = record["value"]
+
+    return JournaledFile(
+        path,
+        initial=dict,
+        apply=_apply,
+        snapshot=lambda state: ({"key": key, "value": value} for key, value in state.items()),
+        **kwargs,
+    )
+
+
+def _line_count(path: Path) -> int:
+    return len(path.read_bytes().splitlines())
+
+
+def test_appends_cost_one_line_and_replay_on_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    journal = _counter(path)
+    for value in range(10):
+        journal.append({"key": "a", "value": value})
+        size = path.stat().st_size
+    assert _line_count(path) == 10
+    assert size < 400
+    journal.close()
+    assert _counter(path).read(dict) == {"a": 9}
+
+
+def test_growth_triggers_background_compaction(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    journal = _counter(path, min_compact_bytes=500)
+    for value in range(200):
+        journal.append({"key": f"k{value % 5}", "value": value})
+    journal.wait_for_compaction()
+    assert _line_count(path) < 100
+    journal.close()
+    assert _counter(path).read(dict) == {f"k{idx}": 195 + idx for idx in range(5)}
+
+
+def test_compaction_keeps_appends_made_while_it_runs(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    journal = _counter(path, min_compact_bytes=1 << 30)
+    for value in range(100):
+        journal.append({"key": f"k{value}", "value": value})
+
+    threads = [
+        threading.Thread(target=lambda base=base: [journal.append({"key": f"n{base}-{i}", "value": i}) for i in range(50)])
+        for base in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(3):
+        journal.compact()
+    for thread in threads:
+        thread.join()
+    journal.close()
+    assert len(_counter(path).read(dict)) == 300
+
+
+def test_torn_tail_does_not_swallow_the_next_record(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    path.write_bytes(b'{"key":"a","value":1}\n{"key":"b","va')
+    journal = _counter(path)
+    assert journal.read(dict) == {"a": 1}
+    journal.append({"key": "c", "value": 3})
+    journal.close()
+    assert _counter(path).read(dict) == {"a": 1, "c": 3}
+
+
+def test_legacy_file_is_imported_once_and_left_in_place(tmp_path: Path) -> None:
+    legacy = tmp_path / "state.json"
+    legacy.write_text(json.dumps({"a": 1, "b": 2}, indent=2), encoding="utf-8")
+    path = tmp_path / "state.jsonl"
+    options = {"legacy": lambda document: [{"key": k, "value": v} for k, v in document.items()], "legacy_path": legacy}
+
+    journal = _counter(path, **options)
+    assert journal.read(dict) == {"a": 1, "b": 2}
+    journal.append({"key": "a", "value": 3})
+    journal.close()
+    assert json.loads(legacy.read_text(encoding="utf-8")) == {"a": 1, "b": 2}
+
+    legacy.write_text(json.dumps({"z": 0}), encoding="utf-8")
+    assert _counter(path, **options).read(dict) == {"a": 3, "b": 2}
+
+
+def test_billing_store_journals_tier_changes(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({"u1": {"userId": "u1", "tier": "pro", "expiresAt": None, "provider": "mock"}}, indent=2))
+    original = path.read_bytes()
+    journal = tmp_path / "users.jsonl"
+    assert billing_store.get_user("u1", path)["tier"] == "pro"
+
+    billing_store.set_tier("u2", "elite", "2030-01-01T00:00:00Z", path=path)
+    billing_store.set_tier("u1", "free", None, path=path)
+    lines = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+    assert [(line["userId"], line["tier"]) for line in lines] == [("u1", "pro"), ("u2", "elite"), ("u1", "free")]
+    assert billing_store.get_user("u1", path)["tier"] == "free"
+    assert billing_store.get_user("", path) is None
+
+    users = billing_store.load_store(path)
+    users["u3"] = {"tier": "pro", "expiresAt": None, "provider": "stripe"}
+    del users["u2"]
+    billing_store.save_store(users, path)
+    assert sorted(billing_store.load_store(path)) == ["u1", "u3"]
+    assert billing_store.get_user("u3", path)["userId"] == "u3"
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 2
+    assert path.read_bytes() == original
+
+
+def _increment_with(journal: JournaledFile[Dict[str, int]], times: int, key: str = "n") -> None:
+    for _ in range(times):
+        journal.append_from(lambda state: {"key": key, "value": state.get(key, 0) + 1})
+
+
+def _increment(path: Path, key: str, times: int) -> None:
+    journal = _counter(path, min_compact_bytes=2000)
+    _increment_with(journal, times, key)
+    journal.close()
+
+
+def test_concurrent_writers_are_group_committed(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    journal = _counter(path)
+    threads = [threading.Thread(target=_increment_with, args=(journal, 25)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert journal.read(dict) == {"n": 200}
+    assert journal.fsyncs == journal.commits <= 200
+    journal.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_processes_do_not_lose_updates_across_compactions(tmp_path: Path) -> None:
+    path = tmp_path / "state.jsonl"
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_increment, args=(path, "n", 100)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    journal = _counter(path)
+    for _ in range(5):
+        journal.compact()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+    assert journal.read(dict) == {"n": 400}
+    journal.close()
+    assert _counter(path).read(dict) == {"n": 400}
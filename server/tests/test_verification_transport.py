@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import List
+
+import pytest
+
+from server.services.entitlements.providers import (
+    AppleVerificationAdapter,
+    GoogleVerificationAdapter,
+    HttpStatusError,
+    HttpTransport,
+    HttpTransportError,
+)
+from tests.support import LocalHttpServer
+
+
+def test_sequential_requests_reuse_one_connection() -> None:
+    transport = HttpTransport()
+    with LocalHttpServer() as server:
+        for index in range(20):
+            body = transport.post(f"{server.url}/verify?n={index}", json.dumps({"n": index}).encode(), {})
+            assert json.loads(body) == {"n": index}
+        assert server.connections == 1
+        assert transport.connections_opened() == 1
+        assert server.requests[3][0] == "/verify?n=3"
+    transport.close()
+
+
+def test_concurrency_per_host_is_bounded() -> None:
+    transport = HttpTransport(max_connections_per_host=2)
+    with LocalHttpServer(delay=0.02) as server:
+        threads = [
+            threading.Thread(target=lambda: [transport.post(server.url, b"{}", {}) for _ in range(3)])
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(server.requests) == 18
+        assert server.max_in_flight <= 2
+        assert server.connections == transport.connections_opened() <= 2
+    transport.close()
+
+
+def test_retryable_statuses_are_retried_with_jitter() -> None:
+    statuses = [503, 429, 200]
+    sleeps: List[float] = []
+
+    def _respond(path: str, body: bytes):
+        return statuses.pop(0), {"ok": True}
+
+    transport = HttpTransport(retries=2, backoff=0.1, sleep=sleeps.append)
+    with LocalHttpServer(_respond) as server:
+        assert json.loads(transport.post(server.url, b"{}", {})) == {"ok": True}
+        assert server.connections == 1
+    assert len(sleeps) == 2
+    assert 0.0 <= sleeps[0] <= 0.1 and 0.0 <= sleeps[1] <= 0.2
+    transport.close()
+
+
+def test_errors_surface_once_retries_are_spent() -> None:
+    transport = HttpTransport(retries=1, sleep=lambda _: None)
+    with LocalHttpServer(lambda path, body: (400 if path == "/bad" else 502, {})) as server:
+        with pytest.raises(HttpStatusError) as bad:
+            transport.post(f"{server.url}/bad", b"{}", {})
+        assert bad.value.status == 400 and len(server.requests) == 1
+        with pytest.raises(HttpStatusError) as flaky:
+            transport.post(f"{server.url}/flaky", b"{}", {})
+        assert flaky.value.status == 502 and len(server.requests) == 3
+    with pytest.raises(HttpTransportError):
+        transport.post(server.url, b"{}", {})  # the server is gone
+    transport.close()
+
+
+def test_reads_time_out() -> None:
+    transport = HttpTransport(timeout=0.05, retries=0)
+    with LocalHttpServer(delay=0.5) as server:
+        with pytest.raises(HttpTransportError):
+            transport.post(server.url, b"{}", {})
+    transport.close()
+
+
+def test_connections_dropped_while_idle_are_replaced_without_a_retry() -> None:
+    transport = HttpTransport(retries=0)
+    with LocalHttpServer(drop_idle=True) as server:
+        for _ in range(3):
+            assert transport.post(server.url, b"{}", {}) == b"{}"
+        assert server.connections == 3
+    transport.close()
+
+
+def test_adapters_verify_through_the_pooled_transport(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _respond(path: str, body: bytes):
+        if path.startswith("/inApps"):
+            return 200, {"data": {"attributes": {"productId": "pro", "expiresDate": "2030-01-01T00:00:00Z"}}}
+        return 200, {"productId": json.loads(body)["productId"], "status": "active", "expiresAt": "2030-01-01T00:00:00Z"}
+
+    monkeypatch.setenv("APPLE_ISSUER_ID", "issuer")
+    monkeypatch.setenv("APPLE_KEY_ID", "key")
+    monkeypatch.setenv("APPLE_PRIVATE_KEY", "private")
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "creds.json")
+    monkeypatch.delenv("ENTITLEMENTS_DEV_SANDBOX_OK", raising=False)
+    transport = HttpTransport()
+    with LocalHttpServer(_respond) as server:
+        monkeypatch.setattr(
+            "server.services.entitlements.providers.apple._SANDBOX_SUBSCRIPTIONS_URL",
+            f"{server.url}/inApps/v1/subscriptions/lookup",
+        )
+        monkeypatch.setenv("GOOGLE_VERIFICATION_URL", f"{server.url}/google/verify")
+        apple = AppleVerificationAdapter(http_post=transport.post)
+        google = GoogleVerificationAdapter(transport=transport.post)
+        for _ in range(5):
+            assert apple.verify({"receipt": "token"}, user_id="u1").product_id == "pro"
+            assert google.verify({"productId": "elite"}, user_id="u1").product_id == "elite"
+        assert server.connections == 1
+        assert server.requests[0][1]["Authorization"].startswith("Bearer ")
+    transport.close()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from server.services.entitlements.webhooks import WebhookEventStore
+
+DAY = 86400.0
+
+
+def _lines(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_records_are_appended_and_survive_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.jsonl"
+    store = WebhookEventStore(path)
+    assert not store.is_duplicate("stripe", "evt_1")
+    record = store.record("stripe", "evt_1", "processed")
+    store.record("stripe", "evt_2", "ignored")
+    assert store.is_duplicate("stripe", "evt_1")
+    assert not store.is_duplicate("apple", "evt_1")
+    assert [line["eventId"] for line in _lines(path)] == ["evt_1", "evt_2"]
+    assert _lines(path)[0]["processedAt"] == record.processed_at
+    store.close()
+
+    reopened = WebhookEventStore(path)
+    assert reopened.is_duplicate("stripe", "evt_2")
+    assert len(reopened) == 2
+
+
+def test_sees_events_recorded_by_another_worker(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.jsonl"
+    first, second = WebhookEventStore(path), WebhookEventStore(path)
+    assert not first.is_duplicate("stripe", "evt_1")
+    second.record("stripe", "evt_1", "processed")
+    assert first.is_duplicate("stripe", "evt_1")
+
+    # A compaction by one worker swaps the file under the other.
+    second.compact()
+    second.record("stripe", "evt_2", "processed")
+    assert first.is_duplicate("stripe", "evt_2")
+    first.record("stripe", "evt_3", "processed")
+    assert second.is_duplicate("stripe", "evt_3")
+
+
+def test_compaction_applies_retention(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({"provider": "stripe", "eventId": f"evt_{idx}", "status": "processed", "processedAt": stamp})
+            + "\n"
+            for idx, stamp in enumerate(["2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z", "2024-03-05T00:00:00Z"])
+        ),
+        encoding="utf-8",
+    )
+    store = WebhookEventStore(path, retention_seconds=30 * DAY)
+    assert store.is_duplicate("stripe", "evt_0")
+    now = 1709942400.0  # 2024-03-09T00:00:00Z
+    assert store.compact(now=now) == 1
+    assert not store.is_duplicate("stripe", "evt_0")
+    assert [line["eventId"] for line in _lines(path)] == ["evt_1", "evt_2"]
+    assert _lines(path)[1]["processedAt"] == "2024-03-05T00:00:00Z"
+
+
+def test_background_compaction_keeps_concurrent_appends(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.jsonl"
+    store = WebhookEventStore(path, compact_interval=0.0)
+    for idx in range(20):
+        store.record("stripe", f"evt_{idx}", "processed")
+    store.wait_for_compaction()
+    store.close()
+    assert sorted(line["eventId"] for line in _lines(path)) == sorted(f"evt_{idx}" for idx in range(20))
+    assert len(WebhookEventStore(path)) == 20
+
+
+def test_torn_tail_is_skipped(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.jsonl"
+    store = WebhookEventStore(path)
+    store.record("stripe", "evt_1", "processed")
+    store.close()
+    with open(path, "ab") as handle:
+        handle.write(b'{"provider":"stripe","eventId":"evt_')
+
+    reopened = WebhookEventStore(path)
+    assert len(reopened) == 1
+    reopened.record("stripe", "evt_2", "processed")
+    # The torn record is left on a line of its own rather than swallowing the next one.
+    raw = path.read_text(encoding="utf-8").splitlines()
+    assert raw[1] == '{"provider":"stripe","eventId":"evt_'
+    assert json.loads(raw[2])["eventId"] == "evt_2"
+    assert WebhookEventStore(path).is_duplicate("stripe", "evt_2")
+
+
+def test_imports_legacy_document(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.json"
+    legacy = {
+        "stripe": {
+            "evt_old": {"status": "processed", "processedAt": "2024-01-01T00:00:00Z"},
+            "evt_skip": {"status": "ignored", "processedAt": "2024-01-02T00:00:00Z"},
+        }
+    }
+    path.write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+    original = path.read_bytes()
+    store = WebhookEventStore(path)
+    assert store.is_duplicate("stripe", "evt_old")
+    assert path.read_bytes() == original
+    assert _lines(store.path) == [
+        {"provider": "stripe", "eventId": "evt_old", "status": "processed", "processedAt": "2024-01-01T00:00:00Z"},
+        {"provider": "stripe", "eventId": "evt_skip", "status": "ignored", "processedAt": "2024-01-02T00:00:00Z"},
+    ]
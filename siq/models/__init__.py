@@ -1,13 +1,27 @@
 """Simple pure-Python models used for export and regression tests."""
 
 from .detector import DetectorModel
+from .multihead import DetectorPoseModel
 from .pose import PoseModel
-from .registry import MODEL_REGISTRY, create_default_models, load_model_from_payload
+from .registry import (
+    COMBINED_MODEL_REGISTRY,
+    MODEL_REGISTRY,
+    create_combined_model,
+    create_default_models,
+    get_model,
+    load_model_from_payload,
+)
+from .warmup import ModelWarmup
 
 __all__ = [
     "DetectorModel",
+    "DetectorPoseModel",
     "PoseModel",
+    "COMBINED_MODEL_REGISTRY",
     "MODEL_REGISTRY",
+    "ModelWarmup",
+    "create_combined_model",
     "create_default_models",
+    "get_model",
     "load_model_from_payload",
 ]
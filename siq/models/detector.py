@@ -7,6 +7,8 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List, Sequence
 
+from .features import extract_features
+
 
 @dataclass
 class DetectorOutputs:
@@ -29,24 +31,15 @@ class DetectorModel:
     def forward(self, tensor: List[List[List[List[float]]]]) -> Dict[str, List[List[float]] | List[float]]:
         if len(tensor) == 0:
             raise ValueError("DetectorModel expects a non-empty batch")
-        features = [self._mean_channels(example) for example in tensor]
+        return self.forward_features(extract_features(tensor))
+
+    def forward_features(self, features: List[List[float]]) -> Dict[str, List[List[float]] | List[float]]:
+        """Apply the detection head to precomputed backbone features."""
         logits = [self._apply_linear(feature) for feature in features]
         boxes = [self._to_boxes(vec) for vec in logits]
         scores = [self._sigmoid(vec[0]) for vec in logits]
         return {"boxes": boxes, "scores": scores}
 
-    def _mean_channels(self, example: List[List[List[float]]]) -> List[float]:
-        height = len(example)
-        width = len(example[0]) if height > 0 else 0
-        channels = len(example[0][0]) if width > 0 else 0
-        totals = [0.0 for _ in range(channels)]
-        count = max(height * width, 1)
-        for row in example:
-            for pixel in row:
-                for c, value in enumerate(pixel):
-                    totals[c] += value
-        return [total / count for total in totals]
-
     def _apply_linear(self, feature: List[float]) -> List[float]:
         output = []
         for row, bias in zip(self.weight, self.bias):
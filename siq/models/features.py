@@ -0,0 +1,27 @@
+"""Backbone feature extraction shared by the detector and pose heads."""
+
+from __future__ import annotations
+
+from typing import List
+
+
+def mean_channels(example: List[List[List[float]]]) -> List[float]:
+    """Average every channel over the spatial dimensions of one ``H x W x C`` frame."""
+
+    height = len(example)
+    width = len(example[0]) if height > 0 else 0
+    channels = len(example[0][0]) if width > 0 else 0
+    totals = [0.0 for _ in range(channels)]
+    count = max(height * width, 1)
+    for row in example:
+        for pixel in row:
+            for c, value in enumerate(pixel):
+                totals[c] += value
+    return [total / count for total in totals]
+
+
+def extract_features(tensor: List[List[List[List[float]]]]) -> List[List[float]]:
+    return [mean_channels(example) for example in tensor]
+
+
+__all__ = ["extract_features", "mean_channels"]
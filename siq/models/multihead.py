@@ -0,0 +1,45 @@
+"""Combined detector + pose model sharing one backbone pass per frame batch."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from .detector import DetectorModel
+from .features import extract_features
+from .pose import PoseModel
+
+
+class DetectorPoseModel:
+    MODEL_ID = "detector_pose"
+    # Keyword arguments taking the already built single-head models, by model id.
+    HEADS = (DetectorModel.MODEL_ID, PoseModel.MODEL_ID)
+
+    def __init__(self, detector: DetectorModel | None = None, pose: PoseModel | None = None) -> None:
+        self.detector = detector or DetectorModel()
+        self.pose = pose or PoseModel()
+
+    def forward(self, tensor: List[List[List[List[float]]]]) -> Dict[str, object]:
+        if len(tensor) == 0:
+            raise ValueError("DetectorPoseModel expects a non-empty batch")
+        features = extract_features(tensor)
+        outputs: Dict[str, object] = {}
+        outputs.update(self.detector.forward_features(features))
+        outputs.update(self.pose.forward_features(features))
+        return outputs
+
+    def to_payload(self) -> Dict[str, object]:
+        return {
+            "model_id": self.MODEL_ID,
+            "detector": self.detector.to_payload(),
+            "pose": self.pose.to_payload(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, object]) -> "DetectorPoseModel":
+        return cls(
+            detector=DetectorModel.from_payload(payload["detector"]),  # type: ignore[arg-type]
+            pose=PoseModel.from_payload(payload["pose"]),  # type: ignore[arg-type]
+        )
+
+
+__all__ = ["DetectorPoseModel"]
@@ -6,6 +6,8 @@ import math
 import random
 from typing import Dict, List, Sequence
 
+from .features import extract_features
+
 
 class PoseModel:
     MODEL_ID = "pose"
@@ -26,24 +28,17 @@ class PoseModel:
         self.bias = [float(v) for v in bias]
 
     def forward(self, tensor: List[List[List[List[float]]]]) -> Dict[str, List[List[List[float]]] | List[List[float]]]:
-        features = [self._mean_channels(example) for example in tensor]
+        return self.forward_features(extract_features(tensor))
+
+    def forward_features(
+        self, features: List[List[float]]
+    ) -> Dict[str, List[List[List[float]]] | List[List[float]]]:
+        """Apply the pose head to precomputed backbone features."""
         flat_coords = [self._apply_linear(feature) for feature in features]
         keypoints = [self._reshape(coords) for coords in flat_coords]
         visibility = [[self._sigmoid(point[0]) for point in person] for person in keypoints]
         return {"keypoints": keypoints, "visibility": visibility}
 
-    def _mean_channels(self, example: List[List[List[float]]]) -> List[float]:
-        height = len(example)
-        width = len(example[0]) if height > 0 else 0
-        channels = len(example[0][0]) if width > 0 else 0
-        totals = [0.0 for _ in range(channels)]
-        count = max(height * width, 1)
-        for row in example:
-            for pixel in row:
-                for c, value in enumerate(pixel):
-                    totals[c] += value
-        return [total / count for total in totals]
-
     def _apply_linear(self, feature: List[float]) -> List[float]:
         output = []
         for row, bias in zip(self.weight, self.bias):
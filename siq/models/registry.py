@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import json
+import threading
+from pathlib import Path
 from typing import Dict, Iterable
 
 from .detector import DetectorModel
+from .multihead import DetectorPoseModel
 from .pose import PoseModel
 
 MODEL_REGISTRY = {
@@ -12,6 +16,22 @@ MODEL_REGISTRY = {
     PoseModel.MODEL_ID: PoseModel,
 }
 
+# Multi-head models reuse the heads above and are not exported on their own.
+COMBINED_MODEL_REGISTRY = {
+    DetectorPoseModel.MODEL_ID: DetectorPoseModel,
+}
+
+# Process-wide instances handed out by ``get_model``; ``ModelWarmup`` fills it at boot.
+_SHARED_MODELS: Dict[str, object] = {}
+_SHARED_MODELS_LOCK = threading.Lock()
+
+ARTIFACT_SUFFIXES = {
+    "onnx": ".onnx",
+    "tflite": ".tflite",
+    "coreml": ".mlmodel",
+    "ncnn": ".ncnn.bin",
+}
+
 
 def create_default_models() -> Dict[str, object]:
     """Instantiate the default detector and pose models."""
@@ -19,22 +39,98 @@ def create_default_models() -> Dict[str, object]:
     return {model_id: cls() for model_id, cls in MODEL_REGISTRY.items()}
 
 
+def create_combined_model(
+    model_name: str = DetectorPoseModel.MODEL_ID,
+    models: Dict[str, object] | None = None,
+) -> object:
+    """Build a multi-head model, reusing already constructed heads when given.
+
+    Each combined class lists the model ids of its heads in ``HEADS``; heads
+    missing from ``models`` are built by the class itself.
+    """
+
+    if model_name not in COMBINED_MODEL_REGISTRY:
+        raise KeyError(f"Unknown combined model name '{model_name}'")
+    model_cls = COMBINED_MODEL_REGISTRY[model_name]
+    heads = models or {}
+    return model_cls(**{head: heads.get(head) for head in model_cls.HEADS})
+
+
+def resolve_model_class(model_name: str) -> type:
+    """Return the class registered for a single or combined model name."""
+
+    if model_name in MODEL_REGISTRY:
+        return MODEL_REGISTRY[model_name]
+    if model_name in COMBINED_MODEL_REGISTRY:
+        return COMBINED_MODEL_REGISTRY[model_name]
+    raise KeyError(f"Unknown model name '{model_name}'")
+
+
+def share_model(model_name: str, model: object) -> None:
+    """Make ``model`` the instance ``get_model`` returns for ``model_name``."""
+
+    resolve_model_class(model_name)
+    with _SHARED_MODELS_LOCK:
+        _SHARED_MODELS[model_name] = model
+
+
+def get_model(model_name: str) -> object:
+    """Return the shared instance of ``model_name``, building it on first use.
+
+    Request handlers should take models from here: once warm-up has run this is
+    the loaded and warmed instance, so no request pays for construction.
+    """
+
+    with _SHARED_MODELS_LOCK:
+        model = _SHARED_MODELS.get(model_name)
+    if model is not None:
+        return model
+    if model_name in COMBINED_MODEL_REGISTRY:
+        heads = COMBINED_MODEL_REGISTRY[model_name].HEADS
+        model = create_combined_model(model_name, {head: get_model(head) for head in heads})
+    else:
+        model = resolve_model_class(model_name)()
+    with _SHARED_MODELS_LOCK:
+        return _SHARED_MODELS.setdefault(model_name, model)
+
+
 def load_model_from_payload(model_name: str, payload: Dict[str, object]) -> object:
     """Rehydrate a model from serialized payload data."""
 
-    if model_name not in MODEL_REGISTRY:
-        raise KeyError(f"Unknown model name '{model_name}'")
-    model_cls = MODEL_REGISTRY[model_name]
+    model_cls = resolve_model_class(model_name)
     return model_cls.from_payload(payload)
 
 
+def artifact_path(model_name: str, format_name: str, directory: Path) -> Path:
+    """Return the artifact file holding the payload for ``model_name``."""
+
+    if format_name not in ARTIFACT_SUFFIXES:
+        raise ValueError(f"Unsupported artifact format '{format_name}'")
+    return Path(directory) / f"{model_name}{ARTIFACT_SUFFIXES[format_name]}"
+
+
+def load_model_from_artifact(model_name: str, path: Path) -> object:
+    """Rehydrate a model from an exported artifact file."""
+
+    data = json.loads(Path(path).read_text())
+    return load_model_from_payload(model_name, data["payload"])
+
+
 def available_models() -> Iterable[str]:
     return MODEL_REGISTRY.keys()
 
 
 __all__ = [
+    "ARTIFACT_SUFFIXES",
+    "COMBINED_MODEL_REGISTRY",
     "MODEL_REGISTRY",
+    "artifact_path",
+    "create_combined_model",
     "create_default_models",
+    "get_model",
+    "load_model_from_artifact",
     "load_model_from_payload",
     "available_models",
+    "resolve_model_class",
+    "share_model",
 ]
@@ -0,0 +1,196 @@
+"""Preload configured models and run a warm-up batch before serving traffic."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Sequence
+
+from siq.observability import cv_stage, record_model_warmup
+
+from .registry import (
+    COMBINED_MODEL_REGISTRY,
+    MODEL_REGISTRY,
+    artifact_path,
+    create_combined_model,
+    load_model_from_artifact,
+    resolve_model_class,
+    share_model,
+)
+
+_logger = logging.getLogger("siq.models.warmup")
+
+WARMUP_MODELS_ENV = "SIQ_WARMUP_MODELS"
+ARTIFACT_DIR_ENV = "SIQ_MODEL_ARTIFACT_DIR"
+ARTIFACT_FORMAT_ENV = "SIQ_MODEL_ARTIFACT_FORMAT"
+
+DEFAULT_ARTIFACT_DIR = Path("build/edge_exports")
+DEFAULT_ARTIFACT_FORMAT = "onnx"
+WARMUP_INPUT_SHAPE = (1, 32, 32, 3)
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    model_name: str
+    source: str
+    cold_start_ms: float
+    warm_ms: float
+
+
+def create_warmup_batch(shape: Sequence[int] = WARMUP_INPUT_SHAPE) -> List[List[List[List[float]]]]:
+    """Build a constant mid-grey batch; values only need to exercise the forward pass."""
+
+    batch, height, width, channels = shape
+    return [[[[0.5] * channels for _ in range(width)] for _ in range(height)] for _ in range(batch)]
+
+
+class ModelWarmup:
+    """Loads models named in configuration and tracks whether they are ready to serve.
+
+    Each warmed model is also shared through ``registry.get_model``, which is
+    where request handlers take their models from.
+    """
+
+    def __init__(
+        self,
+        model_names: Sequence[str],
+        *,
+        artifact_dir: Path | None = None,
+        artifact_format: str = DEFAULT_ARTIFACT_FORMAT,
+        warm_iterations: int = 3,
+    ) -> None:
+        known = set(MODEL_REGISTRY) | set(COMBINED_MODEL_REGISTRY)
+        unknown = [name for name in model_names if name not in known]
+        if unknown:
+            raise KeyError(f"Unknown model name(s): {', '.join(unknown)}")
+        self._model_names = list(model_names)
+        self._artifact_dir = artifact_dir or DEFAULT_ARTIFACT_DIR
+        self._artifact_format = artifact_format
+        self._warm_iterations = max(warm_iterations, 1)
+        self._models: Dict[str, object] = {}
+        self._reports: List[WarmupReport] = []
+        self._ready = threading.Event()
+        self._error: Exception | None = None
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls) -> "ModelWarmup":
+        """Build from ``SIQ_WARMUP_MODELS``; unknown names are logged and skipped.
+
+        This runs while ``server.main`` is imported, so a typo in the setting
+        must not stop the server from booting. Nothing is loaded until ``start``.
+        """
+
+        raw_names = os.environ.get(WARMUP_MODELS_ENV, ",".join(MODEL_REGISTRY))
+        known = set(MODEL_REGISTRY) | set(COMBINED_MODEL_REGISTRY)
+        names = []
+        for name in (name.strip() for name in raw_names.split(",")):
+            if not name:
+                continue
+            if name in known:
+                names.append(name)
+            else:
+                _logger.warning("skipping unknown model %r in %s", name, WARMUP_MODELS_ENV)
+        artifact_dir = os.environ.get(ARTIFACT_DIR_ENV)
+        return cls(
+            names,
+            artifact_dir=Path(artifact_dir) if artifact_dir else None,
+            artifact_format=os.environ.get(ARTIFACT_FORMAT_ENV, DEFAULT_ARTIFACT_FORMAT),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def error(self) -> Exception | None:
+        return self._error
+
+    @property
+    def model_names(self) -> List[str]:
+        return list(self._model_names)
+
+    @property
+    def reports(self) -> List[WarmupReport]:
+        return list(self._reports)
+
+    def get(self, model_name: str) -> object:
+        if model_name not in self._models:
+            raise KeyError(f"Model '{model_name}' has not been warmed up")
+        return self._models[model_name]
+
+    def _load(self, model_name: str) -> tuple[object, str]:
+        path = artifact_path(model_name, self._artifact_format, self._artifact_dir)
+        if path.exists():
+            return load_model_from_artifact(model_name, path), "artifact"
+        if model_name in COMBINED_MODEL_REGISTRY:
+            # Reuse heads warmed earlier in this run rather than building new ones.
+            return create_combined_model(model_name, self._models), "default"
+        return resolve_model_class(model_name)(), "default"
+
+    def _warm_model(self, model_name: str, batch: List[List[List[List[float]]]]) -> WarmupReport:
+        with cv_stage(f"warmup.{model_name}") as span:
+            start = perf_counter()
+            model, source = self._load(model_name)
+            model.forward(batch)  # type: ignore[attr-defined]
+            cold_start_ms = (perf_counter() - start) * 1000.0
+
+            warm_start = perf_counter()
+            for _ in range(self._warm_iterations):
+                model.forward(batch)  # type: ignore[attr-defined]
+            warm_ms = (perf_counter() - warm_start) * 1000.0 / self._warm_iterations
+
+            span.set_attribute("model.source", source)
+            span.set_attribute("model.cold_start_ms", cold_start_ms)
+            span.set_attribute("model.warm_ms", warm_ms)
+
+        record_model_warmup(model_name, cold_start_ms, warm_ms, source)
+        self._models[model_name] = model
+        share_model(model_name, model)
+        return WarmupReport(model_name=model_name, source=source, cold_start_ms=cold_start_ms, warm_ms=warm_ms)
+
+    def run(self) -> List[WarmupReport]:
+        """Load and warm every configured model, marking the instance ready on success."""
+
+        batch = create_warmup_batch()
+        try:
+            reports = [self._warm_model(name, batch) for name in self._model_names]
+        except Exception as exc:
+            self._error = exc
+            raise
+        self._reports = reports
+        self._ready.set()
+        return reports
+
+    def start(self) -> threading.Thread:
+        """Run the warm-up on a daemon thread so boot does not block on it.
+
+        Calling it again returns the thread already started.
+        """
+
+        if self._thread is not None:
+            return self._thread
+
+        def _target() -> None:
+            try:
+                self.run()
+            except Exception:  # pragma: no cover - surfaced through ``error``
+                pass
+
+        self._thread = threading.Thread(target=_target, name="siq-model-warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+
+__all__ = [
+    "ModelWarmup",
+    "WarmupReport",
+    "create_warmup_batch",
+]
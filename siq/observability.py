@@ -18,6 +18,18 @@ FRAME_INFERENCE_HISTOGRAM: Histogram = _METER.create_histogram(
     description="Latency to process one frame through the CV pipeline.",
 )
 
+MODEL_COLD_START_HISTOGRAM: Histogram = _METER.create_histogram(
+    "model_cold_start_ms",
+    unit="ms",
+    description="Time to construct or load a model and run its first batch.",
+)
+
+MODEL_WARM_LATENCY_HISTOGRAM: Histogram = _METER.create_histogram(
+    "model_warm_latency_ms",
+    unit="ms",
+    description="Steady-state latency of one warm-up batch after the first call.",
+)
+
 
 @contextmanager
 def cv_stage(name: str) -> Iterator[Span]:
@@ -40,3 +52,10 @@ def record_frame_inference(total_duration_ms: float, frame_count: int) -> None:
         per_frame_ms,
         attributes={"cv.frame_count": normalized_count},
     )
+
+
+def record_model_warmup(model_name: str, cold_start_ms: float, warm_ms: float, source: str) -> None:
+    """Record cold-start and warm latency for a preloaded model."""
+    attributes = {"model.name": model_name, "model.source": source}
+    MODEL_COLD_START_HISTOGRAM.record(cold_start_ms, attributes=attributes)
+    MODEL_WARM_LATENCY_HISTOGRAM.record(warm_ms, attributes=attributes)
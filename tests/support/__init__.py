@@ -0,0 +1,6 @@
+"""Stand-in servers for tests; kept out of the ``server`` package so production never imports them."""
+
+from .http_server import LocalHttpServer
+from .redis_server import LocalRedisServer
+
+__all__ = ["LocalHttpServer", "LocalRedisServer"]
@@ -0,0 +1,96 @@
+"""HTTP/1.1 stand-in server for the store verification transport tests."""
+from __future__ import annotations
+
+import json as json_module
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+HttpReply = Tuple[int, Any]
+
+
+class LocalHttpServer:
+    """HTTP/1.1 keep-alive stand-in for provider verification tests.
+
+    Every ``POST`` is answered by ``respond(path, body)``, which returns
+    ``(status, payload)``; the payload is sent as JSON unless it is already
+    bytes. By default the JSON request body is echoed back. ``delay`` holds
+    each response, ``connections`` counts accepted client connections,
+    ``max_in_flight`` is the most requests handled at once, and ``requests``
+    records ``(path, headers, body)``. With ``drop_idle`` the server closes each
+    connection after responding without saying so, as an idle timeout would.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[str, bytes], HttpReply] | None = None,
+        *,
+        delay: float = 0.0,
+        drop_idle: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.respond = respond or (lambda path, body: (200, json_module.loads(body or b"{}")))
+        self.delay = delay
+        self.drop_idle = drop_idle
+        self.connections = 0
+        self.max_in_flight = 0
+        self.requests: List[Tuple[str, Dict[str, str], bytes]] = []
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        owner = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def handle(self) -> None:
+                with owner._lock:
+                    owner.connections += 1
+                super().handle()
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with owner._lock:
+                    owner.requests.append((self.path, dict(self.headers), body))
+                    owner._in_flight += 1
+                    owner.max_in_flight = max(owner.max_in_flight, owner._in_flight)
+                try:
+                    if owner.delay:
+                        time.sleep(owner.delay)
+                    status, payload = owner.respond(self.path, body)
+                finally:
+                    with owner._lock:
+                        owner._in_flight -= 1
+                data = payload if isinstance(payload, bytes) else json_module.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                if owner.drop_idle:
+                    self.close_connection = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        class _Server(ThreadingHTTPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = _Server((host, port), _Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LocalHttpServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,199 @@
+"""RESP2 stand-in server for leaderboard backend tests and the load-test harness."""
+from __future__ import annotations
+
+import socketserver
+import threading
+from typing import Any, Tuple
+
+from server.leaderboard import InMemoryRedis
+from server.resp import RedisError
+
+
+class LocalRedisServer:
+    """RESP2 stand-in server backed by ``InMemoryRedis`` for backend tests.
+
+    Supports the leaderboard command set plus ``PING``, ``SELECT`` and
+    ``MULTI``/``EXEC``. ``round_trips`` counts socket reads that carried at least
+    one complete command, which is what pipelining is meant to minimise, and
+    ``connections`` counts accepted client connections.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.store = InMemoryRedis()
+        self.round_trips = 0
+        self.commands = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        owner = self
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                with owner._lock:
+                    owner.connections += 1
+                owner._serve_connection(self.request)
+
+        class _Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = _Server((host, port), _Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def __enter__(self) -> "LocalRedisServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _serve_connection(self, connection: Any) -> None:
+        transaction: list | None = None
+        buffer = b""
+        while True:
+            try:
+                chunk = connection.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            pending, buffer = _parse_commands(buffer)
+            if not pending:
+                continue
+            replies = []
+            with self._lock:
+                self.round_trips += 1
+                for parts in pending:
+                    name = parts[0].decode().upper()
+                    args = parts[1:]
+                    self.commands += 1
+                    if name == "MULTI":
+                        transaction = []
+                        replies.append(_encode_reply("OK"))
+                    elif name == "EXEC":
+                        queued, transaction = transaction or [], None
+                        replies.append(_encode_reply([self._dispatch(n, a) for n, a in queued]))
+                    elif transaction is not None:
+                        transaction.append((name, args))
+                        replies.append(_encode_reply("QUEUED"))
+                    else:
+                        try:
+                            replies.append(_encode_reply(self._dispatch(name, args)))
+                        except RedisError as exc:
+                            replies.append(b"-ERR " + str(exc).encode() + b"\r\n")
+            connection.sendall(b"".join(replies))
+
+    def _dispatch(self, name: str, args: list) -> Any:
+        store = self.store
+        # Values may be binary; only key and numeric arguments are read from ``text``.
+        text = [arg.decode("utf-8", "surrogateescape") for arg in args]
+        if name == "PING":
+            return "PONG"
+        if name == "SELECT":
+            return "OK"
+        if name == "ZADD":
+            gt = len(text) > 1 and text[1].upper() == "GT"
+            start = 2 if gt else 1
+            mapping = {text[i + 1]: float(text[i]) for i in range(start, len(text), 2)}
+            return store.zadd(text[0], mapping, gt=gt)
+        if name == "ZINCRBY":
+            return repr(store.zincrby(text[0], float(text[1]), text[2])).encode()
+        if name == "ZSCORE":
+            score = store.zscore(text[0], text[1])
+            return repr(score).encode() if score is not None else None
+        if name == "ZREVRANK":
+            return store.zrevrank(text[0], text[1])
+        if name == "ZCOUNT":
+            return store.zcount(text[0], float(text[1]), float(text[2]))
+        if name == "ZRANGEBYSCORE":
+            if len(text) > 5 and text[3].upper() == "LIMIT":
+                return store.zrangebyscore(text[0], float(text[1]), float(text[2]), int(text[4]), int(text[5]))
+            return store.zrangebyscore(text[0], float(text[1]), float(text[2]))
+        if name == "ZRANGE" and len(text) > 3 and text[3].upper() == "WITHSCORES":
+            scored = store.zrange_withscores(text[0], int(text[1]), int(text[2]))
+            return [item for member, score in scored for item in (member, repr(score).encode())]
+        if name == "ZREVRANGE":
+            if len(text) > 3 and text[3].upper() == "WITHSCORES":
+                scored = store.zrevrange_withscores(text[0], int(text[1]), int(text[2]))
+                return [item for member, score in scored for item in (member, repr(score).encode())]
+            return store.zrevrange(text[0], int(text[1]), int(text[2]))
+        if name == "ZREM":
+            return store.zrem(text[0], *text[1:])
+        if name == "ZREMRANGEBYSCORE":
+            return store.zremrangebyscore(text[0], float(text[1]), float(text[2]))
+        if name == "ZCARD":
+            return store.zcard(text[0])
+        if name == "SET":
+            return "OK" if store.set(text[0], args[1]) else None
+        if name == "MSET":
+            return "OK" if store.mset({args[i].decode(): args[i + 1] for i in range(0, len(args), 2)}) else None
+        if name == "GET":
+            return store.get(text[0])
+        if name == "MGET":
+            return store.mget(*text)
+        if name == "INCRBY":
+            return store.incrby(text[0], int(text[1]))
+        if name == "DEL":
+            return store.delete(*text)
+        if name == "FLUSHALL":
+            store.flushall()
+            return "OK"
+        raise RedisError(f"unknown command '{name}'")
+
+
+def _parse_commands(buffer: bytes) -> Tuple[list, bytes]:
+    """Split complete RESP command arrays off ``buffer``; returns (commands, rest)."""
+
+    commands = []
+    pos = 0
+    while pos < len(buffer):
+        parsed = _parse_command(buffer, pos)
+        if parsed is None:
+            break
+        parts, pos = parsed
+        commands.append(parts)
+    return commands, buffer[pos:]
+
+
+def _parse_command(buffer: bytes, pos: int) -> Tuple[list, int] | None:
+    end = buffer.find(b"\r\n", pos)
+    if end < 0:
+        return None
+    if buffer[pos : pos + 1] != b"*":
+        raise ValueError("expected RESP array")
+    count = int(buffer[pos + 1 : end])
+    pos = end + 2
+    parts = []
+    for _ in range(count):
+        end = buffer.find(b"\r\n", pos)
+        if end < 0:
+            return None
+        length = int(buffer[pos + 1 : end])
+        start = end + 2
+        if len(buffer) < start + length + 2:
+            return None
+        parts.append(buffer[start : start + length])
+        pos = start + length + 2
+    return parts, pos
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, (bytes, bytearray)):
+        return b"$%d\r\n%s\r\n" % (len(value), bytes(value))
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+    raise TypeError(f"cannot encode reply of type {type(value).__name__}")
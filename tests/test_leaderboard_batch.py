@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+
+def _client_for(service: leaderboard.LeaderboardService) -> TestClient:
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    return TestClient(leaderboard.leaderboard_app)
+
+
+@pytest.fixture(autouse=True)
+def _clear_overrides():
+    yield
+    leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+
+
+def _board(service: leaderboard.LeaderboardService, metric: str, window: str, **scope) -> list:
+    events = service.read_player_leaderboard(
+        metric=metric,
+        window=window,
+        scope=scope.get("scope", leaderboard.SCOPE_GLOBAL),
+        country=scope.get("country"),
+        city=scope.get("city"),
+    )
+    return [(event.player_id, event.score) for event in events]
+
+
+def test_batch_reports_per_item_acceptance() -> None:
+    service = leaderboard.LeaderboardService(leaderboard.InMemoryRedis(), player_view=leaderboard.PlayerBestView())
+    now = time.time()
+    response = _client_for(service).post(
+        "/leaderboard/batch",
+        json={
+            "submissions": [
+                {"metric": "hardest_shot", "player_id": "ace", "ball_speed_kph": 131.5, "occurred_at": now,
+                 "location": {"country": "se", "city": "lund"}},
+                {"metric": "most_hits", "player_id": "ace", "hits": 7},
+                {"metric": "hardest_shot", "player_id": "bob"},
+                {"metric": "fastest_lap", "player_id": "cy", "ball_speed_kph": 99.0},
+                {"metric": "hardest_shot", "player_id": "dee", "ball_speed_kph": "fast"},
+                "not-an-object",
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["accepted"], body["rejected"]) == (2, 4)
+    assert [item["status"] for item in body["results"]] == [
+        "accepted", "accepted", "rejected", "rejected", "rejected", "rejected",
+    ]
+    assert "ball_speed_kph" in body["results"][2]["error"]
+    assert _board(service, "hardest_shot", "24h", scope="city", country="SE", city="Lund") == [("ace", 131.5)]
+    assert _board(service, "most_hits", "7d") == [("ace", 7.0)]
+
+
+def test_batch_rejects_malformed_envelopes() -> None:
+    client = _client_for(leaderboard.LeaderboardService(leaderboard.InMemoryRedis()))
+    assert client.post("/leaderboard/batch", json={"submissions": "nope"}).status_code == 400
+    too_many = [{"metric": "most_hits", "player_id": "p", "hits": 1}] * (leaderboard.MAX_BATCH_SUBMISSIONS + 1)
+    assert client.post("/leaderboard/batch", json={"submissions": too_many}).status_code == 400
+
+
+def test_batch_writes_each_key_once_in_a_single_round_trip(monkeypatch: pytest.MonkeyPatch) -> None:
+    with LocalRedisServer() as server:
+        backend = RespClient.from_url(server.url)
+        service = leaderboard.LeaderboardService(backend)
+        now = time.time()
+        service.submit_hardest_shot(player_id="warm", ball_speed_kph=80.0, occurred_at=now, country=None, city=None)
+        submissions = [
+            (leaderboard.METRIC_HARDEST_SHOT, service.new_event(f"p{idx}", 100.0 + idx, now - idx, "US", "Austin"))
+            for idx in range(200)
+        ]
+
+        # A large pipeline may span several socket reads, so count client round trips.
+        trips = []
+        original = backend._round_trip
+        monkeypatch.setattr(backend, "_round_trip", lambda commands: trips.append(len(commands)) or original(commands))
+
+        before_commands = server.commands
+        service.submit_batch(submissions)
+        assert len(trips) == 1
+        # 6 score keys: one expiry lookup and two ZADDs each, plus one MSET.
+        assert server.commands - before_commands == 6 * 3 + 1
+
+        top = service.read_leaderboard(
+            metric=leaderboard.METRIC_HARDEST_SHOT, window="7d", scope="city", country="US", city="Austin", limit=3
+        )
+        assert [event.player_id for event in top] == ["p199", "p198", "p197"]
+
+
+def test_batch_keeps_only_each_players_best_in_the_view() -> None:
+    service = leaderboard.LeaderboardService(leaderboard.InMemoryRedis(), player_view=leaderboard.PlayerBestView())
+    now = time.time()
+    service.submit_batch(
+        [
+            (leaderboard.METRIC_MOST_HITS, service.new_event("ace", 5.0, now, None, None)),
+            (leaderboard.METRIC_MOST_HITS, service.new_event("ace", 9.0, now, None, None)),
+            (leaderboard.METRIC_MOST_HITS, service.new_event("bob", 7.0, now, None, None)),
+            (leaderboard.METRIC_MOST_HITS, service.new_event("ace", 8.0, now, None, None)),
+        ]
+    )
+    assert _board(service, "most_hits", "7d") == [("ace", 9.0), ("bob", 7.0)]
+
+    with pytest.raises(ValueError):
+        service.submit_batch([("fastest_lap", service.new_event("ace", 1.0, now, None, None))])
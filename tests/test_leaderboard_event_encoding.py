@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+
+def test_packed_encoding_round_trips_and_is_compact() -> None:
+    event = leaderboard.LeaderboardEvent(
+        event_id="2bx",
+        player_id="player-åäö",
+        score=131.25,
+        occurred_at=1_700_000_000.5,
+        country="SE",
+        city=None,
+    )
+    packed = event.encode()
+    assert leaderboard.LeaderboardEvent.decode("2bx", packed) == event
+    assert len(packed) * 2 < len(event.serialize().encode())
+
+
+def test_decode_accepts_legacy_json_payloads() -> None:
+    legacy = leaderboard.LeaderboardEvent("9f" * 16, "old", 99.0, 1_600_000_000.0, "US", "Austin")
+    payload = legacy.serialize().encode()
+    assert leaderboard.LeaderboardEvent.decode(legacy.event_id, payload) == legacy
+    page = leaderboard.LeaderboardEvent.decode_many([b"a", b"gone", b"b"], [legacy.encode(), None, payload])
+    assert [event.event_id for event in page] == ["a", legacy.event_id]
+
+
+def test_ids_are_short_increasing_and_reserved_in_blocks() -> None:
+    client = leaderboard.InMemoryRedis()
+    calls = []
+    original = client.incrby
+    client.incrby = lambda key, amount=1: calls.append(amount) or original(key, amount)  # type: ignore[method-assign]
+    first = leaderboard.EventIdAllocator(client, block_size=3)
+    second = leaderboard.EventIdAllocator(client, block_size=3)
+
+    ids = [first.next_id() for _ in range(4)] + [second.next_id()]
+    assert ids == ["1", "2", "3", "4", "7"]
+    assert calls == [3, 3, 3]
+    assert len(set(ids)) == len(ids)
+
+
+def test_page_read_is_one_mget_and_mixes_encodings() -> None:
+    with LocalRedisServer() as server:
+        backend = RespClient.from_url(server.url)
+        service = leaderboard.LeaderboardService(backend)
+        now = time.time()
+        for idx in range(5):
+            service.submit_hardest_shot(player_id=f"p{idx}", ball_speed_kph=100.0 + idx, occurred_at=now, country=None, city=None)
+        legacy = leaderboard.LeaderboardEvent("f" * 32, "legacy", 150.0, now, None, None)
+        backend.set(f"leaderboard:event:{legacy.event_id}", legacy.serialize())
+        backend.zadd("leaderboard:hardest_shot:24h:global", {legacy.event_id: legacy.score})
+        backend.zadd("leaderboard:hardest_shot:24h:global:timestamps", {legacy.event_id: now})
+
+        before = server.commands
+        events = service.read_leaderboard(
+            metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, limit=3
+        )
+        assert [event.player_id for event in events] == ["legacy", "p4", "p3"]
+        # Expiry lookup, top-k range and a single MGET for the page.
+        assert server.commands - before == 3
+
+
+@pytest.mark.parametrize("length", [leaderboard.MAX_EVENT_FIELD_BYTES + 1, 70_000])
+def test_over_long_fields_are_rejected_at_ingestion(length: int) -> None:
+    service = leaderboard.LeaderboardService(leaderboard.InMemoryRedis())
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    try:
+        with TestClient(leaderboard.leaderboard_app) as client:
+            response = client.post("/leaderboard/hardest-shot", json={"player_id": "p" * length, "ball_speed_kph": 100})
+            assert response.status_code == 400
+            item = {
+                "metric": "hardest_shot",
+                "player_id": "p",
+                "ball_speed_kph": 1,
+                "location": {"country": "SE", "city": "c" * length},
+            }
+            batch = client.post("/leaderboard/batch", json={"submissions": [item]})
+            assert batch.json()["rejected"] == 1
+    finally:
+        leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+    with pytest.raises(ValueError):
+        leaderboard.LeaderboardEvent("x", "p" * length, 1.0, 0.0, None, None).encode()
+
+
+def test_longest_allowed_field_round_trips() -> None:
+    event = leaderboard.LeaderboardEvent("x", "p" * leaderboard.MAX_EVENT_FIELD_BYTES, 1.0, 0.0, "SE", "Lund")
+    assert leaderboard.LeaderboardEvent.decode("x", event.encode()) == event
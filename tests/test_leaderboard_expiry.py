@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from server import leaderboard
+from server.expiry import ExpiryScheduler
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+HOUR = 3600
+TIMESTAMPS_24H = "leaderboard:hardest_shot:24h:global:timestamps"
+
+
+def _submit(service: leaderboard.LeaderboardService, player: str, speed: float, occurred_at: float) -> None:
+    service.submit_hardest_shot(
+        player_id=player,
+        ball_speed_kph=speed,
+        occurred_at=occurred_at,
+        country=None,
+        city=None,
+    )
+
+
+def _read(service: leaderboard.LeaderboardService) -> list:
+    events = service.read_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT,
+        window="24h",
+        scope=leaderboard.SCOPE_GLOBAL,
+        country=None,
+        city=None,
+    )
+    return [event.player_id for event in events]
+
+
+def test_scheduler_pops_earliest_due_and_keeps_earliest_time() -> None:
+    calls = []
+    scheduler = ExpiryScheduler(lambda key, now: calls.append(key))
+    scheduler.schedule("b", 20.0)
+    scheduler.schedule("a", 10.0)
+    scheduler.schedule("a", 30.0)  # later time does not postpone an earlier one
+    assert scheduler.next_due() == 10.0
+
+    assert scheduler.run_pending(now=15.0) == 1
+    assert calls == ["a"]
+    assert scheduler.run_pending(now=25.0) == 1
+    assert calls == ["a", "b"]
+    assert len(scheduler) == 0 and scheduler.next_due() is None
+
+
+def test_scheduler_defers_unfinished_keys_to_the_next_slice() -> None:
+    remaining = {"a": 3, "b": 1}
+
+    def expire(key, now):
+        remaining[key] -= 1
+        return now if remaining[key] else None
+
+    scheduler = ExpiryScheduler(expire)
+    scheduler.schedule("a", 0.0)
+    scheduler.schedule("b", 1.0)
+    # Each pass visits every due key once, so one busy key cannot starve others.
+    assert scheduler.run_pending(now=5.0) == 2
+    assert remaining == {"a": 2, "b": 0}
+    assert scheduler.run_pending(now=5.0) == 1
+    assert scheduler.run_pending(now=5.0) == 1
+    assert remaining["a"] == 0 and len(scheduler) == 0
+
+
+def test_scheduler_backs_off_and_retries_failing_keys() -> None:
+    failures = {"a": 2}
+
+    def expire(key, now):
+        if failures[key]:
+            failures[key] -= 1
+            raise OSError("disk full")
+        return None
+
+    scheduler = ExpiryScheduler(expire, retry_seconds=1.0, max_retry_seconds=60.0)
+    scheduler.schedule("a", 0.0)
+    assert scheduler.run_pending(now=10.0) == 1
+    assert scheduler.next_due() == 11.0
+    assert scheduler.run_pending(now=11.0) == 1
+    assert scheduler.next_due() == 13.0  # doubled after a second failure in a row
+    assert scheduler.run_pending(now=13.0) == 1
+    assert len(scheduler) == 0
+
+
+def test_scheduler_background_thread_expires_due_keys() -> None:
+    expired = threading.Event()
+    scheduler = ExpiryScheduler(lambda key, now: expired.set())
+    scheduler.start(interval=0.01)
+    try:
+        scheduler.schedule("k", time.time())
+        assert expired.wait(1.0)
+    finally:
+        scheduler.stop(timeout=1.0)
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [leaderboard.PruningWindowEngine(), leaderboard.BucketedWindowEngine(bucket_seconds=HOUR)],
+    ids=["pruning", "bucketed"],
+)
+def test_background_expiry_drains_in_slices(engine: leaderboard.WindowEngine, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = leaderboard.InMemoryRedis()
+    service = leaderboard.LeaderboardService(client, engine)
+    scheduler = service.enable_background_expiry(slice_entries=10)
+    start = time.time()
+    for idx in range(35):
+        _submit(service, f"old{idx}", 100.0 + idx, start - idx)
+
+    later = start + 30 * HOUR
+    monkeypatch.setattr(leaderboard.time, "time", lambda: later)
+    _submit(service, "fresh", 90.0, later)
+
+    passes = 0
+    while scheduler.next_due() is not None and scheduler.next_due() <= later:
+        scheduler.run_pending(now=later)
+        passes += 1
+    if isinstance(engine, leaderboard.PruningWindowEngine):
+        assert passes == 4  # 35 expired ids at 10 per slice
+        assert client.zcard(TIMESTAMPS_24H) == 1
+    assert _read(service) == ["fresh"]
+
+
+def test_clean_reads_take_one_round_trip_with_background_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    with LocalRedisServer() as server:
+        service = leaderboard.LeaderboardService(RespClient.from_url(server.url))
+        scheduler = service.enable_background_expiry()
+        start = time.time()
+        for idx in range(20):
+            _submit(service, f"old{idx}", 100.0, start - idx)
+
+        later = start + 30 * HOUR
+        monkeypatch.setattr(leaderboard.time, "time", lambda: later)
+        _submit(service, "fresh", 90.0, later)
+
+        # The scheduler has not run yet: the read notices and prunes synchronously.
+        assert _read(service) == ["fresh"]
+        assert server.store.zcard(TIMESTAMPS_24H) == 1
+
+        _submit(service, "late", 80.0, later)
+        scheduler.run_pending(now=later)
+        before = server.round_trips
+        assert _read(service) == ["fresh", "late"]
+        # One pipelined clean check + top-k, then one pipelined GET batch.
+        assert server.round_trips - before == 2
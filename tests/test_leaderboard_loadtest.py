@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from scripts.leaderboard_loadtest import (
+    READ,
+    TrafficMix,
+    _service,
+    generate_operations,
+    open_backend,
+    run_load,
+    run_loadtest,
+)
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+
+def test_operations_follow_the_configured_mix() -> None:
+    mix = TrafficMix(hardest_shot_writes=0.5, most_hits_writes=0.3, reads=0.2, players=1000, countries=5)
+    operations = generate_operations(5000, mix, seed=3)
+    kinds = Counter(operation.kind for operation in operations)
+    assert 0.45 < kinds[leaderboard.METRIC_HARDEST_SHOT] / 5000 < 0.55
+    assert 0.15 < kinds[READ] / 5000 < 0.25
+    players = Counter(operation.player_id for operation in operations).most_common()
+    # Zipf: the busiest player alone outweighs the hundred quietest ones seen.
+    assert players[0][1] > sum(count for _, count in players[-100:])
+    countries = Counter(operation.country for operation in operations)
+    assert set(countries) <= {"US", "GB", "DE", "JP", "CA"}
+    assert countries.most_common(1)[0][0] == "US"
+
+
+def test_app_mode_writes_reach_the_service() -> None:
+    operations = [operation for operation in generate_operations(400, seed=5) if operation.kind != READ]
+    with open_backend("memory") as client:
+        service = _service(client)
+        elapsed, writes, reads = run_load(service, operations, "app")
+        best = max(operation.value for operation in operations if operation.kind == leaderboard.METRIC_HARDEST_SHOT)
+        events = service.read_leaderboard(
+            metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, limit=1
+        )
+    assert len(writes) == len(operations) and not reads
+    assert events[0].score == best
+    assert leaderboard.get_service not in leaderboard.leaderboard_app.dependency_overrides
+
+
+def test_loadtest_smoke() -> None:
+    results = run_loadtest(300, backends=("memory", "resp"), memory_operations=100)
+    assert [(result.backend, result.mode) for result in results] == [
+        ("memory", "service"),
+        ("memory", "app"),
+        ("resp", "service"),
+        ("resp", "app"),
+    ]
+    for result in results:
+        assert result.writes + result.reads == 300
+        assert result.ops_per_sec > 0
+        assert result.write_p99_ms >= result.write_p50_ms > 0
+        assert result.memory_mb_per_million_events > 0
+
+
+def test_resp_backend_uses_and_flushes_the_given_redis() -> None:
+    with LocalRedisServer() as server:
+        seed = RespClient.from_url(server.url)
+        seed.set("stale", "1")
+        seed.close()
+        with open_backend("resp", redis_url=server.url) as client:
+            assert client.get("stale") is None
+            service = _service(client)
+            run_load(service, generate_operations(50, seed=3))
+            events = service.read_leaderboard(
+                metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, limit=1
+            )
+    assert events
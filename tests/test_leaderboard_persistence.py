@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from scripts.bench_leaderboard_persistence import run_benchmark
+from server import leaderboard
+from server import persistence
+from server.persistence import SNAPSHOT_FILE, DurableRedis, read_records
+
+
+def _open(directory: Path, **kwargs: object) -> DurableRedis:
+    kwargs.setdefault("snapshot_every_ops", None)
+    return DurableRedis(directory, **kwargs)
+
+
+def _segments(directory: Path) -> list:
+    return sorted(path.name for path in directory.glob("log-*.aof"))
+
+
+def test_state_survives_reopen(tmp_path: Path) -> None:
+    store = _open(tmp_path)
+    store.zadd("board", {"a": 5.0, "b": 7.0, "c": 5.0})
+    store.zadd("board", {"a": 9.0, "c": 1.0}, gt=True)
+    store.zincrby("totals", 3.0, "a")
+    store.zincrby("totals", 2.0, "a")
+    store.zrem("board", "b")
+    store.set("payload", b"\x00\xffraw")
+    store.mset({"k1": b"one", "k2": b"two"})
+    store.incrby("counter", 4)
+    store.delete("k2")
+    store.close()
+
+    reopened = _open(tmp_path)
+    assert reopened.zrevrange_withscores("board", 0, -1) == [(b"a", 9.0), (b"c", 5.0)]
+    assert reopened.zscore("totals", "a") == 5.0
+    assert reopened.mget("payload", "k1", "k2", "counter") == [b"\x00\xffraw", b"one", None, b"4"]
+    assert reopened.stats.recovered_records == 9
+    reopened.close()
+
+
+def test_no_op_writes_are_not_logged(tmp_path: Path) -> None:
+    store = _open(tmp_path)
+    store.zadd("board", {"a": 1.0})
+    store.zrem("board", "missing")
+    store.zremrangebyscore("board", 10, 20)
+    store.delete("missing")
+    store.close()
+    records = [parts[0] for parts, _ in read_records(tmp_path / "log-00000000.aof")]
+    assert records == [b"ZADD"]
+
+
+def test_torn_tail_is_truncated_on_recovery(tmp_path: Path) -> None:
+    store = _open(tmp_path)
+    store.zadd("board", {"a": 1.0})
+    store.zadd("board", {"b": 2.0})
+    store.close()
+    log = tmp_path / "log-00000000.aof"
+    intact = log.stat().st_size
+    with open(log, "ab") as handle:
+        handle.write(b"*3\r\n$4\r\nZADD\r\n$5\r\nbo")
+
+    reopened = _open(tmp_path)
+    assert log.stat().st_size == intact
+    assert reopened.zrevrange_withscores("board", 0, -1) == [(b"b", 2.0), (b"a", 1.0)]
+    reopened.zadd("board", {"c": 3.0})
+    reopened.close()
+    assert _open(tmp_path).zcard("board") == 3
+
+
+def test_snapshot_replaces_covered_segments(tmp_path: Path) -> None:
+    store = _open(tmp_path)
+    for idx in range(50):
+        store.zadd("board", {f"p{idx}": float(idx)})
+    store.set("event", b"payload")
+    store.snapshot(wait=True)
+    store.zadd("board", {"late": 100.0})
+    store.close()
+    assert _segments(tmp_path) == ["log-00000001.aof"]
+    assert (tmp_path / SNAPSHOT_FILE).exists()
+
+    reopened = _open(tmp_path)
+    assert reopened.zcard("board") == 51
+    assert reopened.zrevrange("board", 0, 1) == [b"late", b"p49"]
+    assert reopened.get("event") == b"payload"
+    # One ZADD and one MSET from the snapshot plus the tail record.
+    assert reopened.stats.recovered_records == 3
+    assert reopened.stats.snapshots == 0
+    reopened.close()
+
+
+def test_writes_during_a_snapshot_do_not_leak_into_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = _open(tmp_path)
+    for idx in range(20):
+        store.zadd(f"board:{idx}", {"a": 1.0, "b": 2.0})
+    store.zincrby("totals", 5.0, "a")
+    release = threading.Event()
+    close = persistence.AppendOnlyLog.close
+
+    def _held_close(log: persistence.AppendOnlyLog) -> None:
+        release.wait(5.0)  # keep the snapshot thread from copying anything yet
+        close(log)
+
+    monkeypatch.setattr(persistence.AppendOnlyLog, "close", _held_close)
+    monkeypatch.setattr(persistence, "_SNAPSHOT_COPY_MEMBERS", 4)
+    thread = store.snapshot()
+    store.zincrby("totals", 2.0, "a")
+    store.zadd("board:3", {"c": 3.0})
+    store.delete("board:4")
+    store.flushall()
+    store.zadd("board:0", {"z": 9.0})
+    release.set()
+    thread.join()
+    monkeypatch.setattr(persistence.AppendOnlyLog, "close", close)
+    assert store.stats.snapshot_pause_seconds > 0
+    store.close()
+
+    snapshot = [parts for parts, _ in read_records(tmp_path / SNAPSHOT_FILE)]
+    sets = {parts[1]: parts[2:] for parts in snapshot if parts[0] == b"ZADD"}
+    assert len(sets) == 21
+    assert sets[b"totals"] == [b"5.0", b"a"] and sets[b"board:3"] == [b"1.0", b"a", b"2.0", b"b"]
+
+    reopened = _open(tmp_path)
+    assert reopened.zrevrange_withscores("board:0", 0, -1) == [(b"z", 9.0)]
+    assert reopened.zcard("board:3") == 0 and reopened.zscore("totals", "a") is None
+    reopened.close()
+
+
+def test_snapshots_start_automatically(tmp_path: Path) -> None:
+    store = DurableRedis(tmp_path, snapshot_every_ops=10)
+    for idx in range(25):
+        store.incrby("counter", 1)
+    store.close()
+    # A snapshot still being written is not restarted, so there may be fewer than two.
+    assert store.stats.snapshots >= 1
+    assert (tmp_path / SNAPSHOT_FILE).exists()
+    assert _open(tmp_path).get("counter") == b"25"
+
+
+def test_fsyncs_are_batched(tmp_path: Path) -> None:
+    store = _open(tmp_path, fsync_every_ops=100, fsync_interval=60.0)
+    for idx in range(450):
+        store.incrby("counter", 1)
+    assert store.stats.fsyncs == 4
+    store.close()
+    assert store.stats.fsyncs == 5
+
+
+def test_service_recovers_leaderboards(tmp_path: Path) -> None:
+    def _service(store: DurableRedis) -> leaderboard.LeaderboardService:
+        return leaderboard.LeaderboardService(
+            store,
+            player_view=leaderboard.PlayerBestView(),
+            player_totals=leaderboard.PlayerTotalsView(),
+        )
+
+    def _boards(service: leaderboard.LeaderboardService) -> tuple:
+        args = dict(window="7d", scope="global", country=None, city=None, limit=5)
+        shots = service.read_leaderboard(metric=leaderboard.METRIC_HARDEST_SHOT, **args)
+        hits = service.read_player_leaderboard(metric=leaderboard.METRIC_MOST_HITS, **args)
+        return [(event.player_id, event.score) for event in shots], [(event.player_id, event.score) for event in hits]
+
+    store = _open(tmp_path)
+    service = _service(store)
+    now = time.time()
+    for idx in range(40):
+        service.submit_hardest_shot(
+            player_id=f"p{idx % 6}", ball_speed_kph=60.0 + idx, occurred_at=now - idx, country="US", city="Austin"
+        )
+        service.submit_most_hits(player_id=f"p{idx % 4}", hits=idx % 5, occurred_at=now - idx, country="US", city=None)
+    expected = _boards(service)
+    store.snapshot(wait=True)
+    service.submit_most_hits(player_id="p9", hits=50, occurred_at=now, country="US", city=None)
+    expected_after = _boards(service)
+    store.close()
+
+    reopened = _open(tmp_path)
+    assert _boards(_service(reopened)) == expected_after
+    assert expected_after[1][0] == ("p9", 50.0)
+    assert expected_after[0] == expected[0]
+    reopened.close()
+
+
+def test_client_from_env_uses_data_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.delenv("LEADERBOARD_REDIS_URL", raising=False)
+    monkeypatch.setenv("LEADERBOARD_DATA_DIR", str(tmp_path))
+    client = leaderboard._client_from_env()
+    assert isinstance(client, DurableRedis)
+    client.close()
+
+
+def test_benchmark_smoke() -> None:
+    result = run_benchmark(events=2000, players=50, batch=500)
+    assert result.events == 2100
+    assert result.log_bytes > result.payload_bytes
+    assert result.snapshot_bytes > 0
+    assert result.replayed_after_snapshot > 0
+    assert result.snapshot_pause_ms > 0
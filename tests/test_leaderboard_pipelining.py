@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from server import leaderboard
+from server.resp import RedisError, RespClient
+from tests.support import LocalRedisServer
+
+
+@pytest.fixture
+def redis_server():
+    with LocalRedisServer() as server:
+        yield server
+
+
+def test_resp_client_round_trips_commands(redis_server: LocalRedisServer) -> None:
+    client = RespClient.from_url(redis_server.url)
+    assert client.ping()
+    assert client.zadd("k", {"a": 1.5, "b": 3.0}) == 2
+    assert client.zrevrange("k", 0, -1) == [b"b", b"a"]
+    assert client.zrangebyscore("k", float("-inf"), 2) == [b"a"]
+    assert client.set("s", b"\x00payload") is True
+    assert client.get("s") == b"\x00payload"
+    assert client.get("missing") is None
+    assert client.zrem("k", "a", "zzz") == 1
+    assert client.delete("k", "s") == 2
+    client.close()
+
+
+def test_pipeline_batches_into_one_round_trip(redis_server: LocalRedisServer) -> None:
+    client = RespClient.from_url(redis_server.url)
+    client.ping()
+    before = redis_server.round_trips
+
+    pipe = client.pipeline()
+    pipe.zadd("k", {"a": 1.0}).zadd("k", {"b": 2.0}).zcard("k").zrevrange("k", 0, 0)
+    assert pipe.execute() == [1, 1, 2, [b"b"]]
+    assert redis_server.round_trips - before == 1
+
+    transaction = client.pipeline(transaction=True)
+    transaction.set("x", "1").get("x")
+    assert transaction.execute() == [True, b"1"]
+
+
+def test_pipeline_surfaces_errors(redis_server: LocalRedisServer) -> None:
+    client = RespClient.from_url(redis_server.url)
+    with pytest.raises(RedisError):
+        client.execute_command("BOGUS")
+    assert client.execute_command("PING") == "PONG"
+
+
+def test_in_memory_pipeline_matches_resp_api() -> None:
+    client = leaderboard.InMemoryRedis()
+    pipe = client.pipeline()
+    pipe.zadd("k", {"a": 1.0}).zadd("k", {"b": 2.0}).zcard("k").zrevrange("k", 0, 0).set("x", "1").get("x")
+    assert pipe.execute() == [1, 1, 2, [b"b"], True, b"1"]
+    assert len(pipe) == 0
+
+
+def test_submission_is_one_round_trip_against_resp_backend(redis_server: LocalRedisServer) -> None:
+    service = leaderboard.LeaderboardService(RespClient.from_url(redis_server.url))
+    now = time.time()
+    service.submit_hardest_shot(player_id="warm", ball_speed_kph=90.0, occurred_at=now, country="SE", city="Lund")
+
+    before = redis_server.round_trips
+    service.submit_hardest_shot(player_id="p1", ball_speed_kph=120.0, occurred_at=now, country="SE", city="Lund")
+    assert redis_server.round_trips - before == 1
+
+    entries = service.read_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="city", country="SE", city="Lund"
+    )
+    assert [event.player_id for event in entries] == ["p1", "warm"]
+
+
+def test_expired_events_are_pruned_with_resp_backend(redis_server: LocalRedisServer) -> None:
+    service = leaderboard.LeaderboardService(RespClient.from_url(redis_server.url))
+    now = time.time()
+    service.submit_hardest_shot(player_id="old", ball_speed_kph=150.0, occurred_at=now - 2 * 86400, country=None, city=None)
+    service.submit_hardest_shot(player_id="new", ball_speed_kph=100.0, occurred_at=now, country=None, city=None)
+
+    daily = service.read_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None
+    )
+    assert [event.player_id for event in daily] == ["new"]
+    assert redis_server.store.zcard("leaderboard:hardest_shot:24h:global:timestamps") == 1
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+HOUR = 3600
+DAY = 24 * HOUR
+TOTALS_KEY = "leaderboard:most_hits:7d:global:totals"
+
+
+def _service(client: object | None = None) -> leaderboard.LeaderboardService:
+    return leaderboard.LeaderboardService(
+        client or leaderboard.InMemoryRedis(),
+        player_view=leaderboard.PlayerBestView(bucket_seconds=HOUR),
+        player_totals=leaderboard.PlayerTotalsView(bucket_seconds=HOUR),
+    )
+
+
+def _hits(service: leaderboard.LeaderboardService, player: str, hits: int, occurred_at: float) -> None:
+    service.submit_most_hits(player_id=player, hits=hits, occurred_at=occurred_at, country="US", city="Austin")
+
+
+def _board(service: leaderboard.LeaderboardService, scope: str = "global", limit: int = 10) -> list:
+    events = service.read_player_leaderboard(
+        metric=leaderboard.METRIC_MOST_HITS,
+        window="7d",
+        scope=scope,
+        country="US",
+        city="Austin",
+        limit=limit,
+    )
+    return [(event.player_id, event.score) for event in events]
+
+
+def test_board_ranks_players_by_window_total() -> None:
+    service = _service()
+    now = time.time()
+    for idx in range(10):
+        _hits(service, "steady", 5, now - idx * DAY / 2)
+    _hits(service, "burst", 30, now)
+    _hits(service, "casual", 2, now - HOUR)
+
+    assert _board(service) == [("steady", 50.0), ("burst", 30.0), ("casual", 2.0)]
+    assert _board(service, scope="city", limit=2) == [("steady", 50.0), ("burst", 30.0)]
+    events = service.read_player_leaderboard(
+        metric=leaderboard.METRIC_MOST_HITS, window="7d", scope="country", country="US", city="Austin", limit=1
+    )
+    assert (events[0].occurred_at, events[0].country, events[0].city) == (now, "US", None)
+    # The raw event board still ranks individual submissions.
+    raw = service.read_leaderboard(
+        metric=leaderboard.METRIC_MOST_HITS, window="7d", scope="global", country=None, city=None, limit=1
+    )
+    assert [(event.player_id, event.score) for event in raw] == [("burst", 30.0)]
+
+
+def test_expired_buckets_are_subtracted_from_totals(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = leaderboard.InMemoryRedis()
+    service = _service(client)
+    start = time.time()
+    _hits(service, "old", 40, start - 6 * DAY)
+    _hits(service, "ace", 10, start - 6 * DAY)
+    _hits(service, "ace", 15, start)
+    _hits(service, "ace", 99, start - 8 * DAY)  # already outside the window
+    assert _board(service) == [("old", 40.0), ("ace", 25.0)]
+
+    monkeypatch.setattr(leaderboard.time, "time", lambda: start + 2 * DAY)
+    assert _board(service) == [("ace", 15.0)]
+    assert client.zscore(TOTALS_KEY, "old") is None
+    assert client.zcard("leaderboard:most_hits:7d:global:totals:buckets") == 1
+    assert service.player_rank(
+        metric=leaderboard.METRIC_MOST_HITS, window="7d", scope="global", country=None, city=None, player_id="old"
+    ) is None
+
+
+def test_background_expiry_keeps_totals_in_window_over_resp() -> None:
+    with LocalRedisServer() as server:
+        client = RespClient.from_url(server.url)
+        service = _service(client)
+        scheduler = service.enable_background_expiry()
+        start = time.time()
+        for idx in range(6):
+            _hits(service, f"p{idx}", 10 + idx, start - (idx + 1) * DAY)
+
+        scheduler.run_pending(now=start + 4 * DAY)
+        totals = client.zrevrange_withscores(TOTALS_KEY, 0, -1)
+        assert totals == [(b"p2", 12.0), (b"p1", 11.0), (b"p0", 10.0)]
+        scheduler.run_pending(now=start + 7 * DAY)
+        assert client.zcard(TOTALS_KEY) == 0
+        assert server.store.zcard("leaderboard:most_hits:7d:global:totals:last-seen") == 0
+        client.close()
+
+
+def test_reads_cost_a_fixed_number_of_round_trips(monkeypatch: pytest.MonkeyPatch) -> None:
+    with LocalRedisServer() as server:
+        client = RespClient.from_url(server.url)
+        service = _service(client)
+        now = time.time()
+        service.submit_batch(
+            [
+                ("most_hits", service.new_event(f"p{idx % 50}", 1.0, now - idx * 60, "US", "Austin"))
+                for idx in range(1000)
+            ]
+        )
+        trips: list = []
+        original = client._round_trip
+        monkeypatch.setattr(client, "_round_trip", lambda commands: trips.append(len(commands)) or original(commands))
+        board = _board(service, limit=5)
+        assert [score for _, score in board] == [20.0] * 5
+        assert len(trips) == 2
+        client.close()
+
+
+def test_most_hits_endpoints_serve_totals() -> None:
+    service = _service()
+    now = time.time()
+    for player, hits in [("ace", 12), ("bob", 9), ("ace", 4), ("cy", 16)]:
+        _hits(service, player, hits, now)
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    try:
+        with TestClient(leaderboard.leaderboard_app) as client:
+            entries = client.get("/leaderboard/most-hits").json()["entries"]
+            rank = client.get("/leaderboard/most-hits/rank", params={"player_id": "cy", "neighbours": 1}).json()
+    finally:
+        leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+    assert [(entry["player_id"], entry["score"], entry["rank"]) for entry in entries] == [
+        ("ace", 16.0, 1),
+        ("cy", 16.0, 2),
+        ("bob", 9.0, 3),
+    ]
+    assert (rank["rank"], rank["score"], rank["total_players"]) == (1, 16.0, 3)
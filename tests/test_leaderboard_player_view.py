@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+HOUR = 3600
+
+
+def _service(client: object | None = None) -> leaderboard.LeaderboardService:
+    return leaderboard.LeaderboardService(
+        client or leaderboard.InMemoryRedis(),
+        player_view=leaderboard.PlayerBestView(bucket_seconds=HOUR),
+    )
+
+
+def _submit(service: leaderboard.LeaderboardService, player: str, speed: float, occurred_at: float) -> None:
+    service.submit_hardest_shot(
+        player_id=player,
+        ball_speed_kph=speed,
+        occurred_at=occurred_at,
+        country="US",
+        city="Austin",
+    )
+
+
+def _board(service: leaderboard.LeaderboardService, window: str = "24h", limit: int = 10) -> list:
+    events = service.read_player_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT,
+        window=window,
+        scope=leaderboard.SCOPE_GLOBAL,
+        country=None,
+        city=None,
+        limit=limit,
+    )
+    return [(event.player_id, event.score) for event in events]
+
+
+def test_one_row_per_player_with_their_best_score() -> None:
+    service = _service()
+    now = time.time()
+    for idx in range(50):
+        _submit(service, "ace", 100.0 + idx, now - idx * 600)
+    _submit(service, "bob", 120.0, now)
+    _submit(service, "cy", 90.0, now - 3 * HOUR)
+
+    assert _board(service) == [("ace", 149.0), ("bob", 120.0), ("cy", 90.0)]
+    assert _board(service, limit=2) == [("ace", 149.0), ("bob", 120.0)]
+    # The raw event board is unchanged and still dominated by one player.
+    raw = service.read_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, limit=3
+    )
+    assert [event.player_id for event in raw] == ["ace", "ace", "ace"]
+
+
+def test_lower_scores_do_not_replace_the_row() -> None:
+    with LocalRedisServer() as server:
+        service = _service(RespClient.from_url(server.url))
+        now = time.time()
+        _submit(service, "ace", 130.0, now)
+
+        before = server.round_trips
+        _submit(service, "ace", 110.0, now)
+        assert server.round_trips - before == 1
+        assert _board(service) == [("ace", 130.0)]
+
+        before = server.round_trips
+        _submit(service, "ace", 140.0, now)
+        assert server.round_trips - before == 2
+        assert _board(service) == [("ace", 140.0)]
+
+
+def test_view_read_has_no_per_event_fan_out() -> None:
+    with LocalRedisServer() as server:
+        service = _service(RespClient.from_url(server.url))
+        now = time.time()
+        for idx in range(30):
+            _submit(service, f"p{idx % 5}", float(idx), now - (idx % 3) * HOUR)
+
+        before = server.commands
+        assert [player for player, _ in _board(service)] == ["p4", "p3", "p2", "p1", "p0"]
+        # One bucket listing plus one range read per live bucket.
+        assert server.commands - before == 1 + 3
+
+
+def test_next_best_takes_over_when_best_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = _service()
+    start = time.time()
+    _submit(service, "ace", 150.0, start - 20 * HOUR)
+    _submit(service, "ace", 110.0, start)
+    _submit(service, "bob", 120.0, start)
+    assert _board(service) == [("ace", 150.0), ("bob", 120.0)]
+
+    monkeypatch.setattr(leaderboard.time, "time", lambda: start + 6 * HOUR)
+    assert _board(service) == [("bob", 120.0), ("ace", 110.0)]
+    assert _board(service, window="7d") == [("ace", 150.0), ("bob", 120.0)]
+
+
+def test_expired_view_buckets_are_dropped_with_owner_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = leaderboard.InMemoryRedis()
+    service = _service(client)
+    start = time.time()
+    _submit(service, "ace", 150.0, start)
+
+    monkeypatch.setattr(leaderboard.time, "time", lambda: start + 9 * 24 * HOUR)
+    _submit(service, "bob", 120.0, start + 9 * 24 * HOUR)
+    assert client.zcard("leaderboard:hardest_shot:7d:global:players:buckets") == 1
+    stale_bucket = int(start // HOUR)
+    assert client.get(f"leaderboard:hardest_shot:7d:global:players:{stale_bucket}:ace") is None
+
+
+def test_get_endpoints_serve_the_player_view() -> None:
+    service = _service()
+    now = time.time()
+    for speed in (101.0, 140.0, 99.0):
+        _submit(service, "ace", speed, now)
+    _submit(service, "bob", 120.0, now)
+
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    try:
+        with TestClient(leaderboard.leaderboard_app) as client:
+            response = client.get("/leaderboard/hardest-shot", params={"window": "24h", "scope": "global"})
+    finally:
+        leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+    entries = response.json()["entries"]
+    assert [(entry["player_id"], entry["score"], entry["rank"]) for entry in entries] == [
+        ("ace", 140.0, 1),
+        ("bob", 120.0, 2),
+    ]
+
+
+def test_background_expiry_prunes_view_buckets(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = leaderboard.InMemoryRedis()
+    service = _service(client)
+    scheduler = service.enable_background_expiry()
+    start = time.time()
+    _submit(service, "ace", 150.0, start)
+
+    later = start + 9 * 24 * HOUR
+    scheduler.run_pending(now=later)
+    assert client.zcard("leaderboard:hardest_shot:7d:global:players:buckets") == 0
+    assert client.zcard("leaderboard:hardest_shot:24h:global:players:buckets") == 0
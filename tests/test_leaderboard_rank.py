@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+HOUR = 3600
+
+
+@pytest.fixture
+def service() -> leaderboard.LeaderboardService:
+    return leaderboard.LeaderboardService(leaderboard.InMemoryRedis(), player_view=leaderboard.PlayerBestView())
+
+
+@pytest.fixture
+def client(service: leaderboard.LeaderboardService) -> TestClient:
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    with TestClient(leaderboard.leaderboard_app) as test_client:
+        yield test_client
+    leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+
+
+def _shot(service: leaderboard.LeaderboardService, player: str, speed: float, occurred_at: float | None = None) -> None:
+    service.submit_hardest_shot(
+        player_id=player,
+        ball_speed_kph=speed,
+        occurred_at=time.time() if occurred_at is None else occurred_at,
+        country=None,
+        city=None,
+    )
+
+
+def test_sorted_set_rank_and_count_primitives() -> None:
+    client = leaderboard.InMemoryRedis()
+    client.zadd("k", {"a": 5.0, "b": 9.0, "c": 7.0, "d": 7.0})
+    assert [client.zrevrank("k", member) for member in "bcda"] == [0, 1, 2, 3]
+    assert client.zrevrank("k", "missing") is None and client.zrevrank("nokey", "a") is None
+    assert client.zcount("k", 6.0, 9.0) == 3
+    assert client.zscore("k", b"c") == 7.0
+    assert client.zadd("k", {"a": 4.0}, gt=True) == 0 and client.zscore("k", "a") == 5.0
+    client.zadd("k", {"a": 10.0}, gt=True)
+    assert client.zrevrank("k", "a") == 0
+
+    with LocalRedisServer() as server:
+        resp = RespClient.from_url(server.url)
+        resp.zadd("k", {"a": 5.0, "b": 9.0})
+        assert resp.zadd("k", {"a": 1.0}, gt=True) == 0
+        assert (resp.zrevrank("k", "a"), resp.zscore("k", "a"), resp.zcount("k", 0, 6)) == (1, 5.0, 1)
+        assert resp.zscore("k", "zz") is None and resp.zrevrank("k", "zz") is None
+
+
+def test_rank_endpoint_returns_rank_score_and_neighbours(
+    service: leaderboard.LeaderboardService, client: TestClient
+) -> None:
+    for idx in range(40):
+        _shot(service, f"p{idx:02d}", 100.0 + idx)
+    _shot(service, "p05", 90.0)  # a worse shot does not lower the player's best
+
+    response = client.get("/leaderboard/hardest-shot/rank", params={"player_id": "p05", "neighbours": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["rank"], body["score"], body["total_players"]) == (35, 105.0, 40)
+    assert [(entry["rank"], entry["player_id"]) for entry in body["neighbours"]] == [
+        (33, "p07"), (34, "p06"), (35, "p05"), (36, "p04"), (37, "p03"),
+    ]
+
+
+def test_ties_share_a_rank(service: leaderboard.LeaderboardService, client: TestClient) -> None:
+    for player, speed in (("a", 120.0), ("b", 110.0), ("c", 110.0), ("d", 110.0), ("e", 90.0)):
+        _shot(service, player, speed)
+    body = client.get("/leaderboard/hardest-shot/rank", params={"player_id": "d", "neighbours": 1}).json()
+    assert body["rank"] == 2
+    assert [(entry["rank"], entry["player_id"]) for entry in body["neighbours"]] == [(2, "c"), (2, "d"), (5, "e")]
+
+
+def test_rank_endpoint_errors(client: TestClient) -> None:
+    assert client.get("/leaderboard/most-hits/rank").status_code == 400
+    assert client.get("/leaderboard/most-hits/rank", params={"player_id": "ghost"}).status_code == 404
+    assert client.get("/leaderboard/most-hits/rank", params={"player_id": "x", "neighbours": "lots"}).status_code == 400
+
+
+def test_expired_best_falls_back_to_next_best(service: leaderboard.LeaderboardService, monkeypatch: pytest.MonkeyPatch) -> None:
+    start = time.time()
+    _shot(service, "ace", 150.0, start - 20 * HOUR)
+    _shot(service, "ace", 110.0, start)
+    _shot(service, "bob", 120.0, start)
+    _shot(service, "cy", 100.0, start - 20 * HOUR)
+
+    def rank(player: str) -> leaderboard.PlayerRank | None:
+        return service.player_rank(
+            metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, player_id=player
+        )
+
+    assert (rank("ace").rank, rank("ace").score) == (1, 150.0)
+
+    monkeypatch.setattr(leaderboard.time, "time", lambda: start + 6 * HOUR)
+    _shot(service, "dee", 80.0, start + 6 * HOUR)  # the write path drops the expired bucket
+    assert (rank("ace").rank, rank("ace").score) == (2, 110.0)
+    assert rank("cy") is None
+    assert rank("dee").total == 3
+
+
+def test_rank_settles_buckets_that_expired_without_writes(
+    service: leaderboard.LeaderboardService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    start = time.time()
+    _shot(service, "ace", 120.0, start)
+    monkeypatch.setattr(leaderboard.time, "time", lambda: start + 3 * 24 * HOUR)
+    kwargs = dict(metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None)
+    assert service.read_player_leaderboard(**kwargs) == []
+    assert service.player_rank(**kwargs, player_id="ace") is None
+
+
+class _RacingRedis(leaderboard.InMemoryRedis):
+    """Removes ``victim`` from the set just before the neighbour window is read."""
+
+    def __init__(self, victim: str) -> None:
+        super().__init__()
+        self.victim = victim
+
+    def zrevrange_withscores(self, key, start, stop):
+        if self.victim:
+            self.zrem(key, self.victim)
+            self.victim = ""
+        return super().zrevrange_withscores(key, start, stop)
+
+
+@pytest.mark.parametrize("others", [[], ["bob"]])
+def test_rank_lookup_survives_the_player_leaving_mid_lookup(others: list) -> None:
+    redis = _RacingRedis("ace")
+    redis.zadd("board", {"ace": 10.0, **{name: 5.0 for name in others}})
+    assert leaderboard._rank_in(redis, "board", "ace", 2) is None
+    redis.zadd("board", {"ace": 10.0})
+    assert leaderboard._rank_in(redis, "board", "ace", 2).rank == 1
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import leaderboard
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture
+def service(clock: _Clock) -> leaderboard.LeaderboardService:
+    return leaderboard.LeaderboardService(
+        leaderboard.InMemoryRedis(),
+        player_view=leaderboard.PlayerBestView(),
+        response_cache=leaderboard.LeaderboardResponseCache(ttl_seconds=2.0, clock=clock),
+    )
+
+
+@pytest.fixture
+def client(service: leaderboard.LeaderboardService) -> TestClient:
+    leaderboard.leaderboard_app.dependency_overrides[leaderboard.get_service] = lambda: service
+    with TestClient(leaderboard.leaderboard_app) as test_client:
+        yield test_client
+    leaderboard.leaderboard_app.dependency_overrides.pop(leaderboard.get_service, None)
+
+
+def _count_reads(service: leaderboard.LeaderboardService, monkeypatch: pytest.MonkeyPatch) -> list:
+    calls = []
+    original = service.read_player_leaderboard
+
+    def counting(**kwargs):
+        calls.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(service, "read_player_leaderboard", counting)
+    return calls
+
+
+def _shot(client: TestClient, player: str, speed: float) -> None:
+    response = client.post(
+        "/leaderboard/hardest-shot",
+        json={"player_id": player, "ball_speed_kph": speed, "occurred_at": time.time()},
+    )
+    assert response.status_code == 200
+
+
+def test_polls_are_served_from_cache_until_ttl(
+    service: leaderboard.LeaderboardService, client: TestClient, clock: _Clock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _shot(client, "ace", 120.0)
+    reads = _count_reads(service, monkeypatch)
+
+    first = client.get("/leaderboard/hardest-shot", params={"window": "24h"})
+    second = client.get("/leaderboard/hardest-shot", params={"window": "24h"})
+    assert first.json() == second.json()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert len(reads) == 1
+
+    clock.now += 2.5
+    client.get("/leaderboard/hardest-shot", params={"window": "24h"})
+    assert len(reads) == 2
+
+
+def test_if_none_match_returns_not_modified(client: TestClient) -> None:
+    _shot(client, "ace", 120.0)
+    first = client.get("/leaderboard/most-hits")
+    etag = first.headers["ETag"]
+
+    not_modified = client.get("/leaderboard/most-hits", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.body is None
+    assert not_modified.headers["ETag"] == etag
+
+    weak = client.get("/leaderboard/most-hits", headers={"if-none-match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+    assert client.get("/leaderboard/most-hits", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_writes_invalidate_touched_boards_only(
+    service: leaderboard.LeaderboardService, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _shot(client, "ace", 120.0)
+    before = client.get("/leaderboard/hardest-shot", params={"window": "24h"})
+    client.get("/leaderboard/most-hits")
+    reads = _count_reads(service, monkeypatch)
+
+    _shot(client, "bob", 130.0)
+    after = client.get("/leaderboard/hardest-shot", params={"window": "24h"})
+    assert [entry["player_id"] for entry in after.json()["entries"]] == ["bob", "ace"]
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert client.get("/leaderboard/hardest-shot", headers={"If-None-Match": before.headers["ETag"]}).status_code == 200
+
+    client.get("/leaderboard/most-hits")
+    # Only the hardest-shot read missed; most-hits was untouched by the write.
+    assert [call["metric"] for call in reads] == [leaderboard.METRIC_HARDEST_SHOT]
+
+
+def test_read_racing_a_write_is_not_cached(clock: _Clock) -> None:
+    cache = leaderboard.LeaderboardResponseCache(ttl_seconds=2.0, clock=clock)
+    generation = cache.generation("k")
+    cache.invalidate(["k"])
+    entry = cache.put("k", {"entries": []}, generation)
+    assert entry.etag == leaderboard.compute_etag({"entries": []})
+    assert cache.get("k") is None
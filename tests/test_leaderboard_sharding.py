@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from server import leaderboard
+from server.resp import ConnectionPool, RespClient
+from server.sharding import HashRing, ShardedClient, hash_tag
+from tests.support import LocalRedisServer
+
+
+def _sharded(count: int = 3) -> ShardedClient:
+    return ShardedClient(
+        {f"shard-{idx}": leaderboard.InMemoryRedis() for idx in range(count)},
+        key_tag=leaderboard.score_key_tag,
+    )
+
+
+def _submit_shots(service: leaderboard.LeaderboardService, count: int) -> None:
+    now = time.time()
+    locations = [("US", "Austin"), ("GB", "London"), ("US", "Boston")]
+    for idx in range(count):
+        country, city = locations[idx % len(locations)]
+        service.submit_hardest_shot(
+            player_id=f"p{idx % 7}",
+            ball_speed_kph=50.0 + idx,
+            occurred_at=now - idx,
+            country=country,
+            city=city,
+        )
+
+
+def test_pooled_client_reuses_connections_across_threads() -> None:
+    with LocalRedisServer() as server:
+        client = RespClient.from_url(server.url, max_connections=2)
+        for _ in range(5):
+            assert client.ping()
+        assert server.connections == 1
+
+        errors: list = []
+
+        def _work() -> None:
+            try:
+                for idx in range(20):
+                    client.set(f"k{threading.get_ident()}", str(idx))
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=_work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert server.connections <= 2
+        assert client.pool.idle_connections == server.connections
+        client.close()
+
+
+def test_pool_raises_when_exhausted() -> None:
+    with LocalRedisServer() as server:
+        host, port = server.url[len("redis://") :].split("/")[0].split(":")
+        pool = ConnectionPool(host, int(port), timeout=0.05, max_connections=1)
+        held = pool.acquire()
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+        pool.release(held)
+        pool.release(pool.acquire(), discard=True)
+        assert pool.idle_connections == 0
+
+
+def test_hash_ring_moves_few_keys_when_a_node_is_added() -> None:
+    keys = [f"leaderboard:event:{idx}" for idx in range(2000)]
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+    moved = [key for key in keys if before.node_for(key) != after.node_for(key)]
+    assert all(after.node_for(key) == "d" for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.4
+    assert {before.node_for(key) for key in keys} == {"a", "b", "c"}
+
+
+def test_score_key_tag_keeps_derived_keys_together() -> None:
+    tag = leaderboard.score_key_tag
+    base = "leaderboard:hardest_shot:24h:city:US:austin"
+    assert tag(base) == base
+    assert tag(base + ":timestamps") == base
+    assert tag(base + ":players:12:player:1") == base
+    assert tag("leaderboard:most_hits:7d:global:player-best") == "leaderboard:most_hits:7d:global"
+    assert tag("leaderboard:event:abc") == "leaderboard:event:abc"
+    assert hash_tag("user:{42}:profile") == "42"
+
+
+def test_sharded_pipeline_splits_multi_key_commands_in_order() -> None:
+    client = ShardedClient({f"shard-{idx}": leaderboard.InMemoryRedis() for idx in range(3)})
+    keys = [f"key-{idx}" for idx in range(30)]
+    assert client.mset({key: key.upper() for key in keys}) is True
+    assert len({client.shard_for(key) for key in keys}) == 3
+
+    pipe = client.pipeline()
+    pipe.mget(*reversed(keys)).zadd("z", {"a": 1.0}).get("key-3").delete("key-1", "key-2", "missing")
+    values, added, single, removed = pipe.execute()
+    assert values == [key.upper().encode() for key in reversed(keys)]
+    assert (added, single, removed) == (1, b"KEY-3", 2)
+    assert client.mget("key-1", "key-4") == [None, b"KEY-4"]
+    assert client.flushall() is True
+    assert client.mget(*keys) == [None] * len(keys)
+
+
+def test_sharded_service_matches_single_backend() -> None:
+    single = leaderboard.LeaderboardService(leaderboard.InMemoryRedis(), player_view=leaderboard.PlayerBestView())
+    sharded_client = _sharded()
+    sharded = leaderboard.LeaderboardService(sharded_client, player_view=leaderboard.PlayerBestView())
+    _submit_shots(single, 60)
+    _submit_shots(sharded, 60)
+
+    for scope, country, city in [("global", None, None), ("country", "US", None), ("city", "GB", "London")]:
+        args = dict(metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope=scope, country=country, city=city)
+        expected = [(event.player_id, event.score) for event in single.read_leaderboard(**args, limit=5)]
+        assert [(event.player_id, event.score) for event in sharded.read_leaderboard(**args, limit=5)] == expected
+        expected = [(event.player_id, event.score) for event in single.read_player_leaderboard(**args, limit=5)]
+        assert [(event.player_id, event.score) for event in sharded.read_player_leaderboard(**args, limit=5)] == expected
+        assert sharded.player_rank(**args, player_id="p3") == single.player_rank(**args, player_id="p3")
+
+    # Score keys sit whole on one shard while event payloads spread over all of them.
+    holders = [shard for shard in sharded_client.shards if shard._sorted_sets]
+    assert len(holders) > 1
+    for key in holders[0]._sorted_sets:
+        assert sharded_client.shard_for(key) == sharded_client.shards.index(holders[0])
+    assert all(shard._strings for shard in sharded_client.shards)
+
+
+def test_get_service_is_shared_and_built_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    with LocalRedisServer() as first, LocalRedisServer() as second:
+        monkeypatch.setenv("LEADERBOARD_REDIS_URL", f"{first.url}, {second.url}")
+        leaderboard.reset_service()
+        try:
+            service = leaderboard.get_service()
+            assert leaderboard.get_service() is service
+            _submit_shots(service, 30)
+            events = service.read_leaderboard(
+                metric=leaderboard.METRIC_HARDEST_SHOT, window="24h", scope="global", country=None, city=None, limit=3
+            )
+            assert [event.score for event in events] == [79.0, 78.0, 77.0]
+            assert first.commands and second.commands
+            assert first.connections + second.connections <= 4
+        finally:
+            leaderboard.reset_service()
+    assert leaderboard._SERVICE is None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional
+
+from server.leaderboard import InMemoryRedis
+
+
+class _ReferenceRedis:
+    """The original dict-and-sort sorted-set semantics, kept as the parity oracle."""
+
+    def __init__(self) -> None:
+        self._sorted_sets: Dict[str, Dict[str, float]] = {}
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> None:
+        store = self._sorted_sets.setdefault(key, {})
+        for member, score in mapping.items():
+            store[str(member)] = float(score)
+
+    def zrangebyscore(self, key: str, min_score: float, max_score: float) -> List[bytes]:
+        store = self._sorted_sets.get(key, {})
+        return [member.encode() for member, score in store.items() if min_score <= score <= max_score]
+
+    def zrevrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        items = sorted(self._sorted_sets.get(key, {}).items(), key=lambda item: item[1], reverse=True)
+        slice_items = items[start : stop + 1] if stop >= 0 else items[start:]
+        return [member.encode() for member, _ in slice_items]
+
+    def zrem(self, key: str, member: bytes) -> None:
+        self._sorted_sets.get(key, {}).pop(member.decode(), None)
+
+    def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> None:
+        store = self._sorted_sets.get(key, {})
+        for member, score in list(store.items()):
+            if min_score <= score <= max_score:
+                del store[member]
+
+
+def _random_ops(seed: int, count: int = 3000) -> List[tuple]:
+    rng = random.Random(seed)
+    members = [f"m{i}" for i in range(60)]
+    ops: List[tuple] = []
+    for _ in range(count):
+        roll = rng.random()
+        key = rng.choice(["a", "b"])
+        # Coarse scores force plenty of ties so tie ordering is exercised too.
+        score = float(rng.randint(0, 20))
+        if roll < 0.5:
+            ops.append(("zadd", key, {rng.choice(members): score}))
+        elif roll < 0.65:
+            ops.append(("zrem", key, rng.choice(members).encode()))
+        elif roll < 0.7:
+            low = float(rng.randint(0, 20))
+            ops.append(("zremrangebyscore", key, low, low + rng.randint(0, 3)))
+        elif roll < 0.85:
+            start = rng.randint(0, 10)
+            stop: Optional[int] = rng.choice([-1, start + rng.randint(0, 15)])
+            ops.append(("zrevrange", key, start, stop))
+        else:
+            low = float(rng.randint(0, 20))
+            ops.append(("zrangebyscore", key, low, low + rng.randint(0, 8)))
+    return ops
+
+
+def test_sorted_set_engine_matches_reference_semantics() -> None:
+    for seed in range(5):
+        engine = InMemoryRedis()
+        reference = _ReferenceRedis()
+        for name, *args in _random_ops(seed):
+            actual = getattr(engine, name)(*args)
+            expected = getattr(reference, name)(*args)
+            if name == "zrevrange":
+                assert actual == expected, (seed, name, args)
+            elif name == "zrangebyscore":
+                assert sorted(actual) == sorted(expected), (seed, name, args)
+
+
+def test_zrangebyscore_returns_ascending_scores() -> None:
+    engine = InMemoryRedis()
+    engine.zadd("k", {"c": 3.0, "a": 1.0, "b": 2.0, "z": 9.0})
+    assert engine.zrangebyscore("k", 0, 5) == [b"a", b"b", b"c"]
+    assert engine.zrangebyscore("k", float("-inf"), float("inf")) == [b"a", b"b", b"c", b"z"]
+    assert engine.zrangebyscore("k", 4, 3) == []
+
+
+def test_updating_score_keeps_single_entry() -> None:
+    engine = InMemoryRedis()
+    engine.zadd("k", {"a": 1.0, "b": 2.0})
+    engine.zadd("k", {"a": 5.0})
+    assert engine.zrevrange("k", 0, -1) == [b"a", b"b"]
+    assert engine.zcard("k") == 2
+    engine.zremrangebyscore("k", 0, 10)
+    assert engine.zcard("k") == 0
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from server import leaderboard
+from server.resp import RespClient
+from tests.support import LocalRedisServer
+
+HOUR = 3600
+
+
+def _submit(service: leaderboard.LeaderboardService, player: str, speed: float, occurred_at: float) -> None:
+    service.submit_hardest_shot(
+        player_id=player,
+        ball_speed_kph=speed,
+        occurred_at=occurred_at,
+        country="US",
+        city="Austin",
+    )
+
+
+def _read(service: leaderboard.LeaderboardService, window: str = "24h", limit: int = 10) -> list:
+    events = service.read_leaderboard(
+        metric=leaderboard.METRIC_HARDEST_SHOT,
+        window=window,
+        scope=leaderboard.SCOPE_GLOBAL,
+        country=None,
+        city=None,
+        limit=limit,
+    )
+    return [(event.player_id, event.score) for event in events]
+
+
+def test_bucketed_engine_matches_pruning_engine_inside_window() -> None:
+    now = time.time()
+    pruning = leaderboard.LeaderboardService(leaderboard.InMemoryRedis())
+    bucketed = leaderboard.LeaderboardService(
+        leaderboard.InMemoryRedis(), leaderboard.BucketedWindowEngine(bucket_seconds=HOUR)
+    )
+    samples = [(f"p{idx}", float((idx * 37) % 41), now - idx * 1700) for idx in range(40)]
+    for service in (pruning, bucketed):
+        for player, speed, occurred_at in samples:
+            _submit(service, player, speed, occurred_at)
+
+    assert _read(bucketed, limit=5) == _read(pruning, limit=5)
+    assert _read(bucketed, window="7d", limit=15) == _read(pruning, window="7d", limit=15)
+
+
+def test_bucketed_engine_drops_whole_buckets() -> None:
+    client = leaderboard.InMemoryRedis()
+    engine = leaderboard.BucketedWindowEngine(bucket_seconds=HOUR)
+    service = leaderboard.LeaderboardService(client, engine)
+    now = time.time()
+    for idx in range(20):
+        _submit(service, f"old{idx}", 200.0 + idx, now - 2 * 24 * HOUR - idx)
+    _submit(service, "fresh", 90.0, now)
+
+    assert _read(service) == [("fresh", 90.0)]
+    index_key = "leaderboard:hardest_shot:24h:global:buckets"
+    assert client.zcard(index_key) == 1
+    (live_bucket,) = client.zrangebyscore(index_key, float("-inf"), float("inf"))
+    assert client.zcard(f"leaderboard:hardest_shot:24h:global:bucket:{live_bucket.decode()}") == 1
+
+
+def test_bucketed_read_cost_is_independent_of_expired_volume(monkeypatch: pytest.MonkeyPatch) -> None:
+    with LocalRedisServer() as server:
+        engine = leaderboard.BucketedWindowEngine(bucket_seconds=HOUR)
+        service = leaderboard.LeaderboardService(RespClient.from_url(server.url), engine)
+        start = time.time()
+        for idx in range(50):
+            _submit(service, f"stale{idx}", 150.0, start - idx)
+
+        # After an idle day the whole burst has aged out of the 24h window.
+        monkeypatch.setattr(leaderboard.time, "time", lambda: start + 30 * HOUR)
+        _submit(service, "fresh", 90.0, start + 30 * HOUR)
+
+        before = server.commands
+        assert _read(service) == [("fresh", 90.0)]
+        # Two index lookups, one bucket read and one GET, however many events expired.
+        assert server.commands - before == 4
+
+
+def test_zrevrange_withscores_over_resp() -> None:
+    with LocalRedisServer() as server:
+        client = RespClient.from_url(server.url)
+        client.zadd("k", {"a": 1.5, "b": 3.0})
+        assert client.zrevrange_withscores("k", 0, -1) == [(b"b", 3.0), (b"a", 1.5)]
+        assert leaderboard.InMemoryRedis().zrevrange_withscores("missing", 0, -1) == []
+
+
+def test_window_engine_selected_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LEADERBOARD_WINDOW_ENGINE", "bucketed")
+    monkeypatch.setenv("LEADERBOARD_BUCKET_SECONDS", "900")
+    engine = leaderboard._window_engine_from_env()
+    assert isinstance(engine, leaderboard.BucketedWindowEngine)
+    assert engine.bucket_seconds == 900
+
+    monkeypatch.setenv("LEADERBOARD_WINDOW_ENGINE", "sliding")
+    with pytest.raises(ValueError):
+        leaderboard._window_engine_from_env()
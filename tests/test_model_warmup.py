@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from scripts import export_models
+from server import main as server_main
+from siq.models import get_model
+from siq.models.warmup import ModelWarmup
+from siq.observability import MODEL_COLD_START_HISTOGRAM, MODEL_WARM_LATENCY_HISTOGRAM
+
+
+def test_warmup_prefers_exported_artifacts(tmp_path: Path) -> None:
+    export_models.export_all(tmp_path, ["onnx"])
+    target = tmp_path / "detector.onnx"
+    data = json.loads(target.read_text())
+    data["payload"]["bias"][0] = 0.25
+    target.write_text(json.dumps(data))
+
+    warmup = ModelWarmup(["detector", "pose"], artifact_dir=tmp_path)
+    reports = warmup.run()
+
+    assert warmup.ready
+    assert [report.source for report in reports] == ["artifact", "artifact"]
+    assert warmup.get("detector").bias[0] == pytest.approx(0.25)
+    assert get_model("detector") is warmup.get("detector")
+
+
+def test_warmup_falls_back_to_default_and_records_metrics(tmp_path: Path) -> None:
+    MODEL_COLD_START_HISTOGRAM.reset()
+    MODEL_WARM_LATENCY_HISTOGRAM.reset()
+
+    warmup = ModelWarmup(["pose"], artifact_dir=tmp_path / "missing")
+    (report,) = warmup.run()
+
+    assert report.source == "default"
+    assert report.cold_start_ms >= 0.0
+    cold_records = MODEL_COLD_START_HISTOGRAM.records
+    warm_records = MODEL_WARM_LATENCY_HISTOGRAM.records
+    assert len(cold_records) == 1 and len(warm_records) == 1
+    assert cold_records[0][1] == {"model.name": "pose", "model.source": "default"}
+
+
+def test_warmup_rejects_unknown_model() -> None:
+    with pytest.raises(KeyError):
+        ModelWarmup(["segmenter"])
+
+
+def test_from_env_skips_unknown_models(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    monkeypatch.setenv("SIQ_WARMUP_MODELS", "detector, segmenter ,pose")
+
+    with caplog.at_level("WARNING", logger="siq.models.warmup"):
+        warmup = ModelWarmup.from_env()
+
+    assert warmup.model_names == ["detector", "pose"]
+    assert "segmenter" in caplog.text
+
+
+def test_health_fails_until_warmup_completes(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    warmup = ModelWarmup(["detector"], artifact_dir=tmp_path)
+    monkeypatch.setattr(server_main, "model_warmup", warmup)
+    client = TestClient(server_main.app)
+
+    pending = client.get("/health")
+    assert pending.status_code == 503
+    assert pending.json()["detail"]["status"] == "warming"
+
+    warmup.run()
+    ready = client.get("/health")
+    assert ready.status_code == 200
+    assert [model["name"] for model in ready.json()["models"]] == ["detector"]
+
+
+def test_warmup_starts_with_the_app_and_serves_warmed_models(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    warmup = ModelWarmup(["detector", "pose", "detector_pose"], artifact_dir=tmp_path)
+    monkeypatch.setattr(server_main, "model_warmup", warmup)
+    monkeypatch.setattr(server_main.app, "_started", False)
+    assert not warmup.ready  # importing the server does not load anything
+
+    with TestClient(server_main.app) as client:
+        assert warmup.wait(5.0)
+        assert client.get("/health").status_code == 200
+    combined = get_model("detector_pose")
+    assert combined is warmup.get("detector_pose")
+    assert combined.detector is get_model("detector") is warmup.get("detector")
+
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from scripts import export_models
+from siq.models import DetectorModel, DetectorPoseModel, PoseModel, create_combined_model, load_model_from_payload
+from siq.models.warmup import ModelWarmup
+
+
+def test_combined_outputs_match_separate_models() -> None:
+    detector = DetectorModel()
+    pose = PoseModel()
+    combined = create_combined_model(models={"detector": detector, "pose": pose})
+    batch = export_models.create_dummy_input(seed=11)
+
+    outputs = combined.forward(batch)
+    expected = {**detector.forward(batch), **pose.forward(batch)}
+
+    assert outputs == expected
+
+
+def test_combined_model_round_trips_through_registry() -> None:
+    combined = DetectorPoseModel()
+    restored = load_model_from_payload("detector_pose", combined.to_payload())
+    batch = export_models.create_dummy_input(seed=3)
+
+    export_models.compare_model_outputs("detector_pose", "payload", combined.forward(batch), restored.forward(batch))
+
+
+def test_combined_model_rejects_empty_batch() -> None:
+    with pytest.raises(ValueError):
+        DetectorPoseModel().forward([])
+
+
+def test_combined_model_can_be_warmed_up(tmp_path) -> None:
+    warmup = ModelWarmup(["detector_pose"], artifact_dir=tmp_path)
+    (report,) = warmup.run()
+    assert report.source == "default"
+    assert isinstance(warmup.get("detector_pose"), DetectorPoseModel)
+
+
+def test_combined_model_is_built_from_its_registry_entry(monkeypatch: pytest.MonkeyPatch) -> None:
+    from siq.models import registry
+
+    class PoseOnlyModel(DetectorPoseModel):
+        MODEL_ID = "pose_only"
+        HEADS = ("pose",)
+
+    monkeypatch.setitem(registry.COMBINED_MODEL_REGISTRY, PoseOnlyModel.MODEL_ID, PoseOnlyModel)
+    pose = PoseModel()
+
+    combined = create_combined_model("pose_only", {"detector": DetectorModel(), "pose": pose})
+
+    assert type(combined) is PoseOnlyModel
+    assert combined.pose is pose